@@ -0,0 +1,344 @@
+import hashlib
+import json
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.functional import cached_property
+
+logger = logging.getLogger("project")
+
+# Key parts longer than this are replaced by their sha256, so user input
+# (tokens, idempotency keys) never makes an oversized or unsafe key.
+MAX_KEY_PART_LENGTH = 64
+_MISSING = object()
+# Backends whose entries only this process can see.
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def cache_key(namespace, *parts):
+    """cache_key("order", "create", key) -> "order:create:<key or its sha256>" """
+    segments = [namespace]
+    for part in parts:
+        part = str(part)
+        if len(part) > MAX_KEY_PART_LENGTH or any(c.isspace() for c in part):
+            part = hashlib.sha256(part.encode()).hexdigest()
+        segments.append(part)
+    return ":".join(segments)
+
+
+class LocalCache:
+    """Bounded LRU with per-entry expiry. Values are stored pickled, like LocMemCache."""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout=None):
+        if self.max_size <= 0:
+            return
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        if timeout <= 0:
+            self.discard(key)
+            return
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache(BaseCache):
+    """
+    A shared cache (Redis for several workers, see CACHES in core.settings) with a
+    small in-process L1 in front of it:
+
+        "default": {
+            "BACKEND": "base.caches.TieredCache",
+            "OPTIONS": {"SHARED": "shared", "L1_SIZE": 1000, "L1_TIMEOUT": 5},
+        }
+
+    Reads are served from L1 for at most L1_TIMEOUT seconds. Writes and deletes go to
+    the shared cache and are published on a Redis channel; every process subscribed
+    to it drops those keys from its L1. While the subscription is down L1 is bypassed.
+    So a changed value is seen everywhere right away, except for a read racing the
+    change, which can keep the old value for up to L1_TIMEOUT. Atomic operations
+    (add, incr, decr) always run on the shared cache.
+
+    `stats()` returns the hit/miss counters of this process.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = options.get("SHARED", "shared")
+        self.channel = options.get("CHANNEL", "cache:invalidate")
+        self.local = LocalCache(options.get("L1_SIZE", 1000), options.get("L1_TIMEOUT", 5))
+        self.sender = uuid.uuid4().hex
+        self._counters = {"l1_hits": 0, "shared_hits": 0, "misses": 0}
+        self._counter_lock = threading.Lock()
+        self._listener = None
+        self._listening = threading.Event()
+        self._listener_lock = threading.Lock()
+
+    # Tiers -------------------------------------------------------------------
+    @cached_property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @cached_property
+    def redis(self):
+        """redis-py client of the shared cache, or None when it is not Redis."""
+        backend = getattr(self.shared, "_cache", None)
+        get_client = getattr(backend, "get_client", None)
+        return get_client(write=True) if get_client is not None else None
+
+    def l1_enabled(self):
+        """L1 is only safe when other processes can tell this one about changes."""
+        if self.local.max_size <= 0:
+            return False
+        if self.redis is None:
+            return True
+        self.start_listener()
+        return self._listening.is_set()
+
+    def shared_key(self, key, version=None):
+        return self.shared.make_and_validate_key(key, version=version)
+
+    def count(self, counter, amount=1):
+        with self._counter_lock:
+            self._counters[counter] += amount
+
+    def stats(self):
+        with self._counter_lock:
+            return dict(self._counters)
+
+    # Invalidation ------------------------------------------------------------
+    def publish(self, keys):
+        self.local.discard(*keys)
+        if self.redis is None or not keys:
+            return
+        try:
+            self.redis.publish(self.channel, json.dumps({"sender": self.sender, "keys": keys}))
+        except Exception as exc:
+            logger.warning("Could not publish cache invalidation: %s", exc)
+
+    def start_listener(self):
+        if self._listener is not None:
+            return
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self.listen, name="cache-invalidation", daemon=True
+                )
+                self._listener.start()
+                # Give the first subscription a moment, so the first reads can use L1.
+                self._listening.wait(0.5)
+
+    def listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Anything cached while unsubscribed may have been changed elsewhere.
+                self.local.clear()
+                self._listening.set()
+                for message in pubsub.listen():
+                    self.invalidated(message.get("data"))
+            except Exception as exc:
+                logger.warning("Cache invalidation channel lost: %s", exc)
+            finally:
+                self._listening.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(1)
+
+    def invalidated(self, data):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get("sender") == self.sender:
+            return
+        keys = message.get("keys")
+        if keys == "*":
+            self.local.clear()
+        elif keys:
+            self.local.discard(*keys)
+
+    # Cache API ---------------------------------------------------------------
+    def get(self, key, default=None, version=None):
+        full_key = self.shared_key(key, version)
+        use_l1 = self.l1_enabled()
+        if use_l1:
+            value = self.local.get(full_key)
+            if value is not _MISSING:
+                self.count("l1_hits")
+                return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self.count("misses")
+            return default
+        self.count("shared_hits")
+        if use_l1:
+            self.local.set(full_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout=self.shared_timeout(timeout), version=version)
+        self.publish([self.shared_key(key, version)])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=self.shared_timeout(timeout), version=version)
+        if added:
+            self.publish([self.shared_key(key, version)])
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout=self.shared_timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version=version)
+        self.publish([self.shared_key(key, version)])
+        return deleted
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        use_l1 = self.l1_enabled()
+        for key in keys:
+            value = self.local.get(self.shared_key(key, version)) if use_l1 else _MISSING
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        self.count("l1_hits", len(found))
+        if missing:
+            loaded = self.shared.get_many(missing, version=version)
+            self.count("shared_hits", len(loaded))
+            self.count("misses", len(missing) - len(loaded))
+            if use_l1:
+                for key, value in loaded.items():
+                    self.local.set(self.shared_key(key, version), value)
+            found.update(loaded)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout=self.shared_timeout(timeout), version=version)
+        self.publish([self.shared_key(key, version) for key in data])
+        return failed
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.shared.delete_many(keys, version=version)
+        self.publish([self.shared_key(key, version) for key in keys])
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self.publish([self.shared_key(key, version)])
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        value = self.shared.decr(key, delta, version=version)
+        self.publish([self.shared_key(key, version)])
+        return value
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+        if self.redis is not None:
+            try:
+                self.redis.publish(self.channel, json.dumps({"sender": self.sender, "keys": "*"}))
+            except Exception as exc:
+                logger.warning("Could not publish cache invalidation: %s", exc)
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def shared_timeout(self, timeout):
+        """Our DEFAULT_TIMEOUT means the shared cache's own default."""
+        return self.shared.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+
+def cache_is_shared(alias="default"):
+    """False when `alias` (or the shared tier of a TieredCache) lives in this process only."""
+    backend = caches[alias]
+    if isinstance(backend, TieredCache):
+        backend = backend.shared
+    return not isinstance(backend, PROCESS_LOCAL_BACKENDS)
+
+
+def invalidation_timeout(timeout=None):
+    """
+    Timeout for entries that are invalidated through the cache by other processes.
+    When the cache is process-local (no REDIS_URL) those invalidations never arrive,
+    so such entries are kept for at most UNSHARED_CACHE_TIMEOUT seconds instead.
+    """
+    if cache_is_shared():
+        return timeout
+    limit = getattr(settings, "UNSHARED_CACHE_TIMEOUT", 30)
+    return limit if timeout is None else min(timeout, limit)
+
+
+class GenerationToken:
+    """
+    A random token stored in the default cache and made part of cache keys:
+    replacing it (after commit) drops every entry built with the old one at once.
+
+        STATS = GenerationToken("inventory:stock-generation")
+        key = cache_key("inventory", "stats", STATS.get())
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def get(self):
+        token = cache.get(self.key)
+        if token is None:
+            token = uuid.uuid4().hex
+            if not cache.add(self.key, token, invalidation_timeout()):
+                token = cache.get(self.key, token)
+        return token
+
+    def replace(self):
+        transaction.on_commit(lambda: cache.set(self.key, uuid.uuid4().hex, invalidation_timeout()))
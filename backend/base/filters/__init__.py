@@ -0,0 +1 @@
+from .schema import FilterSchema, INVALID_VALUES
@@ -1,3 +1,4 @@
 from .timestamped import TimeStampedModel
 from .user_audit_model import UserAuditModel
 from .audit_model import AuditModel
+from .tree import TreeModel
@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
+
+TREE_PATH_SEPARATOR = "/"
+# 32 hex chars + separator per level; 760 chars stays under MySQL's utf8mb4 index limit (23 levels).
+TREE_PATH_MAX_LENGTH = 760
+
+
+def tree_segment(pk):
+    return pk.hex if hasattr(pk, "hex") else str(pk)
+
+
+def rebuild_tree_paths(model, parent_field="parent_id", batch_size=1000):
+    """
+    Recompute `tree_path`/`tree_depth` of every row of `model` from its parent links.
+    Works on historical models too, so migrations can use it for the backfill.
+    """
+    rows = list(model._default_manager.values_list("pk", parent_field))
+    children = defaultdict(list)
+    for pk, parent_id in rows:
+        children[parent_id].append(pk)
+
+    nodes = []
+    stack = [(pk, "", -1) for pk in children.get(None, [])]
+    while stack:
+        pk, parent_path, parent_depth = stack.pop()
+        segment = tree_segment(pk)
+        path = f"{parent_path}{TREE_PATH_SEPARATOR}{segment}" if parent_path else segment
+        nodes.append(model(pk=pk, tree_path=path, tree_depth=parent_depth + 1))
+        stack.extend((child, path, parent_depth + 1) for child in children.get(pk, []))
+    model._default_manager.bulk_update(nodes, ["tree_path", "tree_depth"], batch_size=batch_size)
+    return len(nodes)
+
+
+class TreeModel(models.Model):
+    """
+    Materialized path for self-referencing models with a `parent` foreign key.
+
+    `tree_path` is the hex ids from the root down to the node, joined with "/", so a
+    whole subtree is one indexed `tree_path__startswith` query.
+    The path is set on save; moving a node rewrites its descendants with one UPDATE.
+    Deleting keeps the paths consistent on its own: the parent FK cascades.
+    """
+
+    tree_path = models.CharField(max_length=TREE_PATH_MAX_LENGTH, default="", editable=False, db_index=True)
+    tree_depth = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tree_loaded = (instance.__dict__.get("parent_id"), instance.__dict__.get("tree_path"))
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        loaded_parent_id, old_path = getattr(self, "_tree_loaded", (None, None))
+        parent_saved = update_fields is None or bool({"parent", "parent_id"} & set(update_fields))
+        if self.tree_path and not (parent_saved and self.parent_id != loaded_parent_id):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic(using=kwargs.get("using")):
+            if old_path is None and not self._state.adding:
+                old_path = (
+                    type(self)._default_manager.filter(pk=self.pk)
+                    .values_list("tree_path", flat=True)
+                    .first()
+                )
+            self.set_tree_path()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"tree_path", "tree_depth"}
+            super().save(*args, **kwargs)
+            if old_path and old_path != self.tree_path:
+                self.move_descendants(old_path)
+        self._tree_loaded = (self.parent_id, self.tree_path)
+
+    def set_tree_path(self):
+        self.tree_path, self.tree_depth = self.tree_position(self.parent_id)
+
+    def tree_position(self, parent_id):
+        """
+        (tree_path, tree_depth) of this node under `parent_id`.
+        :raises ValidationError: when the parent is missing, is the node or one of its descendants,
+            or the tree would get too deep
+        """
+        segment = tree_segment(self.pk)
+        if parent_id is None:
+            return segment, 0
+        parent = (
+            type(self)._default_manager.filter(pk=parent_id)
+            .values("tree_path", "tree_depth")
+            .first()
+        )
+        if parent is None:
+            raise ValidationError({"parent": "Parent does not exist."})
+        parent_path = parent["tree_path"]
+        if segment in parent_path.split(TREE_PATH_SEPARATOR):
+            raise ValidationError({"parent": "A node can not be moved under itself or its descendants."})
+        tree_path = f"{parent_path}{TREE_PATH_SEPARATOR}{segment}"
+        if len(tree_path) > TREE_PATH_MAX_LENGTH:
+            raise ValidationError({"parent": "The tree is too deep."})
+        return tree_path, parent["tree_depth"] + 1
+
+    def move_descendants(self, old_path):
+        """Replace the `old_path` prefix of every descendant with the current path."""
+        descendants = type(self)._default_manager.filter(
+            tree_path__startswith=old_path + TREE_PATH_SEPARATOR
+        )
+        descendants.update(
+            tree_path=Concat(Value(self.tree_path), Substr("tree_path", len(old_path) + 1)),
+            tree_depth=F("tree_depth") + (self.tree_depth - old_path.count(TREE_PATH_SEPARATOR)),
+        )
+
+    @property
+    def ancestor_ids(self):
+        return self.tree_path.split(TREE_PATH_SEPARATOR)[:-1]
+
+    def get_ancestors(self):
+        return type(self)._default_manager.filter(pk__in=self.ancestor_ids).order_by("tree_depth")
+
+    def subtree_filter(self, include_self=False):
+        condition = Q(tree_path__startswith=self.tree_path + TREE_PATH_SEPARATOR)
+        if include_self:
+            condition |= Q(pk=self.pk)
+        return condition
+
+    def get_descendants(self, include_self=False):
+        return type(self)._default_manager.filter(self.subtree_filter(include_self))
@@ -1,11 +1,145 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 from rest_framework import pagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from base.utils.query_plan import estimated_count
 
 
 class CustomPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset (cursor) mode.
+
+    Cursor mode is used when the request sends `cursor=<token>` or `pagination=cursor`.
+    Rows are walked on (created_at, id), newest first unless `ordering=created_at`,
+    so neither COUNT(*) nor OFFSET is run; any other `ordering` is refused. `count` is omitted unless the client asks
+    for it with `count=exact` or `count=approximate` (table/planner statistics).
+    """
     page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+    cursor_orderings = ("created_at", "-created_at")
+    invalid_ordering_message = "Cursor pagination only supports ordering by created_at or -created_at."
+
+    cursor_mode = False
+
+    def is_cursor_request(self, request):
+        params = request.query_params
+        return (
+            self.cursor_query_param in params
+            or params.get(self.mode_query_param) == "cursor"
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.is_cursor_request(request)
+        if self.cursor_mode:
+            return self.paginate_cursor(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_cursor(self, queryset, request):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        ordering = request.query_params.get("ordering")
+        if ordering and ordering not in self.cursor_orderings:
+            raise ValidationError({"ordering": [self.invalid_ordering_message]})
+        position = self.decode_cursor(request)
+        reverse = position is not None and position[2]
+        ascending = ordering == "created_at"
+
+        self.count = self.get_count(queryset, request)
+
+        # Walking back through a descending list is an ascending scan and vice versa.
+        if ascending != reverse:
+            queryset = queryset.order_by("created_at", "id")
+            after = "gt"
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
+            after = "lt"
+        if position is not None:
+            created_at = position[0]
+            try:
+                pk = queryset.model._meta.pk.to_python(position[1])
+            except DjangoValidationError:
+                raise self.invalid_cursor()
+            queryset = queryset.filter(
+                Q(**{f"created_at__{after}": created_at})
+                | Q(created_at=created_at, **{f"id__{after}": pk})
+            )
+
+        results = list(queryset[:self.page_size_value + 1])
+        has_more = len(results) > self.page_size_value
+        results = results[:self.page_size_value]
+        if reverse:
+            results.reverse()
+
+        self.has_next = bool(results) and (position is not None if reverse else has_more)
+        self.has_previous = bool(results) and (has_more if reverse else position is not None)
+        self.results = results
+        return results
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "exact":
+            return queryset.count()
+        if mode == "approximate":
+            estimate = estimated_count(queryset)
+            return queryset.count() if estimate is None else estimate
+        return None
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            created_at, pk, reverse = json.loads(urlsafe_b64decode(padded.encode("ascii")))
+            created_at = parse_datetime(created_at)
+        except (TypeError, ValueError):
+            raise self.invalid_cursor()
+        if created_at is None:
+            raise self.invalid_cursor()
+        return created_at, pk, bool(reverse)
+
+    def invalid_cursor(self):
+        return ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+
+    def encode_cursor(self, instance, reverse):
+        position = [instance.created_at.isoformat(), str(instance.pk), reverse]
+        encoded = urlsafe_b64encode(json.dumps(position).encode("ascii")).decode("ascii").rstrip("=")
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.cursor_mode:
+            return self.encode_cursor(self.results[-1], False) if self.has_next else None
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.cursor_mode:
+            return self.encode_cursor(self.results[0], True) if self.has_previous else None
+        return super().get_previous_link()
 
     def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response(
+                {
+                    "links": {
+                        "previous": self.get_previous_link(),
+                        "next": self.get_next_link(),
+                    },
+                    "page_size": self.page_size_value,
+                    "count": self.count,
+                    "results": data,
+                }
+            )
         return Response(
             {
                 "links": {
@@ -2,3 +2,4 @@ from .base import BaseListSerializer, BaseSerializer
 from .recursive import RecursiveSerializer
 from .writable_nested import WritableNestedSerializer
 from .mutiple_update import MutipleUpdateListSerializer
+from .tree import TreeListSerializer, TreeParentMixin, TreeSerializer
@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from rest_framework import serializers
+
+
+class TreeListSerializer(serializers.ListSerializer):
+    """
+    Nest a flat list of nodes in memory: a node whose parent is not in the list is a root.
+    Siblings keep the order of the queryset.
+    """
+
+    def to_representation(self, data):
+        nodes = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        ids = {node.pk for node in nodes}
+        children = defaultdict(list)
+        roots = []
+        for node in nodes:
+            if node.parent_id in ids:
+                children[node.parent_id].append(node)
+            else:
+                roots.append(node)
+
+        children_field = self.child.children_field
+
+        def build(node):
+            item = self.child.to_representation(node)
+            item[children_field] = [build(child) for child in children[node.pk]]
+            return item
+
+        return [build(root) for root in roots]
+
+
+class TreeSerializer(serializers.ModelSerializer):
+    """
+    Serializer for TreeModel nodes. With many=True, pass the whole (sub)tree as one
+    queryset, e.g. `node.get_descendants(include_self=True)`, and the nodes are
+    nested under `children_field` without a query per level.
+    """
+
+    children_field = "children"
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        # Same as ListSerializer.many_init, with TreeListSerializer as the list class.
+        list_only = {key: kwargs.pop(key) for key in ("allow_empty", "max_length", "min_length") if key in kwargs}
+        list_kwargs = {"child": cls(*args, **kwargs), **list_only}
+        list_kwargs.update(
+            {key: value for key, value in kwargs.items() if key in serializers.LIST_SERIALIZER_KWARGS}
+        )
+        return TreeListSerializer(*args, **list_kwargs)
+
+
+class TreeParentMixin:
+    """
+    Check `parent_id` of a TreeModel write serializer the way TreeModel.save() does,
+    so a missing parent or a cycle is answered with 400 instead of failing in save().
+    """
+
+    def validate_parent_id(self, value):
+        if value is None:
+            return value
+        node = self.instance if self.instance is not None else self.Meta.model()
+        try:
+            node.tree_position(value)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict.get("parent", e.messages))
+        return value
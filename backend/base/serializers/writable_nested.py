@@ -1,4 +1,6 @@
-from django.db import transaction
+from django.db import models, transaction
+from django.db.models.signals import pre_save, post_save
+from django.utils import timezone
 from django.db.models.fields.related_descriptors import (
     ManyToManyDescriptor,
     ForwardManyToOneDescriptor,
@@ -12,6 +14,7 @@ from base.utils.model_meta import get_field_info
 from rest_framework import serializers
 import inflect
 import copy
+import uuid
 
 p = inflect.engine()
 
@@ -24,6 +27,68 @@ related_descriptors = [
 ]
 
 
+class PreloadedQuerySet:
+    """
+    Stands in for the queryset of a PrimaryKeyRelatedField while a nested list is
+    validated: the referenced rows are fetched with one query instead of one per item.
+    """
+
+    def __init__(self, queryset, ids):
+        self.model = queryset.model
+        pk_field = self.model._meta.pk
+        keys = set()
+        for pk in ids:
+            try:
+                keys.add(pk_field.to_python(pk))
+            except Exception:
+                continue
+        self.rows = {obj.pk: obj for obj in queryset.filter(pk__in=keys)} if keys else {}
+
+    def all(self):
+        return self
+
+    def get(self, pk):
+        try:
+            key = self.model._meta.pk.to_python(pk)
+        except Exception:
+            raise ValueError(pk)
+        try:
+            return self.rows[key]
+        except KeyError:
+            raise self.model.DoesNotExist
+
+
+def preload_related_fields(serializer, items):
+    """Swap the writable PrimaryKeyRelatedFields of `serializer` for PreloadedQuerySets of `items`."""
+    for field in serializer.fields.values():
+        if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField) or field.queryset is None:
+            continue
+        ids = {
+            item.get(field.field_name) for item in items
+            if isinstance(item, dict) and isinstance(item.get(field.field_name), (str, int, uuid.UUID))
+        }
+        if ids:
+            field.queryset = PreloadedQuerySet(field.get_queryset(), ids)
+
+
+class BulkNestedListSerializer(ListSerializer):
+    """Validates nested items against their existing rows (`existing`: id -> instance) without a query per item."""
+
+    def __init__(self, *args, existing=None, **kwargs):
+        self.existing = existing or {}
+        super().__init__(*args, **kwargs)
+
+    def run_child_validation(self, data):
+        pk = data.get('id') if isinstance(data, dict) else None
+        try:
+            key = str(self.child.Meta.model._meta.pk.to_python(pk)) if pk is not None else None
+        except Exception:
+            key = None
+        self.child.instance = self.existing.get(key)
+        self.child.initial_data = data
+        return super().run_child_validation(data)
+
+
 class WritableNestedSerializer(serializers.ModelSerializer):
     def __init__(self, instance=None, data=empty, **kwargs):
         self.forward_relationships_data = {}
@@ -139,6 +204,8 @@ class WritableNestedSerializer(serializers.ModelSerializer):
         related_data = value.get('related_data', [])
         if many:
             instances = []
+            if source == key and self.can_bulk_save(target_serializer_class, target_model):
+                return self.bulk_save_relationship(key, value, instance)
             if source == key:
                 # Update the exist data
                 exist_target_data = value.get('exist_target_data',[])
@@ -267,6 +334,121 @@ class WritableNestedSerializer(serializers.ModelSerializer):
                 return target_serializer.instance, source, None
         return None, None, None   
     
+    @staticmethod
+    def can_bulk_save(serializer_class, model):
+        """
+        Whether the nested rows of `serializer_class` can be written with bulk queries:
+        the serializer keeps the default create/update, has no nested or many-to-many
+        writable fields, and the model either keeps Model.save or moves its save logic
+        into `prepare_save()`.
+        """
+        if serializer_class.create not in DEFAULT_CREATE or serializer_class.update not in DEFAULT_UPDATE:
+            return False
+        meta = getattr(serializer_class, 'Meta', None)
+        if getattr(meta, 'nested_create_fields', None) or getattr(meta, 'nested_update_fields', None):
+            return False
+        if model.save is not models.Model.save and not hasattr(model, 'prepare_save'):
+            return False
+        for field in serializer_class().fields.values():
+            if not field.read_only and isinstance(field, (ListSerializer, serializers.ManyRelatedField)):
+                return False
+        return True
+
+    def bulk_save_relationship(self, key, value, instance=None):
+        """
+        Bulk version of `save_relationship` for a direct to-many relation: validate every
+        nested item in one pass, then one bulk_update for the existing rows, one bulk_create
+        for the new rows and one query for the removed rows.
+        pre_save/post_save are still sent for every row.
+        """
+        source = value.get('source')
+        target_serializer_class = value.get('target_serializer_class')
+        target_model = value.get('target_model')
+        source_attname = value.get('source_attname')
+        m2m_name = value.get('m2m_name')
+        removed_items = value.get('removed_items') or []
+        exist_target_data = copy.deepcopy(value.get('exist_target_data') or [])
+        new_target_data = copy.deepcopy(value.get('new_target_data') or [])
+        if instance is not None and source_attname is not None:
+            for item in new_target_data:
+                if item.get(source_attname) is None:
+                    item.update({source_attname: instance.id.urn[9:]})
+
+        exist_ids = [item.get('id') for item in exist_target_data]
+        target_queryset = (
+            getattr(instance, source).filter(pk__in=exist_ids)
+            if instance is not None
+            else target_model.objects.filter(pk__in=exist_ids)
+        )
+        exist_instances = {str(obj.pk): obj for obj in target_queryset}
+        exist_target_data = [
+            item for item in exist_target_data
+            if str(target_model._meta.pk.to_python(item.get('id'))) in exist_instances
+        ]
+
+        list_serializer = BulkNestedListSerializer(
+            child=target_serializer_class(), data=exist_target_data + new_target_data, existing=exist_instances
+        )
+        preload_related_fields(list_serializer.child, exist_target_data + new_target_data)
+        list_serializer.is_valid(raise_exception=True)
+        validated = list_serializer.validated_data
+
+        updated, created = [], []
+        update_fields = set()
+        for item, attrs in zip(exist_target_data, validated[:len(exist_target_data)]):
+            obj = exist_instances[str(target_model._meta.pk.to_python(item.get('id')))]
+            for attr, attr_value in attrs.items():
+                setattr(obj, attr, attr_value)
+                update_fields.add(target_model._meta.get_field(attr).attname)
+            updated.append(obj)
+        for attrs in validated[len(exist_target_data):]:
+            created.append(target_model(**attrs))
+        if instance is not None and source_attname is not None:
+            # The item serializer may not expose the foreign key back to `instance`.
+            for obj in created:
+                setattr(obj, source_attname, instance.pk)
+
+        now = timezone.now()
+        auto_now_fields = [
+            field.attname for field in target_model._meta.concrete_fields if getattr(field, 'auto_now', False)
+        ]
+        for obj in updated:
+            for attname in auto_now_fields:
+                setattr(obj, attname, now)
+        update_fields.update(auto_now_fields)
+
+        columns = [field.attname for field in target_model._meta.concrete_fields if not field.primary_key]
+        for obj, is_new in [(obj, False) for obj in updated] + [(obj, True) for obj in created]:
+            if hasattr(obj, 'prepare_save'):
+                before = {attname: getattr(obj, attname) for attname in columns}
+                obj.prepare_save()
+                # Only the columns prepare_save() changed join the update.
+                update_fields.update(attname for attname in columns if getattr(obj, attname) != before[attname])
+            pre_save.send(sender=target_model, instance=obj, raw=False, using=obj._state.db or 'default',
+                          update_fields=None)
+        if updated and update_fields:
+            target_model.objects.bulk_update(updated, list(update_fields))
+        if created:
+            target_model.objects.bulk_create(created)
+        for obj, is_new in [(obj, False) for obj in updated] + [(obj, True) for obj in created]:
+            post_save.send(sender=target_model, instance=obj, created=is_new, raw=False,
+                           using=obj._state.db or 'default', update_fields=None)
+
+        instances = updated + created
+        if instance is not None:
+            if m2m_name is not None or isinstance(getattr(type(instance), key), ManyToManyDescriptor):
+                if len(instances) > 0 or len(removed_items) > 0:
+                    getattr(instance, key).set(instances)
+            elif removed_items:
+                removed_ids = [obj.pk for obj in removed_items]
+                fk = target_model._meta.get_field(source_attname)
+                if fk.null:
+                    target_model.objects.filter(pk__in=removed_ids).update(**{source_attname: None})
+                else:
+                    target_model.objects.filter(pk__in=removed_ids).delete()
+            getattr(instance, key)._remove_prefetched_objects()
+        return instances, source, None
+
     def get_related_serializer_info(self, fieldName):
         related_field = self.fields.fields.get(fieldName, None)
         source = (
@@ -518,3 +700,6 @@ class WritableNestedSerializer(serializers.ModelSerializer):
         valid_data = super().to_internal_value(data)
         return valid_data
 
+
+DEFAULT_CREATE = (WritableNestedSerializer.create, serializers.ModelSerializer.create)
+DEFAULT_UPDATE = (WritableNestedSerializer.update, serializers.ModelSerializer.update)
@@ -1,5 +1,7 @@
 from .base import BaseService
+from .jobs import JobQueue
 from .mailing import Mailing
 from .sms import SMS
+from .images import ImageDerivatives
 from .Verification import Verification
 from .pdf.pdf_creator import PdfCreator
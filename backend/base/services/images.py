@@ -0,0 +1,179 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from base.storages import is_hashed_name
+
+logger = logging.getLogger("project")
+
+# Widths (px) generated for every uploaded image; widths above the original are skipped.
+DERIVATIVE_WIDTHS = (160, 480, 1024)
+# format key -> (Pillow format, save options)
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "IMAGE_DERIVATIVE_WORKERS", 2),
+            thread_name_prefix="image-derivatives",
+        )
+    return _executor
+
+
+class ImageDerivatives:
+    """
+    Resized WebP/JPEG copies of an uploaded image.
+
+    The result is stored on the model as a JSON map, keyed by the real width of each copy:
+        {"source": "<original name>", "160": {"webp": "<name>", "jpeg": "<name>"}, ...}
+    `source` tells whether the map still belongs to the current file. The copies of
+    the previous file are deleted once the map of a new one is recorded.
+    """
+
+    @staticmethod
+    def derivative_name(name, width, fmt):
+        directory, filename = posixpath.split(name.replace("\\", "/"))
+        if is_hashed_name(name):
+            # Hashed storages add their own digest directory to the derivative.
+            directory = posixpath.dirname(directory)
+        root, _ = posixpath.splitext(filename)
+        return posixpath.join(directory, f"{root}_{width}.{fmt}")
+
+    @classmethod
+    def generate(cls, field_file, widths=DERIVATIVE_WIDTHS, formats=DERIVATIVE_FORMATS):
+        """
+        :param field_file: the FieldFile of an ImageField
+        :return: variants map (see class docstring)
+        """
+        storage = field_file.storage
+        name = field_file.name
+        with storage.open(name, "rb") as source:
+            image = Image.open(source)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+        variants = {"source": name}
+        for width in widths:
+            if width >= image.width and width != widths[0]:
+                break
+            resized = image.copy()
+            resized.thumbnail((width, width * 10), Image.LANCZOS)
+            # Smaller originals are not upscaled: name and list the copy by its own width.
+            width = resized.width
+            if str(width) in variants:
+                continue
+            files = {}
+            for fmt, (pil_format, options) in formats.items():
+                frame = resized
+                if pil_format == "JPEG" and frame.mode not in ("RGB", "L"):
+                    frame = frame.convert("RGB")
+                elif frame.mode == "P":
+                    frame = frame.convert("RGBA")
+                buffer = BytesIO()
+                frame.save(buffer, pil_format, **options)
+                files[fmt] = storage.save(
+                    cls.derivative_name(name, width, fmt), ContentFile(buffer.getvalue())
+                )
+            variants[str(width)] = files
+        return variants
+
+    @staticmethod
+    def file_names(variants):
+        return {
+            name
+            for key, files in (variants or {}).items()
+            if key.isdigit()
+            for name in files.values()
+        }
+
+    @classmethod
+    def delete_files(cls, storage, variants, keep=None):
+        """Delete the copies listed in `variants`, except the names in the map `keep`."""
+        for name in cls.file_names(variants) - cls.file_names(keep):
+            try:
+                storage.delete(name)
+            except Exception as e:
+                logger.warning(f"Could not delete image derivative {name}: {e}")
+
+    @classmethod
+    def is_current(cls, variants, field_file):
+        return bool(field_file) and (variants or {}).get("source") == field_file.name
+
+    @classmethod
+    def schedule(cls, instance, field_name, variants_field_name):
+        """
+        Generate derivatives for `instance.<field_name>` after the transaction commits,
+        in the background pool unless IMAGE_DERIVATIVES_ASYNC is False.
+        Does nothing when the stored map already matches the current file.
+        """
+        field_file = getattr(instance, field_name)
+        variants = getattr(instance, variants_field_name)
+        model = type(instance)
+        if not field_file:
+            if variants:
+                model._default_manager.filter(pk=instance.pk).update(**{variants_field_name: {}})
+                storage = field_file.storage
+                transaction.on_commit(lambda: cls.delete_files(storage, variants))
+            return
+        if cls.is_current(variants, field_file):
+            return
+
+        def task():
+            try:
+                cls.update(model, instance.pk, field_name, variants_field_name)
+            except Exception as e:
+                logger.error(f"Image derivatives failed for {field_file.name}: {e}", exc_info=True)
+            finally:
+                close_old_connections()
+
+        if getattr(settings, "IMAGE_DERIVATIVES_ASYNC", True):
+            transaction.on_commit(lambda: get_executor().submit(task))
+        else:
+            transaction.on_commit(task)
+
+    @classmethod
+    def update(cls, model, pk, field_name, variants_field_name):
+        instance = model._default_manager.filter(pk=pk).only(field_name, variants_field_name).first()
+        if instance is None or not getattr(instance, field_name):
+            return None
+        field_file = getattr(instance, field_name)
+        old_variants = getattr(instance, variants_field_name)
+        variants = cls.generate(field_file)
+        # Only record the map if the image was not replaced in the meantime.
+        recorded = model._default_manager.filter(pk=pk, **{field_name: field_file.name}).update(
+            **{variants_field_name: variants}
+        )
+        if recorded:
+            cls.delete_files(field_file.storage, old_variants, keep=variants)
+        else:
+            # A newer file will get its own copies.
+            cls.delete_files(field_file.storage, variants)
+        return variants
+
+    @staticmethod
+    def srcset(variants, url):
+        """
+        :param url: callable turning a stored name into a URL
+        :return: {"webp": "<url> 160w, <url> 480w", "jpeg": "..."} or None
+        """
+        if not variants:
+            return None
+        widths = sorted(int(key) for key in variants if key.isdigit())
+        result = {}
+        for width in widths:
+            for fmt, name in variants[str(width)].items():
+                result.setdefault(fmt, []).append(f"{url(name)} {width}w")
+        return {fmt: ", ".join(entries) for fmt, entries in result.items()} or None
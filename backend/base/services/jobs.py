@@ -0,0 +1,150 @@
+import logging
+import os
+import random
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from common.constants import JobStatus
+from tools.models import Job
+
+logger = logging.getLogger("project")
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Database-backed queue for work that should not run inside a request: mail, push,
+    SMS, PDF rendering. Jobs are rows of tools.Job, so they survive restarts and are
+    committed (or rolled back) together with the transaction that enqueued them.
+
+        JobQueue.enqueue("base.services.mailing.send_email_job", {"message": {...}}, queue="mail")
+
+    `python manage.py run_jobs` claims due jobs and calls their handler with the payload.
+    A failed job is retried with exponential backoff; after `max_attempts` it is kept
+    as DEAD (the dead-letter list) until `retry_dead` puts it back in the queue.
+    With JOBS_EAGER=True jobs run right away in the calling process instead.
+    """
+
+    @staticmethod
+    def enqueue(handler, payload=None, queue="default", delay=0, max_attempts=None):
+        job = Job(
+            queue=queue,
+            handler=handler,
+            payload=payload or {},
+            run_at=timezone.now() + timedelta(seconds=delay),
+            max_attempts=max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 5),
+        )
+        if getattr(settings, "JOBS_EAGER", False):
+            job.attempts = 1
+            import_string(job.handler)(**job.payload)
+            return job
+        job.save()
+        return job
+
+    @staticmethod
+    def backoff(attempts):
+        """Seconds before retry number `attempts`: base * 2^(attempts-1), capped, with jitter."""
+        base = getattr(settings, "JOB_RETRY_BACKOFF", 30)
+        delay = min(base * 2 ** (attempts - 1), getattr(settings, "JOB_RETRY_BACKOFF_MAX", 3600))
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def claim(limit, queues=None, worker=None):
+        """
+        Lock up to `limit` due jobs for `worker` and return them. Rows locked by another
+        worker are skipped; RUNNING jobs whose lock is older than JOB_LOCK_TIMEOUT are
+        claimed again. Live workers refresh the lock with `heartbeat`, so only the jobs
+        of a crashed worker get that old, however long a job runs.
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=getattr(settings, "JOB_LOCK_TIMEOUT", 600))
+        due = Q(status=JobStatus.PENDING, run_at__lte=now) | Q(status=JobStatus.RUNNING, locked_at__lt=stale)
+        with transaction.atomic():
+            queryset = Job.objects.filter(due)
+            if queues:
+                queryset = queryset.filter(queue__in=queues)
+            ids = list(
+                queryset.order_by("run_at")
+                .select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+                .values_list("id", flat=True)[:limit]
+            )
+            if not ids:
+                return []
+            Job.objects.filter(id__in=ids).update(
+                status=JobStatus.RUNNING,
+                locked_at=now,
+                locked_by=worker or worker_name(),
+                attempts=F("attempts") + 1,
+            )
+        return list(Job.objects.filter(id__in=ids).order_by("run_at"))
+
+    @staticmethod
+    def heartbeat(job_ids, worker=None):
+        """Refresh the lock of the RUNNING jobs `job_ids` that `worker` still holds."""
+        if not job_ids:
+            return 0
+        return Job.objects.filter(
+            id__in=job_ids, status=JobStatus.RUNNING, locked_by=worker or worker_name()
+        ).update(locked_at=timezone.now())
+
+    @classmethod
+    def run(cls, job):
+        """Run a claimed job and record the outcome. Returns True when it succeeded."""
+        close_old_connections()
+        try:
+            import_string(job.handler)(**job.payload)
+        except Exception as exc:
+            cls.fail(job, exc)
+            return False
+        finally:
+            close_old_connections()
+        Job.objects.filter(pk=job.pk).update(
+            status=JobStatus.DONE, finished_at=timezone.now(), locked_at=None, last_error=""
+        )
+        return True
+
+    @classmethod
+    def fail(cls, job, exc):
+        error = "".join(traceback.format_exception(exc))
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) is dead after %s attempts: %s", job.pk, job.handler, job.attempts, exc)
+            Job.objects.filter(pk=job.pk).update(
+                status=JobStatus.DEAD, finished_at=timezone.now(), locked_at=None, last_error=error
+            )
+            return
+        logger.warning("Job %s (%s) failed, attempt %s: %s", job.pk, job.handler, job.attempts, exc)
+        Job.objects.filter(pk=job.pk).update(
+            status=JobStatus.PENDING,
+            run_at=timezone.now() + timedelta(seconds=cls.backoff(job.attempts)),
+            locked_at=None,
+            last_error=error,
+        )
+
+    @staticmethod
+    def retry_dead(queues=None):
+        """Put dead jobs back in the queue with a fresh set of attempts."""
+        queryset = Job.objects.filter(status=JobStatus.DEAD)
+        if queues:
+            queryset = queryset.filter(queue__in=queues)
+        return queryset.update(
+            status=JobStatus.PENDING, attempts=0, run_at=timezone.now(), finished_at=None
+        )
+
+    @staticmethod
+    def purge(days=None):
+        """Delete jobs that finished successfully more than `days` (JOB_DONE_RETENTION_DAYS) ago."""
+        days = getattr(settings, "JOB_DONE_RETENTION_DAYS", 7) if days is None else days
+        deleted, _ = Job.objects.filter(
+            status=JobStatus.DONE, finished_at__lt=timezone.now() - timedelta(days=days)
+        ).delete()
+        return deleted
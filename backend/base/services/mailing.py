@@ -1,39 +1,88 @@
-import threading
+import base64
 
 from django.conf import settings
 from django.core.mail import EmailMessage, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
-class MailingThread(threading.Thread):
-    def __init__(
-        self,
-        messages=None,
-        fail_callback=None
-    ):
-        self.messages = messages
-        self.fail_callback =  fail_callback
-        threading.Thread.__init__(self)
-
-    def run(self):
-        for message in self.messages:
-            try:
-                message.send()
-            except Exception as e:
-                # TODO: Add a log right here
-                print(str(e))
-                if self.fail_callback:
-                    self.fail_callback(message)
+from .jobs import JobQueue
+
+
+def encode_content(content):
+    if isinstance(content, bytes):
+        return {"base64": base64.b64encode(content).decode()}
+    return content
+
+
+def decode_content(content):
+    if isinstance(content, dict):
+        return base64.b64decode(content["base64"])
+    return content
+
+
+def serialize_message(message):
+    """EmailMessage/EmailMultiAlternatives -> JSON-compatible dict (job payload)."""
+    return {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": list(message.to),
+        "cc": list(message.cc),
+        "bcc": list(message.bcc),
+        "reply_to": list(message.reply_to),
+        "headers": dict(message.extra_headers),
+        "content_subtype": message.content_subtype,
+        "alternatives": [
+            [content, mimetype] for content, mimetype in getattr(message, "alternatives", [])
+        ],
+        "attachments": [
+            [filename, encode_content(content), mimetype]
+            for filename, content, mimetype in message.attachments
+        ],
+    }
+
+
+def deserialize_message(data):
+    message = EmailMultiAlternatives(
+        subject=data["subject"],
+        body=data["body"],
+        from_email=data["from_email"],
+        to=data["to"],
+        cc=data["cc"],
+        bcc=data["bcc"],
+        reply_to=data["reply_to"],
+        headers=data["headers"],
+        alternatives=[tuple(alternative) for alternative in data["alternatives"]],
+    )
+    message.content_subtype = data["content_subtype"]
+    for filename, content, mimetype in data["attachments"]:
+        message.attach(filename, decode_content(content), mimetype)
+    return message
+
+
+def send_email_job(message):
+    """JobQueue handler: send one serialized message."""
+    deserialize_message(message).send()
 
 
 class Mailing:
+    """
+    Messages are sent by the job worker (`python manage.py run_jobs`, queue "mail"),
+    so requests do not wait for SMTP and failed sends are retried.
+    """
+
     @staticmethod
     def asyn_send_messages(messages):
-        MailingThread(messages=messages).start()
+        for message in messages:
+            JobQueue.enqueue(
+                "base.services.mailing.send_email_job",
+                {"message": serialize_message(message)},
+                queue="mail",
+            )
 
-    @staticmethod
-    def asyn_send_message(message):
-        MailingThread(messages=[message]).start()
+    @classmethod
+    def asyn_send_message(cls, message):
+        cls.asyn_send_messages([message])
 
     @classmethod
     def create_html_message(cls, data, attachment=None, headers=None):
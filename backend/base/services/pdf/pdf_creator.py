@@ -3,12 +3,16 @@ from os.path import join
 from reportlab.lib import pdfencrypt
 from xhtml2pdf import pisa
 from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.template.loader import get_template
 from django.contrib.staticfiles import finders
 from reportlab.pdfbase import pdfmetrics
 from reportlab.rl_config import TTFSearchPath
 from reportlab.pdfbase.ttfonts import TTFont
 
+from ..jobs import JobQueue
+
 # Only for windows:
 # from xhtml2pdf import pisa, default
 # from xhtml2pdf.default import DEFAULT_CSS
@@ -83,3 +87,24 @@ class PdfCreator:
             link_callback=cls.link_callback,
             encrypt=enc,
         )
+
+    @classmethod
+    def asyn_create_pdf(cls, template_path, name, context=None, password=None):
+        """
+        Render the PDF in the job worker (queue "pdf") and save it as `name` in the
+        default storage. `context` must be JSON-serializable.
+        """
+        return JobQueue.enqueue(
+            "base.services.pdf.pdf_creator.render_pdf_job",
+            {"template_path": template_path, "name": name, "context": context, "password": password},
+            queue="pdf",
+        )
+
+
+def render_pdf_job(template_path, name, context=None, password=None):
+    """JobQueue handler: render `template_path` to a PDF stored as `name`."""
+    pdf = PdfCreator.create_pdf(template_path, dest_bytes=True, context=context, password=password)
+    if isinstance(pdf, bytes):
+        default_storage.save(name, ContentFile(pdf))
+        return
+    raise RuntimeError(f"Could not render {template_path}: {pdf.err} error(s)")
@@ -1,34 +1,24 @@
-import threading
 from .implement import Twilio
+from .jobs import JobQueue
 
-class SMSThread(threading.Thread):
-    def __init__(
-        self,
-        messages=None,
-        fail_callback=None
-    ):
-        self.executer = Twilio()
-        self.messages =  messages
-        self.fail_callback =  fail_callback
-        threading.Thread.__init__(self)
 
-    def run(self):
-        for message in self.messages:
-            try:
-                self.executer.send_sms(message.get("to"), message.get("content"));
-            except Exception as e:
-                # TODO: Add a log right here
-                print(str(e))
-                if self.fail_callback:
-                    self.fail_callback(message)
+def send_sms_job(to, content):
+    """JobQueue handler: send one text message through Twilio."""
+    Twilio().send_sms(to, content)
 
 
 class SMS:
+    """Text messages are sent by the job worker (queue "sms"), see JobQueue."""
+
     @staticmethod
     def asyn_send_messages(messages):
-        SMSThread(messages=messages).start()
+        for message in messages:
+            JobQueue.enqueue(
+                "base.services.sms.send_sms_job",
+                {"to": message.get("to"), "content": message.get("content")},
+                queue="sms",
+            )
 
     @staticmethod
     def asyn_send_message(message):
-        SMSThread(messages=[message]).start()
-
+        SMS.asyn_send_messages([message])
@@ -0,0 +1,77 @@
+import hashlib
+import posixpath
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+try:
+    from storages.backends.s3 import S3Storage
+except ImportError:  # django-storages/boto3 are only needed for FILE_STORAGE_BACKEND=s3
+    S3Storage = None
+
+# Length of the content digest directory inserted into every stored path.
+HASH_LENGTH = 16
+
+
+def file_url(name):
+    """Absolute URL of a stored file, served under /api/v1/files/ (see base.views.files)."""
+    default_host = getattr(settings, "DEFAULT_HOST", "localhost:8008")
+    default_scheme = getattr(settings, "DEFAULT_SCHEME", "http")
+    path = name.replace("\\", "/")
+    return f"{default_scheme}://{default_host}/api/v1/files/{path}"
+
+
+def content_hash(content, chunk_size=64 * 1024):
+    """sha256 of a django File, read in chunks and rewound afterwards."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks(chunk_size):
+        digest.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(name, digest):
+    """products/1/images/a.png -> products/1/images/<digest>/a.png"""
+    directory, filename = posixpath.split(name.replace("\\", "/"))
+    return posixpath.join(directory, digest[:HASH_LENGTH], filename)
+
+
+def is_hashed_name(name):
+    parts = name.replace("\\", "/").split("/")
+    if len(parts) < 2 or len(parts[-2]) != HASH_LENGTH:
+        return False
+    try:
+        int(parts[-2], 16)
+    except ValueError:
+        return False
+    return True
+
+
+class ContentHashMixin:
+    """
+    Store every file under a directory named after its content digest.
+    Paths never change content, so they can be cached forever (see base.views.files),
+    and uploading the same bytes twice reuses the stored file.
+    """
+
+    def _save(self, name, content):
+        name = hashed_name(name, content_hash(content))
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+    def get_available_name(self, name, max_length=None):
+        # The digest already makes the name unique; an existing name holds the same bytes.
+        return name
+
+
+class HashedFileSystemStorage(ContentHashMixin, FileSystemStorage):
+    pass
+
+
+if S3Storage is not None:
+
+    class HashedS3Storage(ContentHashMixin, S3Storage):
+        """S3 or an S3-compatible store (MinIO), configured through the AWS_* settings."""
+
+        file_overwrite = True
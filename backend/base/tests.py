@@ -1,3 +1,421 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import threading
+import time
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from io import BytesIO
+from types import SimpleNamespace
+from unittest import mock, skipIf
+from urllib.parse import parse_qsl, urlsplit
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+try:
+    from fakeredis import TcpFakeServer
+except ImportError:  # requirements/test.txt
+    TcpFakeServer = None
+try:
+    from moto import mock_aws
+except ImportError:  # requirements/test.txt
+    mock_aws = None
+
+from common.constants import JobStatus
+from contents.models import ShortContent
+from ecommerce.models import Product
+from tools.models import Job
+from ecommerce.views import GoodsReceiptViewSet, OrderViewSet, ProductViewSet
+from .caches import GenerationToken, TieredCache, cache_is_shared, invalidation_timeout
+from .filters import FilterSchema
+from .pagination import CustomPagination
+from .services import ImageDerivatives
+from .services.jobs import JobQueue
+from .storages import HASH_LENGTH, HashedFileSystemStorage, is_hashed_name
+from .views.files import serve_file
+from .utils.query_plan import full_table_scans
+
+
+class GenerationTokenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_replace_on_commit(self):
+        generation = GenerationToken("tests:generation")
+        token = generation.get()
+        self.assertEqual(generation.get(), token)
+        with self.captureOnCommitCallbacks(execute=True):
+            generation.replace()
+            self.assertEqual(generation.get(), token)
+        self.assertNotEqual(generation.get(), token)
+
+    @override_settings(UNSHARED_CACHE_TIMEOUT=20)
+    def test_process_local_cache_bounds_timeouts(self):
+        # No REDIS_URL here: "shared" is a LocMemCache
+        self.assertFalse(cache_is_shared())
+        self.assertEqual(invalidation_timeout(), 20)
+        self.assertEqual(invalidation_timeout(3600), 20)
+        self.assertEqual(invalidation_timeout(5), 5)
+        with mock.patch("base.caches.cache.add", wraps=cache.add) as add:
+            GenerationToken("tests:generation").get()
+        self.assertEqual(add.call_args.args[2], 20)
+
+    def test_shared_cache_keeps_timeouts(self):
+        with mock.patch("base.caches.cache_is_shared", return_value=True):
+            self.assertIsNone(invalidation_timeout())
+            self.assertEqual(invalidation_timeout(3600), 3600)
+
+
+class FilterSchemaTest(TestCase):
+    def test_cache_busters_and_tracking_params_are_ignored(self):
+        schema = ProductViewSet.filter_schema
+        query = schema.build_query({"min_price": "10", "_": "1718000000", "utm_source": "mail"})
+        self.assertEqual(query, schema.build_query({"min_price": "10"}))
+
+    def test_unknown_params_are_rejected(self):
+        with self.assertRaises(ValidationError) as raised:
+            ProductViewSet.filter_schema.build_query({"min_price": "10", "colour": "red"})
+        self.assertEqual(set(raised.exception.detail), {"colour"})
+
+    def test_wrong_values_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            ProductViewSet.filter_schema.build_query({"min_price": "cheap"})
+
+    def test_filters_use_an_index(self):
+        uuid = "5f0c7a4e-0b53-4a38-9a55-3a8f6b4d8f10"
+        cases = [
+            (ProductViewSet, {"min_price": "1", "max_price": "5"}),
+            (ProductViewSet, {"categories[]": [uuid, uuid]}),
+            (OrderViewSet, {"customer": uuid, "order_status": "1"}),
+            (GoodsReceiptViewSet, {"reference_code": "GR-1"}),
+        ]
+        for viewset, params in cases:
+            with self.subTest(viewset=viewset.__name__, params=params):
+                queryset = viewset.queryset.model.objects.all()
+                self.assertEqual(viewset.filter_schema.explain(queryset, params), [])
+
+    def test_unindexed_filters_are_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            FilterSchema(Product, {"weight": "weight"})
+        # The check itself: an unindexed column is reported as a full scan
+        self.assertEqual(full_table_scans(Product.objects.filter(weight=1)), [Product._meta.db_table])
+
+
+@skipIf(TcpFakeServer is None, "fakeredis is not installed")
+class TieredCacheTest(TestCase):
+    """Two TieredCache instances (two workers) over one Redis, served by fakeredis."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = TcpFakeServer(("127.0.0.1", 0))
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        host, port = cls.server.server_address
+        cls.settings = override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "redis": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": f"redis://{host}:{port}/0"},
+        })
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        # A fresh channel per test, so listeners of earlier tests stay out of it
+        options = {"SHARED": "redis", "CHANNEL": f"cache:invalidate:{self._testMethodName}", "L1_TIMEOUT": 60}
+        self.first = TieredCache(None, {"OPTIONS": options})
+        self.second = TieredCache(None, {"OPTIONS": options})
+        self.first.clear()
+
+    def eventually(self, check, timeout=2):
+        deadline = time.monotonic() + timeout
+        while not check():
+            if time.monotonic() > deadline:
+                self.fail("the change was not seen in time")
+            time.sleep(0.02)
+
+    def test_writes_invalidate_the_other_process(self):
+        self.first.set("price", 1)
+        self.assertEqual(self.second.get("price"), 1)
+        self.assertEqual(self.second.stats()["shared_hits"], 1)
+        self.assertEqual(self.second.get("price"), 1)
+        self.assertEqual(self.second.stats()["l1_hits"], 1)
+
+        self.first.set("price", 2)
+        self.eventually(lambda: self.second.get("price") == 2)
+        self.first.delete("price")
+        self.eventually(lambda: self.second.get("price") is None)
+
+    def test_add_and_incr_run_on_the_shared_cache(self):
+        self.assertTrue(self.first.add("counter", 1))
+        self.assertFalse(self.second.add("counter", 5))
+        self.assertEqual(self.second.get("counter"), 1)
+        self.assertEqual(self.first.incr("counter"), 2)
+        self.assertEqual(self.second.incr("counter", 10), 12)
+        self.eventually(lambda: self.first.get("counter") == 12)
+
+    def test_l1_is_bypassed_while_unsubscribed(self):
+        self.first.set("stock", 5)
+        self.assertEqual(self.second.get("stock"), 5)
+        # A write that is never published: a subscribed process keeps its L1 copy...
+        self.first.shared.set("stock", 4)
+        self.assertEqual(self.second.get("stock"), 5)
+        # ...and reads the shared cache while it cannot hear about changes.
+        self.second._listening.clear()
+        self.assertFalse(self.second.l1_enabled())
+        self.assertEqual(self.second.get("stock"), 4)
+
+
+class HashedStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = HashedFileSystemStorage(location=self.location)
+
+    def test_same_content_same_name(self):
+        first = self.storage.save("products/1/a.txt", ContentFile(b"hello"))
+        second = self.storage.save("products/1/a.txt", ContentFile(b"hello"))
+        other = self.storage.save("products/1/a.txt", ContentFile(b"world"))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(is_hashed_name(first))
+        self.assertEqual(first.split("/")[-1], "a.txt")
+        self.assertEqual(len(first.split("/")[-2]), HASH_LENGTH)
+        with self.storage.open(first) as file:
+            self.assertEqual(file.read(), b"hello")
+
+
+class ImageDerivativesTest(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = HashedFileSystemStorage(location=self.location)
+
+    def upload(self, width, color="red"):
+        buffer = BytesIO()
+        Image.new("RGB", (width, width // 2), color).save(buffer, "PNG")
+        name = self.storage.save("products/1/photo.png", ContentFile(buffer.getvalue()))
+        return SimpleNamespace(storage=self.storage, name=name)
+
+    def test_small_image_is_listed_with_its_own_width(self):
+        variants = ImageDerivatives.generate(self.upload(100))
+        self.assertEqual(sorted(key for key in variants if key.isdigit()), ["100"])
+        srcset = ImageDerivatives.srcset(variants, lambda name: f"/media/{name}")
+        self.assertTrue(srcset["webp"].endswith(" 100w"))
+        self.assertNotIn("160w", srcset["jpeg"])
+
+    def test_replaced_image_copies_are_deleted(self):
+        old = ImageDerivatives.generate(self.upload(600))
+        new = ImageDerivatives.generate(self.upload(600, "blue"))
+        self.assertEqual(sorted(key for key in new if key.isdigit()), ["160", "480"])
+        ImageDerivatives.delete_files(self.storage, old, keep=new)
+        for name in ImageDerivatives.file_names(old):
+            self.assertFalse(self.storage.exists(name))
+        for name in ImageDerivatives.file_names(new):
+            self.assertTrue(self.storage.exists(name))
+
+
+class ServeFileTest(SimpleTestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        storage = HashedFileSystemStorage(location=location)
+        self.name = storage.save("docs/file.bin", ContentFile(self.content))
+        patcher = mock.patch("base.views.files.default_storage", storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+
+    def get(self, method="get", **headers):
+        response = serve_file(getattr(self.factory, method)("/", **headers), self.name)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_file_with_validators(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response["ETag"], f'"{self.name.split("/")[-2]}"')
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_not_modified(self):
+        etag = self.get()[0]["ETag"]
+        response, body = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(body, b"")
+
+    def test_ranges(self):
+        response, body = self.get(HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[10:20])
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.content)}")
+
+        response, body = self.get(HTTP_RANGE="bytes=-5")
+        self.assertEqual(body, self.content[-5:])
+
+        # A stale If-Range gets the whole file
+        response, body = self.get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(HTTP_RANGE=f"bytes={len(self.content)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+    def test_head_and_missing_file(self):
+        response, body = self.get(method="head")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["Content-Length"]), len(self.content))
+        with self.assertRaises(Http404):
+            serve_file(self.factory.get("/"), "docs/missing.bin")
+
+
+@skipIf(mock_aws is None, "moto is not installed")
+@override_settings(
+    AWS_ACCESS_KEY_ID="test",
+    AWS_SECRET_ACCESS_KEY="test",
+    AWS_STORAGE_BUCKET_NAME="media",
+    AWS_S3_REGION_NAME="us-east-1",
+    AWS_S3_ENDPOINT_URL=None,
+)
+class HashedS3StorageTest(SimpleTestCase):
+    """HashedS3Storage (S3 or MinIO) against moto's in-memory S3."""
+
+    def setUp(self):
+        import boto3
+        from .storages import HashedS3Storage
+
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="media")
+        self.storage = HashedS3Storage()
+
+    def test_same_content_same_key(self):
+        first = self.storage.save("products/1/a.txt", ContentFile(b"hello"))
+        second = self.storage.save("products/1/a.txt", ContentFile(b"hello"))
+        self.assertEqual(first, second)
+        self.assertTrue(is_hashed_name(first))
+        self.assertNotEqual(self.storage.save("products/1/a.txt", ContentFile(b"world")), first)
+        with self.storage.open(first) as file:
+            self.assertEqual(file.read(), b"hello")
+
+    def test_serve_file_redirects_to_the_object_store(self):
+        name = self.storage.save("docs/a.txt", ContentFile(b"hello"))
+        with mock.patch("base.views.files.default_storage", self.storage):
+            response = serve_file(RequestFactory().get("/"), name)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(name, response["Location"])
+
+
+@override_settings(JOBS_EAGER=False, JOB_LOCK_TIMEOUT=600)
+class JobQueueTest(TestCase):
+    def test_heartbeat_keeps_a_long_job_claimed(self):
+        job = JobQueue.enqueue("base.services.mailing.send_email_job", queue="test")
+        self.assertEqual([claimed.pk for claimed in JobQueue.claim(1, ["test"], "worker-a")], [job.pk])
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+
+        # Still running an hour later: the heartbeat keeps other workers off it
+        Job.objects.filter(pk=job.pk).update(locked_at=an_hour_ago)
+        self.assertEqual(JobQueue.heartbeat([job.pk], "worker-b"), 0)
+        self.assertEqual(JobQueue.heartbeat([job.pk], "worker-a"), 1)
+        self.assertEqual(JobQueue.claim(1, ["test"], "worker-b"), [])
+
+        # Without heartbeats (a crashed worker) the job is claimed again
+        Job.objects.filter(pk=job.pk).update(locked_at=an_hour_ago)
+        self.assertEqual([claimed.pk for claimed in JobQueue.claim(1, ["test"], "worker-b")], [job.pk])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), (JobStatus.RUNNING, "worker-b", 2))
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.rows = [ShortContent.objects.create(origin=str(i), created_at=now - timedelta(minutes=i)) for i in range(5)]
+        # Two rows share a created_at across a page boundary, the id breaks the tie
+        ShortContent.objects.filter(pk=self.rows[2].pk).update(created_at=self.rows[1].created_at)
+        newest_first = sorted(ShortContent.objects.all(), key=lambda row: (row.created_at, row.pk), reverse=True)
+        self.newest_first = [row.origin for row in newest_first]
+
+    def page(self, url="/", **params):
+        params.setdefault("pagination", "cursor")
+        params.setdefault("page_size", 2)
+        request = Request(APIRequestFactory().get(url, params))
+        paginator = CustomPagination()
+        paginator.page_size = 2
+        rows = paginator.paginate_queryset(ShortContent.objects.all(), request)
+        return [row.origin for row in rows], paginator.get_paginated_response([]).data
+
+    def follow(self, link):
+        url = urlsplit(link)
+        return self.page(url.path, **dict(parse_qsl(url.query)))
+
+    def test_forward_and_backward(self):
+        first, data = self.page()
+        self.assertEqual(first, self.newest_first[:2])
+        self.assertIsNone(data["links"]["previous"])
+        self.assertIsNone(data["count"])
+
+        second, data = self.follow(data["links"]["next"])
+        self.assertEqual(second, self.newest_first[2:4])
+        third, data = self.follow(data["links"]["next"])
+        self.assertEqual(third, self.newest_first[4:])
+        self.assertIsNone(data["links"]["next"])
+
+        back, data = self.follow(data["links"]["previous"])
+        self.assertEqual(back, self.newest_first[2:4])
+        back, data = self.follow(data["links"]["previous"])
+        self.assertEqual(back, self.newest_first[:2])
+        self.assertIsNone(data["links"]["previous"])
+
+    def test_ascending_order(self):
+        rows = []
+        link = None
+        while True:
+            page, data = self.follow(link) if link else self.page(ordering="created_at")
+            rows += page
+            link = data["links"]["next"]
+            if link is None:
+                break
+        self.assertEqual(rows, self.newest_first[::-1])
+
+    def test_unsupported_ordering_is_refused(self):
+        with self.assertRaises(ValidationError):
+            self.page(ordering="origin")
+        self.assertEqual(self.page(ordering="-created_at")[0], self.newest_first[:2])
+
+    def test_invalid_cursor_is_refused(self):
+        _, data = self.page()
+        cursor = dict(parse_qsl(urlsplit(data["links"]["next"]).query))["cursor"]
+        tampered = [cursor[:-3], "not-a-cursor", "W10", "WyJub3ciLCAiMSIsIGZhbHNlXQ"]
+        # A valid date with an id that is not a UUID
+        tampered.append(urlsafe_b64encode(json.dumps([timezone.now().isoformat(), "1", False]).encode()).decode())
+        for value in tampered:
+            with self.subTest(cursor=value), self.assertRaises(ValidationError):
+                self.page(cursor=value)
+
+    def test_count(self):
+        self.assertEqual(self.page(count="exact")[1]["count"], 5)
+        with mock.patch("base.pagination.estimated_count", return_value=1000):
+            self.assertEqual(self.page(count="approximate")[1]["count"], 1000)
+        # Without statistics (sqlite) the approximate count is exact
+        with mock.patch("base.pagination.estimated_count", return_value=None):
+            self.assertEqual(self.page(count="approximate")[1]["count"], 5)
 
-# Create your tests here.
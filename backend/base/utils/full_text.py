@@ -0,0 +1,39 @@
+import re
+
+from django.db.models import Lookup
+from django.db.models.lookups import IContains
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default).
+MYSQL_MIN_TOKEN = 3
+TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def boolean_query(keyword):
+    """
+    "red  shoe!" -> "+red* +shoe*", or None when a word is too short for the FULLTEXT index.
+    """
+    words = TOKEN.findall(keyword)
+    if not words or any(len(word) < MYSQL_MIN_TOKEN for word in words):
+        return None
+    return " ".join(f"+{word}*" for word in words)
+
+
+class FullTextMatch(Lookup):
+    """
+    `field__match="keyword"`: MATCH ... AGAINST in boolean mode on MySQL (needs a FULLTEXT index),
+    icontains elsewhere or for very short words.
+    Register it on a single field: `Model._meta.get_field("search_text").register_lookup(FullTextMatch)`.
+    """
+
+    lookup_name = "match"
+
+    def as_mysql(self, compiler, connection):
+        query = boolean_query(self.rhs)
+        if query is None:
+            return self.as_sql(compiler, connection)
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        return f"MATCH ({lhs}) AGAINST (%s IN BOOLEAN MODE)", [*lhs_params, query]
+
+    def as_sql(self, compiler, connection):
+        return compiler.compile(IContains(self.lhs, self.rhs))
+
@@ -0,0 +1,90 @@
+import json
+import re
+
+from django.db import connections
+
+SQLITE_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)(.*)$")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _mysql_scans(node, tables):
+    if isinstance(node, dict):
+        if node.get("access_type") == "ALL":
+            tables.append(node.get("table_name"))
+        for value in node.values():
+            _mysql_scans(value, tables)
+    elif isinstance(node, list):
+        for value in node:
+            _mysql_scans(value, tables)
+    return tables
+
+
+def full_table_scans(queryset):
+    """
+    Run EXPLAIN for `queryset` and return the tables read without an index.
+    :return: list of table names (empty when every table is reached through an index)
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == "mysql":
+        return _mysql_scans(json.loads(queryset.explain(format="json")), [])
+    plan = queryset.explain()
+    if vendor == "postgresql":
+        return POSTGRES_SCAN.findall(plan)
+    tables = []
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if match and "INDEX" not in match.group(2) and "PRIMARY KEY" not in match.group(2):
+            tables.append(match.group(1))
+    return tables
+
+
+def _mysql_estimate(node, rows):
+    if isinstance(node, dict):
+        if "rows_produced_per_join" in node:
+            rows.append(node["rows_produced_per_join"])
+        for value in node.values():
+            _mysql_estimate(value, rows)
+    elif isinstance(node, list):
+        for value in node:
+            _mysql_estimate(value, rows)
+    return rows
+
+
+def estimated_count(queryset):
+    """
+    Row count estimate without running COUNT(*).
+    An unfiltered queryset reads the table statistics, a filtered one the planner's estimate.
+    :return: int, or None when the database has no cheap estimate (e.g. sqlite)
+    """
+    connection = connections[queryset.db]
+    vendor = connection.vendor
+    table = queryset.model._meta.db_table
+    filtered = bool(queryset.query.where)
+
+    if vendor == "mysql":
+        if not filtered:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    [table],
+                )
+                row = cursor.fetchone()
+            return int(row[0]) if row and row[0] is not None else None
+        rows = _mysql_estimate(json.loads(queryset.explain(format="json")), [])
+        return int(float(rows[-1])) if rows else None
+
+    if vendor == "postgresql":
+        if not filtered:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(table)],
+                )
+                row = cursor.fetchone()
+            # -1 means the table was never analyzed.
+            return int(row[0]) if row and row[0] >= 0 else None
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    return None
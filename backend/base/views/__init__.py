@@ -1,3 +1,4 @@
 from .base import BaseViewSet, MultipleUpdateViewSet
 from .view_only import ViewOnlyViewSet
+from .tree import TreeViewMixin
 from .ai_search import AISearchViewSet
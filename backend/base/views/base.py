@@ -3,6 +3,7 @@ from django.db.models import Q
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from drf_nested_forms.utils import NestedForm
+from base.filters import FilterSchema, INVALID_VALUES
 
 
 class BaseViewSet(viewsets.ModelViewSet):
@@ -12,6 +13,16 @@ class BaseViewSet(viewsets.ModelViewSet):
     required_alternate_scopes = {}
     serializer_map = {}
     export_model = False
+    # Allowed list filters, e.g. {"min_price": "price__gte"}. See base.filters.FilterSchema.
+    # When None, every query param is tried as an exact filter (legacy behaviour).
+    filter_map = None
+    filter_schema = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        filter_map = cls.__dict__.get("filter_map")
+        if filter_map is not None:
+            cls.filter_schema = FilterSchema(cls.queryset.model, filter_map)
 
     def get_queryset(self):
         """
@@ -67,6 +78,14 @@ class BaseViewSet(viewsets.ModelViewSet):
         ordering = params.get('ordering', None)
         if ordering is not None:
             del params['ordering']
+        # Keyset pagination params, see base.pagination.CustomPagination
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, 'is_cursor_request'):
+            if paginator.is_cursor_request(request) and page_size is None:
+                page_size = paginator.get_page_size(request)
+            for param in (paginator.cursor_query_param, paginator.mode_query_param,
+                          paginator.count_query_param):
+                params.pop(param, None)
 
         # Normalize aliases and handle category_id
         # If category_id exists, convert it for proper filtering
@@ -82,7 +101,7 @@ class BaseViewSet(viewsets.ModelViewSet):
             del params['category']
 
         # Remove invalid placeholder values
-        invalid_values = {"NaN", "nan", "undefined", "null", "None", "", "Null"}
+        invalid_values = INVALID_VALUES
 
         query = None
         if keyword and len(self.search_map) > 0:
@@ -95,35 +114,41 @@ class BaseViewSet(viewsets.ModelViewSet):
                     # Field doesn't exist or invalid, skip it
                     continue
 
-        for param, value in params.items():
-            # Ignore empty or invalid values
-            if value is None or (isinstance(value, str) and value.strip() in invalid_values):
-                continue
+        if self.filter_schema is not None:
+            params.pop('format', None)
+            filters = self.filter_schema.build_query(params)
+            if filters:
+                queryset = queryset.filter(filters)
+        else:
+            for param, value in params.items():
+                # Ignore empty or invalid values
+                if value is None or (isinstance(value, str) and value.strip() in invalid_values):
+                    continue
             
-            # Skip parameters that are purely numeric (likely malformed URL encoding)
-            # or contain only special characters that aren't valid field names
-            if param.isdigit() or not param.replace('_', '').replace('-', '').isalnum():
-                continue
+                # Skip parameters that are purely numeric (likely malformed URL encoding)
+                # or contain only special characters that aren't valid field names
+                if param.isdigit() or not param.replace('_', '').replace('-', '').isalnum():
+                    continue
                 
-            try:
-                if param[-2:] == '[]':
-                    values = params.getlist(param)
-                    # Filter out invalid values from the list
-                    valid_values = [v for v in values if v not in invalid_values]
-                    if not valid_values:
-                        continue
-                    kwargs = {'{0}__in'.format(param.rstrip('[]')): valid_values}
-                else:
-                    kwargs = {'{0}__exact'.format(param): value}
+                try:
+                    if param[-2:] == '[]':
+                        values = params.getlist(param)
+                        # Filter out invalid values from the list
+                        valid_values = [v for v in values if v not in invalid_values]
+                        if not valid_values:
+                            continue
+                        kwargs = {'{0}__in'.format(param.rstrip('[]')): valid_values}
+                    else:
+                        kwargs = {'{0}__exact'.format(param): value}
                 
-                # Try to build the query
-                if query is None:
-                    query = Q(**kwargs)
-                else:
-                    query = query & Q(**kwargs)
-            except Exception:
-                # Field doesn't exist or other error, skip this parameter
-                continue
+                    # Try to build the query
+                    if query is None:
+                        query = Q(**kwargs)
+                    else:
+                        query = query & Q(**kwargs)
+                except Exception:
+                    # Field doesn't exist or other error, skip this parameter
+                    continue
 
         # Wrap filter in try-except to handle FieldError gracefully
         if query is not None:
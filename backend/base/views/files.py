@@ -0,0 +1,120 @@
+import mimetypes
+import re
+
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from base.storages import HASH_LENGTH, is_hashed_name
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+
+def file_etag(name, size, modified):
+    if is_hashed_name(name):
+        return quote_etag(name.replace("\\", "/").split("/")[-2][:HASH_LENGTH])
+    return quote_etag("{0:x}-{1:x}".format(size, int(modified.timestamp())))
+
+
+def parse_range(header, size):
+    """
+    :return: (start, end) inclusive, None to send the whole file,
+             or False when the range can not be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: serve the full file.
+        return None
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(file, start, end):
+    try:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+@require_safe
+def serve_file(request, name):
+    """
+    Serve `name` from the default storage with ETag/Last-Modified, conditional GET
+    and single byte-range support. Object stores are redirected to, they answer those themselves.
+    """
+    storage = default_storage
+    try:
+        storage.path(name)
+    except NotImplementedError:
+        return HttpResponseRedirect(storage.url(name))
+
+    if not storage.exists(name):
+        raise Http404
+
+    size = storage.size(name)
+    modified = storage.get_modified_time(name)
+    etag = file_etag(name, size, modified)
+    last_modified = int(modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        byte_range = None
+        range_header = request.META.get("HTTP_RANGE")
+        if range_header and request.META.get("HTTP_IF_RANGE", etag) in (etag, http_date(last_modified)):
+            byte_range = parse_range(range_header, size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        elif request.method == "HEAD":
+            response = HttpResponse(content_type=content_type)
+            response["Content-Length"] = size
+        elif byte_range is None:
+            response = FileResponse(storage.open(name, "rb"), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(storage.open(name, "rb"), start, end),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Length"] = end - start + 1
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    response["Cache-Control"] = (
+        IMMUTABLE_CACHE_CONTROL if is_hashed_name(name) else DEFAULT_CACHE_CONTROL
+    )
+    return response
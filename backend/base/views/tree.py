@@ -0,0 +1,42 @@
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from common.constants import Http
+
+
+class TreeViewMixin:
+    """
+    `GET .../tree/` for viewsets of TreeModel nodes: the filtered queryset nested by parent
+    (see base.serializers.TreeSerializer) from one query, or only the subtree of `?root=<id>`.
+    Map "tree" to a TreeSerializer in `serializer_map`.
+    """
+
+    # Parents come before their children; `tree_ordering` orders the siblings.
+    tree_ordering = ()
+
+    def filter_tree_queryset(self, queryset):
+        """Hook for filters that only apply to the tree, e.g. query params."""
+        return queryset
+
+    def get_tree_queryset(self):
+        queryset = self.filter_tree_queryset(self.filter_queryset(self.get_queryset()))
+        root_id = self.request.query_params.get("root")
+        if root_id:
+            try:
+                root = queryset.filter(pk=root_id).first()
+            except (ValueError, ValidationError):
+                root = None
+            if root is None:
+                raise Http404
+            queryset = queryset.filter(root.subtree_filter(include_self=True))
+        return queryset.order_by("tree_depth", *self.tree_ordering)
+
+    def tree_response(self, request):
+        serializer = self.get_serializer(self.get_tree_queryset(), many=True)
+        return Response(serializer.data)
+
+    @action(methods=[Http.HTTP_GET], detail=False)
+    def tree(self, request, *args, **kwargs):
+        return self.tree_response(request)
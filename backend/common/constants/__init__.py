@@ -6,4 +6,5 @@ from .data_type import DataType
 from .language import Language
 from .http import Http
 from .message import ResponseMessages
-from .work_day import WorkDay
\ No newline at end of file
+from .work_day import WorkDay
+from .job_status import JobStatus
\ No newline at end of file
@@ -0,0 +1,15 @@
+from django.utils.translation import gettext as _
+from .base import Const
+
+
+class JobStatus(Const):
+    PENDING = 0
+    RUNNING = 1
+    DONE = 2
+    DEAD = 3
+    CHOICES = (
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (DONE, _("Done")),
+        (DEAD, _("Dead")),
+    )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LocalizationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contents'
+
+    def ready(self):
+        import contents.signals
@@ -0,0 +1,95 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+from ..services import get_content_loader
+
+
+class BatchLoadedContentMixin:
+    """
+    Resolve a content foreign key through the request's ContentLoader, so a list of
+    rows loads all its contents and translates at once instead of one row at a time.
+    Contents already loaded on the instance (select_related / prefetch_related) are used as they are.
+    """
+
+    def get_attribute(self, instance):
+        if len(self.source_attrs) != 1 or not hasattr(instance, "_meta"):
+            return super().get_attribute(instance)
+        try:
+            field = instance._meta.get_field(self.source_attrs[0])
+        except FieldDoesNotExist:
+            return super().get_attribute(instance)
+        if not field.many_to_one or field.is_cached(instance):
+            return super().get_attribute(instance)
+
+        model = self.Meta.model
+        content_id = getattr(instance, field.attname)
+        if content_id is None:
+            return None
+        loader = get_content_loader(self.context)
+        if not loader.has(model, content_id):
+            loader.load(model, {content_id} | self.sibling_content_ids(instance, field))
+        content = loader.get(model, content_id)
+        if content is not None:
+            field.set_cached_value(instance, content)
+        return content
+
+    def sibling_content_ids(self, instance, field):
+        """Content ids of the rows serialized in the same list as `instance`."""
+        list_serializer = getattr(self.parent, "parent", None)
+        if not isinstance(list_serializer, serializers.ListSerializer):
+            return set()
+        if isinstance(list_serializer.instance, BaseManager):
+            return set()
+        rows = self.list_rows(list_serializer)
+        if rows is not None:
+            # The root list: a page or an evaluated queryset.
+            return {getattr(row, field.attname, None) for row in rows}
+
+        # A nested list (e.g. receipt.items) keeps no instance: take the rows of every
+        # parent in the enclosing list, from their prefetched relation when there is one,
+        # otherwise with one query for all the parents.
+        relation = self.parent_relation(list_serializer, type(instance))
+        if relation is None:
+            return set()
+        parent_field = relation.field
+        parents = self.list_rows(getattr(list_serializer.parent, "parent", None))
+        ids = set()
+        parent_ids = set()
+        if parents is None:
+            parent_ids.add(getattr(instance, parent_field.attname))
+        for parent in parents or ():
+            prefetched = getattr(parent, "_prefetched_objects_cache", {}).get(relation.get_cache_name())
+            if prefetched is None:
+                parent_ids.add(getattr(parent, parent_field.target_field.attname))
+            else:
+                ids.update(getattr(row, field.attname, None) for row in prefetched)
+        if parent_ids:
+            ids.update(
+                type(instance)._default_manager.filter(**{f"{parent_field.attname}__in": parent_ids})
+                .values_list(field.attname, flat=True)
+            )
+        return ids
+
+    @staticmethod
+    def list_rows(list_serializer):
+        """The instances of a root ListSerializer, or None when they are not at hand."""
+        if not isinstance(list_serializer, serializers.ListSerializer):
+            return None
+        rows = list_serializer.instance
+        if rows is None or isinstance(rows, BaseManager):
+            return None
+        return getattr(rows, "_result_cache", None) or rows
+
+    @staticmethod
+    def parent_relation(list_serializer, model):
+        parent = list_serializer.parent
+        parent_model = getattr(getattr(parent, "Meta", None), "model", None)
+        if parent_model is None or len(list_serializer.source_attrs) != 1:
+            return None
+        try:
+            relation = parent_model._meta.get_field(list_serializer.source_attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if relation.one_to_many and relation.related_model is model:
+            return relation
+        return None
@@ -1,9 +1,10 @@
 from ..models import LongContent
 from .long_translate import LongTranslateSerializer
 from base.serializers import WritableNestedSerializer
+from .batch import BatchLoadedContentMixin
 
 
-class LongContentSerializer(WritableNestedSerializer):
+class LongContentSerializer(BatchLoadedContentMixin, WritableNestedSerializer):
     translates = LongTranslateSerializer(many=True, required=False)
 
     class Meta:
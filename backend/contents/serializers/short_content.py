@@ -2,8 +2,9 @@ from rest_framework import serializers
 from ..models import ShortContent
 from .short_translate import ShortTranslateSerializer
 from base.serializers import WritableNestedSerializer
+from .batch import BatchLoadedContentMixin
 
-class ShortContentSerializer(WritableNestedSerializer):
+class ShortContentSerializer(BatchLoadedContentMixin, WritableNestedSerializer):
     translates = ShortTranslateSerializer(many=True,required = False)
 
     class Meta:
@@ -0,0 +1 @@
+from .content_loader import ContentLoader, HotContentCache, get_content_loader, hot_contents
@@ -0,0 +1,126 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from ..models import ShortContent, ShortTranslate, LongContent, LongTranslate
+
+# Relations loaded together with each content model; the serializers render them.
+CONTENT_PREFETCHES = {
+    ShortContent: (Prefetch("translates", queryset=ShortTranslate.objects.all()),),
+    LongContent: (Prefetch("translates", queryset=LongTranslate.objects.all()), "attachments"),
+}
+
+
+class HotContentCache:
+    """
+    Process-level LRU of loaded contents (with their translates), for strings that
+    every catalog page repeats. Entries expire after CONTENT_CACHE_SECONDS and are
+    dropped in this process when the content or a translate is saved (see contents.signals);
+    other processes pick up the change when the entry expires.
+    Entries are kept pickled and every hit gets its own copy, so concurrent requests
+    never share (and modify) the same instances.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, model, ids):
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for pk in ids:
+                entry = self._entries.get((model, pk))
+                if entry is None:
+                    continue
+                expires, data = entry
+                if expires < now:
+                    del self._entries[(model, pk)]
+                    continue
+                self._entries.move_to_end((model, pk))
+                found[pk] = data
+        return {pk: pickle.loads(data) for pk, data in found.items()}
+
+    def set_many(self, model, contents):
+        expires = time.monotonic() + self.timeout
+        # Pickled now, while the instances are untouched: the loader hands them to the serializers next.
+        entries = {pk: pickle.dumps(content, pickle.HIGHEST_PROTOCOL) for pk, content in contents.items()}
+        with self._lock:
+            for pk, data in entries.items():
+                self._entries[(model, pk)] = (expires, data)
+                self._entries.move_to_end((model, pk))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, model, pk):
+        with self._lock:
+            self._entries.pop((model, pk), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+hot_contents = HotContentCache(
+    getattr(settings, "CONTENT_CACHE_SIZE", 0), getattr(settings, "CONTENT_CACHE_SECONDS", 300)
+)
+
+
+class ContentLoader:
+    """
+    Batch loader for ShortContent/LongContent, one per request (see `get_content_loader`).
+
+    The content serializers ask for one content at a time; the loader then fetches
+    every content id referenced by the sibling rows of the list being serialized,
+    with their translates, in one query per table, and answers the following rows from memory.
+    """
+
+    def __init__(self):
+        self._contents = {ShortContent: {}, LongContent: {}}
+
+    def has(self, model, pk):
+        return pk in self._contents[model]
+
+    def get(self, model, pk):
+        return self._contents[model].get(pk)
+
+    def load(self, model, ids):
+        loaded = self._contents[model]
+        missing = {pk for pk in ids if pk is not None and pk not in loaded}
+        if not missing:
+            return
+        if hot_contents.max_size:
+            cached = hot_contents.get_many(model, missing)
+            loaded.update(cached)
+            missing.difference_update(cached)
+        if not missing:
+            return
+        contents = {
+            content.pk: content
+            for content in model.objects.filter(pk__in=missing).prefetch_related(*CONTENT_PREFETCHES[model])
+        }
+        loaded.update(contents)
+        if hot_contents.max_size:
+            hot_contents.set_many(model, contents)
+
+
+def get_content_loader(context):
+    """
+    The ContentLoader of the serializer `context`: kept on the request when there is one,
+    so every serializer of the request shares it, otherwise on the context itself.
+    """
+    request = context.get("request")
+    holder = getattr(request, "_request", request)
+    if holder is None:
+        return context.setdefault("content_loader", ContentLoader())
+    loader = getattr(holder, "content_loader", None)
+    if loader is None:
+        loader = ContentLoader()
+        holder.content_loader = loader
+    return loader
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ShortContent, ShortTranslate, LongContent, LongTranslate, Attachment
+from .services import hot_contents
+
+
+# Drop changed contents from the process-level content cache (see HotContentCache)
+@receiver(post_save, sender=ShortContent)
+@receiver(post_delete, sender=ShortContent)
+@receiver(post_save, sender=LongContent)
+@receiver(post_delete, sender=LongContent)
+def forget_content(sender, instance, **kwargs):
+    hot_contents.discard(sender, instance.pk)
+
+
+@receiver(post_save, sender=ShortTranslate)
+@receiver(post_delete, sender=ShortTranslate)
+def forget_short_translate(sender, instance, **kwargs):
+    if instance.content_id:
+        hot_contents.discard(ShortContent, instance.content_id)
+
+
+@receiver(post_save, sender=LongTranslate)
+@receiver(post_delete, sender=LongTranslate)
+def forget_long_translate(sender, instance, **kwargs):
+    if instance.content_id:
+        hot_contents.discard(LongContent, instance.content_id)
+
+
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=Attachment)
+def forget_attachment(sender, instance, **kwargs):
+    if instance.long_content_id:
+        hot_contents.discard(LongContent, instance.long_content_id)
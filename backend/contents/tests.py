@@ -1,3 +1,70 @@
 from django.test import TestCase
+from rest_framework import serializers
 
-# Create your tests here.
+from ecommerce.models import GoodsReceipt, GoodsReceiptItem, Product
+from .models import ShortContent, ShortTranslate
+from .serializers import ShortContentSerializer
+from .services import HotContentCache
+
+
+class ReceiptItemSerializer(serializers.ModelSerializer):
+    unit = ShortContentSerializer(read_only=True)
+
+    class Meta:
+        model = GoodsReceiptItem
+        fields = ["id", "unit"]
+
+
+class ReceiptSerializer(serializers.ModelSerializer):
+    items = ReceiptItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = GoodsReceipt
+        fields = ["id", "items"]
+
+
+class BatchLoadedContentTest(TestCase):
+    receipts = 4
+
+    def setUp(self):
+        product = Product.objects.create(name=ShortContent.objects.create(origin="Shirt"))
+        for number in range(self.receipts):
+            receipt = GoodsReceipt.objects.create(reference_code=f"R{number}")
+            for unit in ("box", "piece"):
+                content = ShortContent.objects.create(origin=f"{unit} {number}")
+                ShortTranslate.objects.create(content=content, value=unit)
+                GoodsReceiptItem.objects.create(receipt=receipt, product=product, unit=content)
+
+    def serialize(self, queryset):
+        data = ReceiptSerializer(queryset, many=True).data
+        self.assertEqual(len(data), self.receipts)
+        self.assertEqual({len(receipt["items"]) for receipt in data}, {2})
+        self.assertTrue(all(item["unit"]["origin"] for receipt in data for item in receipt["items"]))
+
+    def test_nested_contents_of_prefetched_rows(self):
+        # Receipts, items, then contents and translates once for every receipt
+        with self.assertNumQueries(4):
+            self.serialize(GoodsReceipt.objects.prefetch_related("items"))
+
+    def test_nested_contents_without_prefetch(self):
+        # Items are read per receipt, their content ids once for the whole list
+        with self.assertNumQueries(1 + self.receipts + 1 + 2):
+            self.serialize(GoodsReceipt.objects.all())
+
+
+class HotContentCacheTest(TestCase):
+    def test_every_hit_is_a_copy(self):
+        content = ShortContent.objects.create(origin="Shirt")
+        ShortTranslate.objects.create(content=content, value="Áo")
+        content = ShortContent.objects.prefetch_related("translates").get(pk=content.pk)
+        hot = HotContentCache(max_size=10, timeout=60)
+        hot.set_many(ShortContent, {content.pk: content})
+        content.origin = "Changed after caching"
+
+        first = hot.get_many(ShortContent, [content.pk])[content.pk]
+        first.origin = "Changed by a request"
+        second = hot.get_many(ShortContent, [content.pk])[content.pk]
+        self.assertIsNot(first, second)
+        self.assertEqual(second.origin, "Shirt")
+        with self.assertNumQueries(0):
+            self.assertEqual([translate.value for translate in second.translates.all()], ["Áo"])
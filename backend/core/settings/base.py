@@ -259,6 +259,9 @@ OPEN_SEARCH_TIMEOUT = (
     if "OPEN_SEARCH_TIMEOUT" in os.environ
     else env.int("OPEN_SEARCH_TIMEOUT", default=120)
 )
+# Product search uses the `ecommerce_products` index only when enabled,
+# otherwise the database (FULLTEXT on MySQL). Build it with `python manage.py reindex_products`.
+OPEN_SEARCH_ENABLED = env.bool("OPEN_SEARCH_ENABLED", default=False)
 OPENSEARCH_DSL = {
     'default': {
         'hosts': 'localhost:9200',
@@ -277,12 +280,48 @@ OPENSEARCH_DSL = {
     }
 }
 
+# Cache: "default" is an in-process L1 (base.caches.TieredCache) in front of "shared".
+# Set REDIS_URL (e.g. redis://localhost:6379/0) so every worker shares one cache
+# (customer tokens, idempotency keys, response caches); without it "shared" is per process.
+REDIS_URL = env.str("REDIS_URL", default="")
+# Without a shared cache, entries that other workers invalidate through it (public site
+# responses, client site shells, inventory stats) are kept at most this many seconds.
+UNSHARED_CACHE_TIMEOUT = env.int("UNSHARED_CACHE_TIMEOUT", default=30)
+CACHES = {
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": env.str("CACHE_KEY_PREFIX", default="alpha"),
+        }
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "shared"}
+    ),
+    "default": {
+        "BACKEND": "base.caches.TieredCache",
+        "OPTIONS": {
+            "SHARED": "shared",
+            "L1_SIZE": env.int("CACHE_L1_SIZE", default=1000),
+            "L1_TIMEOUT": env.int("CACHE_L1_TIMEOUT", default=5),
+        },
+    },
+}
+
 # NLP
 RASA_ENDPOINT = (
     os.environ["RASA_ENDPOINT"]
     if "RASA_ENDPOINT" in os.environ
     else env.str("RASA_ENDPOINT", default="http://localhost:5008")
 )
+# va.services.nlp.Rasa: pooled connections with timeouts (seconds), GET /status and
+# /version cached for RASA_CACHE_SECONDS, and a circuit breaker that answers 503 for
+# RASA_BREAKER_RESET_SECONDS after RASA_BREAKER_FAILURES failed calls in a row.
+RASA_CONNECT_TIMEOUT = env.float("RASA_CONNECT_TIMEOUT", default=2)
+RASA_READ_TIMEOUT = env.float("RASA_READ_TIMEOUT", default=10)
+RASA_POOL_SIZE = env.int("RASA_POOL_SIZE", default=10)
+RASA_CACHE_SECONDS = env.int("RASA_CACHE_SECONDS", default=5)
+RASA_BREAKER_FAILURES = env.int("RASA_BREAKER_FAILURES", default=5)
+RASA_BREAKER_RESET_SECONDS = env.int("RASA_BREAKER_RESET_SECONDS", default=30)
 
 
 # Application definition
@@ -327,6 +366,7 @@ MIDDLEWARE = [
     # 'django.middleware.csrf.CsrfViewMiddleware',
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "oauth2_provider.middleware.OAuth2TokenMiddleware",
+    "ecommerce.middleware.CustomerContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware"
 ]
@@ -413,6 +453,11 @@ OAUTH2_PROVIDER = {
     # ... any other settings you want
 }
 
+# Verified JWTs are cached per process (oauth.jwt_cache) up to their `exp`;
+# application signing keys are reused for JWT_KEY_CACHE_SECONDS.
+JWT_VERIFIED_CACHE_SIZE = env.int("JWT_VERIFIED_CACHE_SIZE", default=10000)
+JWT_KEY_CACHE_SECONDS = env.int("JWT_KEY_CACHE_SECONDS", default=300)
+
 # Config Django Rest framework
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ["oauth.permissions.TokenHasActionScope"],
@@ -584,6 +629,54 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = (
     else env.int("FILE_UPLOAD_MAX_MEMORY_SIZE", default=20971520)
 )
 FILE_UPLOAD_MAX_MEMORY_SIZE= int(FILE_UPLOAD_MAX_MEMORY_SIZE)
-DEFAULT_FILE_STORAGE = "binary_database_files.storage.DatabaseStorage"
+# Where uploaded files live: "database" (binary_database_files), "local" (MEDIA_ROOT)
+# or "s3" (any S3-compatible store, e.g. MinIO; needs django-storages and boto3).
+# Move existing files with `python manage.py export_database_files`.
+FILE_STORAGE_BACKENDS = {
+    "database": "binary_database_files.storage.DatabaseStorage",
+    "local": "base.storages.HashedFileSystemStorage",
+    "s3": "base.storages.HashedS3Storage",
+}
+FILE_STORAGE_BACKEND = env.str("FILE_STORAGE_BACKEND", default="") or (
+    "s3" if env.bool("STORE_USER_FILES_ON_S3", default=False) else "database"
+)
+DEFAULT_FILE_STORAGE = FILE_STORAGE_BACKENDS[FILE_STORAGE_BACKEND]
+AWS_ACCESS_KEY_ID = env.str("AWS_ACCESS_KEY_ID", default="") or None
+AWS_SECRET_ACCESS_KEY = env.str("AWS_SECRET_ACCESS_KEY", default="") or None
+AWS_STORAGE_BUCKET_NAME = env.str("AWS_STORAGE_BUCKET_NAME", default="") or None
+AWS_S3_REGION_NAME = env.str("AWS_S3_REGION_NAME", default="") or None
+AWS_S3_ENDPOINT_URL = env.str("AWS_S3_ENDPOINT_URL", default="") or None
+AWS_S3_CUSTOM_DOMAIN = env.str("AWS_S3_CUSTOM_DOMAIN", default="") or None
+AWS_QUERYSTRING_AUTH = env.bool("AWS_QUERYSTRING_AUTH", default=True)
+AWS_S3_OBJECT_PARAMETERS = {"CacheControl": "public, max-age=31536000, immutable"}
+# Resized WebP/JPEG copies of product images (base.services.ImageDerivatives).
+# Set IMAGE_DERIVATIVES_ASYNC=False to build them inline, e.g. in scripts.
+IMAGE_DERIVATIVE_WORKERS = env.int("IMAGE_DERIVATIVE_WORKERS", default=2)
+IMAGE_DERIVATIVES_ASYNC = env.bool("IMAGE_DERIVATIVES_ASYNC", default=True)
+# Public website responses (websites.services.PublicContentCache): kept server side for
+# WEBSITES_PUBLIC_CACHE_TIMEOUT, cacheable by browsers/CDNs for WEBSITES_PUBLIC_MAX_AGE.
+WEBSITES_PUBLIC_CACHE_TIMEOUT = env.int("WEBSITES_PUBLIC_CACHE_TIMEOUT", default=3600)
+WEBSITES_PUBLIC_MAX_AGE = env.int("WEBSITES_PUBLIC_MAX_AGE", default=60)
+# Client site pages (websites.services.ClientSiteCache): hosts kept per process, and
+# seconds before a site is reloaded (Site/Build changes are picked up right away).
+CLIENT_SITE_CACHE_SIZE = env.int("CLIENT_SITE_CACHE_SIZE", default=1000)
+CLIENT_SITE_CACHE_SECONDS = env.int("CLIENT_SITE_CACHE_SECONDS", default=300)
+# Process-level LRU of hot ShortContent/LongContent rows with their translates
+# (contents.services.HotContentCache); 0 disables it.
+CONTENT_CACHE_SIZE = env.int("CONTENT_CACHE_SIZE", default=0)
+CONTENT_CACHE_SECONDS = env.int("CONTENT_CACHE_SECONDS", default=300)
+# Storage of trained NLU model archives (va.NLUModel.file), one of FILE_STORAGE_BACKENDS.
+# Archives run to hundreds of MB; "local" or "s3" keeps them out of the database.
+NLU_MODEL_STORAGE_BACKEND = env.str("NLU_MODEL_STORAGE_BACKEND", default="") or FILE_STORAGE_BACKEND
+# Background jobs (base.services.JobQueue, run by `python manage.py run_jobs`).
+# JOBS_EAGER=True runs them inline instead, e.g. for local development without a worker.
+JOBS_EAGER = env.bool("JOBS_EAGER", default=False)
+JOB_MAX_ATTEMPTS = env.int("JOB_MAX_ATTEMPTS", default=5)
+JOB_RETRY_BACKOFF = env.int("JOB_RETRY_BACKOFF", default=30)
+JOB_RETRY_BACKOFF_MAX = env.int("JOB_RETRY_BACKOFF_MAX", default=3600)
+JOB_LOCK_TIMEOUT = env.int("JOB_LOCK_TIMEOUT", default=600)
+# Workers refresh the lock of their running jobs this often, keep it well under JOB_LOCK_TIMEOUT.
+JOB_HEARTBEAT_INTERVAL = env.int("JOB_HEARTBEAT_INTERVAL", default=60)
+JOB_DONE_RETENTION_DAYS = env.int("JOB_DONE_RETENTION_DAYS", default=7)
 DB_FILES_AUTO_EXPORT_DB_TO_FS = False
 DATABASE_FILES_URL_METHOD = "URL_METHOD_2"
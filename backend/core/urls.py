@@ -33,6 +33,7 @@ from .settings.base import (
 )
 
 from .views import single_page_view
+from base.views.files import serve_file
 from health_check.urls import urlpatterns as health_check_urls
 from .constants_urls import urlpatterns as constants_urls
 
@@ -61,6 +62,10 @@ if DEFAULT_FILE_STORAGE == "binary_database_files.storage.DatabaseStorage":
     urlpatterns += [
         re_path(r'^api/v1/', include('binary_database_files.urls')),
     ]
+else:
+    urlpatterns += [
+        re_path(r'^api/v1/files/(?P<name>.+)$', serve_file, name="file"),
+    ]
 if LOCAL_BUILD and not DEBUG:
     urlpatterns += static(STATIC_URL, documents_root=STATIC_ROOT)
     urlpatterns += static(MEDIA_URL, document_root=MEDIA_ROOT)
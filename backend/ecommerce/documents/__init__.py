@@ -0,0 +1 @@
+from .product import ProductDocument
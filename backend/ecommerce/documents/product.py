@@ -0,0 +1,105 @@
+from django_opensearch_dsl import fields
+from django_opensearch_dsl.registries import registry
+from base.documents import BaseDocument
+from ..models import Product
+
+
+def content_texts(content):
+    """Origin plus every translation of a ShortContent/LongContent."""
+    if content is None:
+        return []
+    texts = [content.origin] + [translate.value for translate in content.translates.all()]
+    return [text for text in texts if text]
+
+
+@registry.register_document
+class ProductDocument(BaseDocument):
+    name = fields.TextField(
+        analyzer='standard',
+        fields={
+            'keyword': fields.KeywordField(),
+        }
+    )
+    # Origin and translations, e.g. ["Áo thun", "T-shirt"]
+    names = fields.TextField(analyzer='standard')
+    descriptions = fields.TextField(analyzer='standard')
+    category_ids = fields.KeywordField()
+    category_names = fields.TextField(analyzer='standard')
+    price = fields.FloatField()
+    available_stock = fields.FloatField()
+    is_low_stock = fields.BooleanField()
+    is_out_of_stock = fields.BooleanField()
+    created_at = fields.DateField()
+
+    class Index:
+        name = 'ecommerce_products'
+        settings = {
+            'number_of_shards': 1,
+            'number_of_replicas': 0,
+            'max_result_window': 10000
+        }
+
+    class Django:
+        model = Product
+        fields = []
+        # Kept in sync by ProductSearchService (ecommerce.signals), batched per transaction
+        ignore_signals = True
+        queryset_pagination = 500
+
+    def get_queryset(self, filter_=None, exclude=None, count=None):
+        """Preload everything `prepare` and ProductSearchService.build_search_text read."""
+        return super().get_queryset(filter_=filter_, exclude=exclude, count=count).select_related(
+            'name', 'unit', 'description', 'inventory'
+        ).prefetch_related(
+            'name__translates', 'unit__translates', 'description__translates', 'categories__name__translates'
+        )
+
+    def prepare(self, instance):
+        names = content_texts(instance.name)
+        categories = list(instance.categories.all())
+        return {
+            'name': instance.name.origin if instance.name else '',
+            'names': names,
+            'descriptions': content_texts(instance.description),
+            'category_ids': [str(category.id) for category in categories],
+            'category_names': [text for category in categories for text in content_texts(category.name)],
+            'price': instance.price,
+            'available_stock': instance.available_stock,
+            'is_low_stock': instance.is_low_stock,
+            'is_out_of_stock': instance.is_out_of_stock,
+            'created_at': instance.created_at,
+        }
+
+    @classmethod
+    def search_ids(cls, keyword, size=1000):
+        """Product ids matching `keyword`, best match first."""
+        search = cls.search().query({
+            "bool": {
+                "should": [
+                    {
+                        "multi_match": {
+                            "query": keyword,
+                            "fields": ["name.keyword^5"],
+                            "type": "phrase",
+                            "boost": 3.0
+                        }
+                    },
+                    {
+                        "multi_match": {
+                            "query": keyword,
+                            "fields": ["name^4", "names^4", "category_names^2", "descriptions"],
+                            "type": "best_fields",
+                            "fuzziness": "AUTO",
+                            "boost": 2.0
+                        }
+                    }
+                ],
+                "minimum_should_match": 1
+            }
+        }).source(False).extra(size=size)
+        return [hit.meta.id for hit in search.execute()]
+
+    @classmethod
+    def get_query_set(cls, **kwargs):
+        keyword = kwargs.get('keyword', None)
+        return Product.objects.filter(pk__in=cls.search_ids(keyword))
@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from ecommerce.services import StatisticService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily dashboard statistics from orders, customers and products'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help='First day to rebuild (YYYY-MM-DD). Defaults to the beginning of history.',
+        )
+        parser.add_argument(
+            '--end',
+            help='Last day to rebuild (YYYY-MM-DD). Defaults to today.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options.get('start') else None
+            end = date.fromisoformat(options['end']) if options.get('end') else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+
+        self.stdout.write(
+            f'Rebuilding daily statistics ({start or "beginning"} → {end or "today"})...'
+        )
+        day_count, product_count = StatisticService.rebuild(start=start, end=end)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Done. Days: {day_count}, product/day rows: {product_count}'
+            )
+        )
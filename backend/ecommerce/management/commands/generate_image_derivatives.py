@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from base.services import ImageDerivatives
+from ecommerce.models import Product, ProductImage
+
+# model, image field, variants field
+TARGETS = [
+    (Product, 'thumbnail', 'thumbnail_variants'),
+    (ProductImage, 'image', 'image_variants'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG copies for product thumbnails and images that lack them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate even when the stored variants are up to date.',
+        )
+
+    def handle(self, *args, **options):
+        for model, field_name, variants_field_name in TARGETS:
+            done = skipped = failed = 0
+            queryset = (
+                model.objects.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .only('id', field_name, variants_field_name)
+                .order_by('id')
+            )
+            for instance in queryset.iterator(chunk_size=200):
+                field_file = getattr(instance, field_name)
+                variants = getattr(instance, variants_field_name)
+                if not options['force'] and ImageDerivatives.is_current(variants, field_file):
+                    skipped += 1
+                    continue
+                try:
+                    ImageDerivatives.update(model, instance.pk, field_name, variants_field_name)
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'{model.__name__} {instance.pk}: {e}')
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{model.__name__}: generated {done}, up to date {skipped}, failed {failed}'
+                )
+            )
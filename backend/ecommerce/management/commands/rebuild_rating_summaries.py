@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from ecommerce.services import RatingService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-product rating summaries from the approved reviews'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding product rating summaries...')
+        count = RatingService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Done. Products with reviews: {count}'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from ecommerce.models import Product
+from ecommerce.services import ProductSearchService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Product.search_text and, when OpenSearch is enabled, the ecommerce_products index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Products per batch (default: 500).',
+        )
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            help='Send each batch to OpenSearch with parallel bulk requests.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if ProductSearchService.opensearch_enabled():
+            from ecommerce.documents import ProductDocument
+            ProductDocument._index.create(ignore=400)
+        else:
+            self.stdout.write('OpenSearch is disabled, only search_text is rebuilt.')
+
+        done = 0
+        last_id = None
+        while True:
+            batch = Product.objects.order_by('id')
+            if last_id is not None:
+                batch = batch.filter(id__gt=last_id)
+            ids = list(batch.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            done += ProductSearchService.refresh(ids, parallel=options['parallel'])
+            last_id = ids[-1]
+            self.stdout.write(f'  {done} products...')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. Products indexed: {done}'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from ecommerce.services import OrderTotalsService
+
+
+class Command(BaseCommand):
+    help = 'Check the stored order totals against the order items, and optionally repair them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Recompute the totals of the orders that do not match their items',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Orders repaired per transaction',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Verifying order totals...')
+        mismatched = OrderTotalsService.verify(repair=options['repair'], batch_size=options['batch_size'])
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS('Done. All order totals match their items'))
+            return
+        for order_id in mismatched[:20]:
+            self.stdout.write(f'  {order_id}')
+        if len(mismatched) > 20:
+            self.stdout.write(f'  ... and {len(mismatched) - 20} more')
+        if options['repair']:
+            self.stdout.write(self.style.SUCCESS(f'Done. Repaired orders: {len(mismatched)}'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'Orders with wrong totals: {len(mismatched)}. Run with --repair to fix them.'
+            ))
@@ -0,0 +1,2 @@
+from .product import ProductManager
+from .order_item import OrderItemManager
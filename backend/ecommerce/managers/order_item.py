@@ -0,0 +1,56 @@
+from django.db import models, transaction
+
+# Writing one of these changes the stored totals of the order (see OrderTotalsService).
+TOTAL_FIELDS = {"amount", "order", "order_id"}
+
+
+class OrderItemQuerySet(models.QuerySet):
+    """
+    Bulk writes refresh the stored totals of the affected orders in the same
+    transaction; save() and delete() do it through the signals.
+    """
+
+    @staticmethod
+    def refresh_totals(order_ids):
+        from ..services import OrderTotalsService
+
+        OrderTotalsService.refresh(order_ids)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            self.refresh_totals({obj.order_id for obj in objs})
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if not TOTAL_FIELDS.intersection(fields):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            order_ids = {obj.order_id for obj in objs}
+            if "order" in fields or "order_id" in fields:
+                order_ids.update(
+                    self.model._base_manager.filter(pk__in=[obj.pk for obj in objs]).values_list("order_id", flat=True)
+                )
+            updated = super().bulk_update(objs, fields, *args, **kwargs)
+            self.refresh_totals(order_ids)
+        return updated
+
+    def update(self, **kwargs):
+        if not TOTAL_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            order_ids = set(self.values_list("order_id", flat=True))
+            updated = super().update(**kwargs)
+            order = kwargs.get("order", kwargs.get("order_id"))
+            if order is not None and not hasattr(order, "resolve_expression"):
+                order_ids.add(getattr(order, "pk", order))
+            self.refresh_totals(order_ids)
+        return updated
+
+    update.alters_data = True
+
+
+class OrderItemManager(models.Manager.from_queryset(OrderItemQuerySet)):
+    pass
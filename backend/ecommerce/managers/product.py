@@ -0,0 +1,92 @@
+from django.db import models
+from django.db.models import BooleanField, Case, F, Prefetch, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+
+class ProductManager(models.Manager):
+    """
+    Querysets for the product catalog.
+    The annotations below are read by the matching Product properties
+    (average_rating, review_count, in_stock, available_stock, is_low_stock, is_out_of_stock),
+    which only fall back to per-row queries when they are missing.
+    """
+
+    def with_rating(self, queryset=None):
+        # Read from ProductRatingSummary: one LEFT JOIN, usable in `ordering=-rating_average`.
+        queryset = self.get_queryset() if queryset is None else queryset
+        return queryset.annotate(
+            rating_average=Coalesce(F("rating_summary__rating_average"), Value(0.0)),
+            rating_count=Coalesce(F("rating_summary__review_count"), Value(0)),
+        )
+
+    def with_stock(self, queryset=None):
+        queryset = self.get_queryset() if queryset is None else queryset
+        return queryset.annotate(
+            stock_quantity=Coalesce(F("inventory__current_quantity"), Value(0.0)),
+            stock_available=Coalesce(
+                Greatest(
+                    F("inventory__current_quantity") - F("inventory__reserved_quantity"), Value(0.0)
+                ),
+                Value(0.0),
+            ),
+            stock_is_low=Case(
+                When(inventory__current_quantity__lte=F("inventory__min_quantity"), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            stock_is_out=Case(
+                When(inventory__isnull=True, then=Value(True)),
+                When(inventory__current_quantity__lte=0, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+
+    def summary_catalog(self):
+        """Everything ProductShortSerializer reads, in a constant number of queries."""
+        from ..models import ProductCategory
+
+        queryset = self.get_queryset().select_related("name", "unit", "inventory").prefetch_related(
+            "name__translates",
+            "unit__translates",
+            Prefetch(
+                "categories",
+                queryset=ProductCategory.objects.select_related("name").prefetch_related("name__translates"),
+            ),
+        )
+        return self.with_stock(queryset)
+
+    def catalog(self, now=None):
+        """
+        Everything ProductSerializer reads, in a constant number of queries.
+        Only promotions running at `now` (default: the current time) are loaded.
+        """
+        from ..models import ProductCategory, Promotion, PromotionItem
+
+        now = now or timezone.now()
+        categories = ProductCategory.objects.select_related("name").prefetch_related("name__translates")
+        promotion_items = PromotionItem.objects.select_related(
+            "product__name", "product__unit", "product__inventory"
+        ).prefetch_related(
+            "product__name__translates",
+            "product__unit__translates",
+            Prefetch("product__categories", queryset=categories),
+        )
+        promotions = Promotion.objects.filter(start__lte=now, end__gte=now).prefetch_related(
+            Prefetch("promotion_items", queryset=promotion_items)
+        )
+        queryset = (
+            self.get_queryset()
+            .select_related("name", "unit", "description", "inventory")
+            .prefetch_related(
+                "name__translates",
+                "unit__translates",
+                "description__translates",
+                "description__attachments",
+                "images",
+                Prefetch("categories", queryset=categories),
+                Prefetch("promotions", queryset=promotions),
+            )
+        )
+        return self.with_rating(self.with_stock(queryset))
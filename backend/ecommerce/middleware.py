@@ -0,0 +1,15 @@
+from .services.customer_context import CustomerContext
+
+
+class CustomerContextMiddleware:
+    """
+    Attach a lazy `request.customer_context` (see CustomerContext) to every request,
+    so plain Django views and DRF views share one resolution per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.customer_context = CustomerContext(request)
+        return self.get_response(request)
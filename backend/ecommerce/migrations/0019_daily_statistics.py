@@ -0,0 +1,51 @@
+# Generated by Django 5.0.4 on 2026-10-18 16:24
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce', '0018_remove_order_bank_reference'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatistic',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField(unique=True)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.FloatField(default=0.0)),
+                ('new_customers', models.IntegerField(default=0)),
+                ('new_products', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'ecommerce_daily_statistics',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductStatistic',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('quantity', models.FloatField(default=0.0)),
+                ('revenue', models.FloatField(default=0.0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_statistics', to='ecommerce.product')),
+            ],
+            options={
+                'db_table': 'ecommerce_daily_product_statistics',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['product', 'date'], name='ecommerce_d_product_b7effe_idx')],
+                'unique_together': {('date', 'product')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.4 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce', '0019_daily_statistics'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='price',
+            field=models.FloatField(blank=True, db_index=True, default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='goodsreceipt',
+            index=models.Index(fields=['is_applied'], name='ecommerce_g_is_appl_2bdcf5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goodsreceipt',
+            index=models.Index(fields=['reference_code'], name='ecommerce_g_referen_c05f30_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goodsreceipt',
+            index=models.Index(fields=['date'], name='ecommerce_g_date_f4b8a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_status'], name='ecommerce_o_order_s_a00eac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['payment_status'], name='ecommerce_o_payment_ed18a7_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.4 on 2026-10-18 16:46
+
+from django.db import migrations, models
+
+
+def content_texts(content):
+    if content is None:
+        return []
+    texts = [content.origin] + [translate.value for translate in content.translates.all()]
+    return [text for text in texts if text]
+
+
+def fill_search_text(apps, schema_editor):
+    """Same text as ProductSearchService.build_search_text, so the database search works right after deploy."""
+    Product = apps.get_model("ecommerce", "Product")
+    products = Product.objects.select_related("name", "unit", "description").prefetch_related(
+        "name__translates",
+        "unit__translates",
+        "description__translates",
+        "categories__name__translates",
+    ).order_by("id")
+    last_id = None
+    while True:
+        batch = products if last_id is None else products.filter(id__gt=last_id)
+        batch = list(batch[:500])
+        if not batch:
+            break
+        for product in batch:
+            parts = content_texts(product.name) + content_texts(product.unit) + content_texts(product.description)
+            for category in product.categories.all():
+                parts += content_texts(category.name)
+            product.search_text = "\n".join(parts)
+        Product.objects.bulk_update(batch, ["search_text"])
+        last_id = batch[-1].id
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE `ecommerce_products` ADD FULLTEXT INDEX `ecommerce_products_search_text_ft` (`search_text`)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute("ALTER TABLE `ecommerce_products` DROP INDEX `ecommerce_products_search_text_ft`")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce', '0023_product_rating_summary'),
+        ('contents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:17
+
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_order_totals(apps, schema_editor):
+    Order = apps.get_model('ecommerce', 'Order')
+    OrderItem = apps.get_model('ecommerce', 'OrderItem')
+    items = OrderItem.objects.filter(order_id=OuterRef('pk')).order_by().values('order_id')
+    subtotal = Coalesce(
+        Subquery(items.annotate(total=Sum('amount')).values('total'), output_field=FloatField()),
+        Value(0.0),
+    )
+    item_count = Coalesce(Subquery(items.annotate(count=Count('id')).values('count')), Value(0))
+    tax_total = subtotal * F('vat_rate') / 100
+    Order.objects.update(
+        subtotal=subtotal,
+        item_count=item_count,
+        tax_total=tax_total,
+        grand_total=subtotal + tax_total + F('shipping_fee'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce', '0024_product_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='grand_total',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='tax_total',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.RunPython(fill_order_totals, migrations.RunPython.noop),
+    ]
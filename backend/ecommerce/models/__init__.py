@@ -20,4 +20,6 @@ from .order_item import OrderItem
 from .goods_receipt import GoodsReceipt, GoodsReceiptItem
 from .inventory import Inventory, InventoryTransaction
 from .inventory_configuration import InventoryConfiguration
-from .payment_transaction import PaymentTransaction
\ No newline at end of file
+from .payment_transaction import PaymentTransaction
+from .daily_statistic import DailyStatistic, DailyProductStatistic
+from .product_rating_summary import ProductRatingSummary
\ No newline at end of file
@@ -0,0 +1,46 @@
+from django.db import models
+from base.models import TimeStampedModel
+from .product import Product
+
+
+class DailyStatistic(TimeStampedModel):
+    """
+    Per-day rollup of dashboard metrics.
+    Maintained incrementally by ecommerce.signals and rebuilt by the
+    `backfill_daily_statistics` management command.
+    """
+    date = models.DateField(unique=True)
+    order_count = models.IntegerField(default=0)
+    revenue = models.FloatField(default=0.0)
+    new_customers = models.IntegerField(default=0)
+    new_products = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "ecommerce_daily_statistics"
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"Statistics for {self.date}"
+
+
+class DailyProductStatistic(TimeStampedModel):
+    """Per-day, per-product units sold and revenue."""
+    date = models.DateField()
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="daily_statistics"
+    )
+    quantity = models.FloatField(default=0.0)
+    revenue = models.FloatField(default=0.0)
+
+    class Meta:
+        db_table = "ecommerce_daily_product_statistics"
+        ordering = ["-date"]
+        unique_together = [["date", "product"]]
+        indexes = [
+            models.Index(fields=["product", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} - {self.date}: {self.quantity}"
@@ -21,6 +21,11 @@ class GoodsReceipt(TimeStampedModel):
     class Meta:
         db_table = "ecommerce_goods_receipts"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["is_applied"]),
+            models.Index(fields=["reference_code"]),
+            models.Index(fields=["date"]),
+        ]
 
     def mark_applied(self):
         self.is_applied = True
@@ -76,7 +81,11 @@ class GoodsReceiptItem(TimeStampedModel):
         super().save(*args, **kwargs)
         ordering = ["-created_at"]
 
-    def save(self, *args, **kwargs):
+    def prepare_save(self):
+        """Derived values, also applied by bulk nested saves (see WritableNestedSerializer)."""
         # Tự động tính amount
         self.amount = (self.quantity or Decimal("0.00")) * (self.unit_cost or Decimal("0.00"))
+
+    def save(self, *args, **kwargs):
+        self.prepare_save()
         super().save(*args, **kwargs)
@@ -92,6 +92,9 @@ class InventoryTransaction(TimeStampedModel):
         ordering = ["-created_at"]
         verbose_name = "Inventory Transaction"
         verbose_name_plural = "Inventory Transactions"
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def __str__(self):
         """Safe string representation that handles deleted products"""
@@ -1,10 +1,16 @@
 from django.db import models
+from django.db.models import F, Value
 from django.template.defaultfilters import slugify
 from base.models import TimeStampedModel
 from ..constants import PaymentMethod, PaymenStatus, ShippingStatus, OrderStatus
 from .customer import Customer
 
 
+# Written by OrderTotalsService only
+ITEM_TOTAL_FIELDS = {"subtotal", "item_count"}
+TOTALS = {"subtotal", "item_count", "tax_total", "grand_total"}
+
+
 class Order(TimeStampedModel):
     customer =  models.ForeignKey(
         Customer,
@@ -26,6 +32,56 @@ class Order(TimeStampedModel):
 
     date = models.DateField(null=True, blank=True)
 
+    # Stored totals, kept up to date from the items by OrderTotalsService.
+    # tax_total = subtotal * vat_rate / 100, grand_total = subtotal + tax_total + shipping_fee
+    subtotal = models.FloatField(default=0.0, editable=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+    tax_total = models.FloatField(default=0.0, editable=False)
+    grand_total = models.FloatField(default=0.0, editable=False)
+
     class Meta:
         db_table = "ecommerce_orders"
-        ordering = ["-created_at"]
\ No newline at end of file
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["order_status"]),
+            models.Index(fields=["payment_status"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        vat_rate = (self.vat_rate or 0.0) / 100
+        shipping_fee = self.shipping_fee or 0.0
+        if self._state.adding or kwargs.get("force_insert"):
+            self.tax_total = self.subtotal * vat_rate
+            self.grand_total = self.subtotal + self.tax_total + shipping_fee
+            return super().save(*args, **kwargs)
+
+        # The item totals of this instance may be stale (the items changed since it was
+        # loaded): never write them back, and derive the others from the stored subtotal.
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ITEM_TOTAL_FIELDS
+            ]
+        else:
+            update_fields = [name for name in update_fields if name not in ITEM_TOTAL_FIELDS]
+            if {"vat_rate", "shipping_fee"}.intersection(update_fields):
+                update_fields += ["tax_total", "grand_total"]
+        kwargs["update_fields"] = update_fields
+        if "grand_total" in update_fields:
+            self.tax_total = F("subtotal") * Value(vat_rate)
+            self.grand_total = F("subtotal") * Value(1 + vat_rate) + Value(shipping_fee)
+        super().save(*args, **kwargs)
+        self.forget_totals()
+
+    def forget_totals(self):
+        """Drop the loaded totals; they are read from the database again on access."""
+        for name in TOTALS:
+            self.__dict__.pop(name, None)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Load all the forgotten totals at once, not one query per field.
+        if fields is not None and TOTALS.intersection(fields):
+            fields = set(fields) | (TOTALS & self.get_deferred_fields())
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
@@ -1,8 +1,12 @@
 from django.db import models
 from base.models import TimeStampedModel
+from ..managers import OrderItemManager
 from .order import Order
 from .product import Product
 
+# Values the statistics signals need from before a save (see ecommerce.signals).
+STATISTIC_FIELDS = ("order_id", "product_id", "quantity", "amount")
+
 
 class OrderItem(TimeStampedModel):
     """Data structure for an item in the shopping cart."""
@@ -16,10 +20,23 @@ class OrderItem(TimeStampedModel):
     price = models.FloatField(default=0.0, blank=True)
     amount = models.FloatField(default=0.0, blank=True)
 
+    objects = OrderItemManager()
+
     class Meta:
         db_table = "ecommerce_order_items"
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in field_names for name in STATISTIC_FIELDS):
+            instance._stored_values = {name: instance.__dict__[name] for name in STATISTIC_FIELDS}
+        return instance
+
+    def prepare_save(self):
+        """Derived values, also applied by bulk nested saves (see WritableNestedSerializer)."""
         if self.price is not None and self.quantity is not None:
-            self.amount= self.price * self.quantity
+            self.amount = self.price * self.quantity
+
+    def save(self, *args, **kwargs):
+        self.prepare_save()
         super().save(*args, **kwargs)
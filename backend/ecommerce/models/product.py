@@ -1,7 +1,10 @@
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from base.models import TimeStampedModel
 from contents.models import ShortContent, LongContent
 from .product_category import ProductCategory
+from base.utils.full_text import FullTextMatch
+from ..managers import ProductManager
 
 def product_image_path(instance, filename):
     return "/".join(['products', str(instance.id), 'images', filename])
@@ -11,10 +14,12 @@ class Product(TimeStampedModel):
         ShortContent, on_delete=models.CASCADE, related_name="product_names", null=True, blank=True
     )
     thumbnail = models.ImageField(upload_to=product_image_path, max_length=255, blank=True, null=True)
+    # Resized copies of the thumbnail, see base.services.ImageDerivatives
+    thumbnail_variants = models.JSONField(default=dict, blank=True)
     description = models.ForeignKey(
         LongContent, on_delete=models.CASCADE, related_name="product_descriptions", null=True, blank=True
     )
-    price = models.FloatField(default=0.0, blank=True)
+    price = models.FloatField(default=0.0, blank=True, db_index=True)
     unit = models.ForeignKey(
         ShortContent, on_delete=models.CASCADE, related_name="product_units", null=True, blank=True
     )
@@ -33,6 +38,12 @@ class Product(TimeStampedModel):
     # Tax information
     tax_rate =  models.FloatField(default=0.0, blank=True)
 
+    # Names, descriptions and category names in every language, for the database search
+    # fallback (see ProductSearchService). FULLTEXT indexed on MySQL, never edited directly.
+    search_text = models.TextField(default="", blank=True, editable=False)
+
+    objects = ProductManager()
+
     class Meta:
         db_table = "ecommerce_products"
         ordering = ["-created_at"]
@@ -45,6 +56,8 @@ class Product(TimeStampedModel):
         This is a READ-ONLY property - do NOT assign to it.
         To update stock, use: product.inventory.current_quantity = value
         """
+        if "stock_quantity" in self.__dict__:
+            return self.stock_quantity
         try:
             if hasattr(self, 'inventory') and self.inventory:
                 return self.inventory.current_quantity or 0.0
@@ -58,6 +71,8 @@ class Product(TimeStampedModel):
         Get available stock for sale (current_quantity - reserved_quantity).
         This considers reserved stock from pending orders.
         """
+        if "stock_available" in self.__dict__:
+            return self.stock_available
         try:
             if hasattr(self, 'inventory') and self.inventory:
                 return self.inventory.available_quantity
@@ -68,6 +83,8 @@ class Product(TimeStampedModel):
     @property
     def is_low_stock(self):
         """Check if product stock is below minimum threshold."""
+        if "stock_is_low" in self.__dict__:
+            return self.stock_is_low
         try:
             if hasattr(self, 'inventory') and self.inventory:
                 return self.inventory.is_low_stock
@@ -78,6 +95,8 @@ class Product(TimeStampedModel):
     @property
     def is_out_of_stock(self):
         """Check if product is out of stock."""
+        if "stock_is_out" in self.__dict__:
+            return self.stock_is_out
         try:
             if hasattr(self, 'inventory') and self.inventory:
                 return self.inventory.is_out_of_stock
@@ -169,31 +188,36 @@ class Product(TimeStampedModel):
         
         return inventory
     
-    # ✅ REVIEW PROPERTIES
+    # ✅ REVIEW PROPERTIES (read from ProductRatingSummary, kept up to date on review writes)
+    def get_rating_summary(self):
+        try:
+            return self.rating_summary
+        except ObjectDoesNotExist:
+            return None
+
     @property
     def average_rating(self):
         """Get average rating from approved reviews"""
-        from django.db.models import Avg
-        result = self.reviews.filter(is_approved=True).aggregate(avg=Avg('rating'))
-        return round(result['avg'] or 0, 1)
+        if "rating_average" in self.__dict__:
+            return round(self.rating_average or 0, 1)
+        summary = self.get_rating_summary()
+        return round(summary.rating_average, 1) if summary else 0
     
     @property
     def review_count(self):
         """Get total number of approved reviews"""
-        return self.reviews.filter(is_approved=True).count()
+        if "rating_count" in self.__dict__:
+            return self.rating_count
+        summary = self.get_rating_summary()
+        return summary.review_count if summary else 0
     
     @property
     def rating_distribution(self):
         """Get distribution of ratings (1-5 stars)"""
-        from django.db.models import Count
-        distribution = {i: 0 for i in range(1, 6)}
-        
-        ratings = self.reviews.filter(is_approved=True).values('rating').annotate(
-            count=Count('rating')
-        )
-        
-        for item in ratings:
-            distribution[item['rating']] = item['count']
-        
-        return distribution
+        summary = self.get_rating_summary()
+        if summary is None:
+            return {i: 0 for i in range(1, 6)}
+        return summary.distribution
+
 
+Product._meta.get_field("search_text").register_lookup(FullTextMatch)
@@ -8,6 +8,8 @@ def product_image_path(instance, filename):
 
 class ProductImage(TimeStampedModel):
     image = models.ImageField(upload_to=product_image_path, max_length=255, blank=True, null=True)
+    # Resized copies of the image, see base.services.ImageDerivatives
+    image_variants = models.JSONField(default=dict, blank=True)
     product = models.ForeignKey(
         Product,
         on_delete=models.CASCADE,
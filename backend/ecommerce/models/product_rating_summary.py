@@ -0,0 +1,35 @@
+from django.db import models
+from base.models import TimeStampedModel
+from .product import Product
+
+
+class ProductRatingSummary(TimeStampedModel):
+    """
+    Approved-review totals of a product.
+    Maintained incrementally by ecommerce.signals and rebuilt by the
+    `rebuild_rating_summaries` management command.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="rating_summary"
+    )
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    # Stored so listings can sort by rating on an index
+    rating_average = models.FloatField(default=0.0, db_index=True)
+    rating_1 = models.IntegerField(default=0)
+    rating_2 = models.IntegerField(default=0)
+    rating_3 = models.IntegerField(default=0)
+    rating_4 = models.IntegerField(default=0)
+    rating_5 = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "ecommerce_product_rating_summaries"
+
+    def __str__(self):
+        return f"{self.product_id}: {self.rating_average} ({self.review_count})"
+
+    @property
+    def distribution(self):
+        return {rating: getattr(self, f"rating_{rating}") for rating in range(1, 6)}
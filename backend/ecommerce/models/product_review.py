@@ -65,6 +65,7 @@ class ProductReview(TimeStampedModel):
             models.Index(fields=['product', '-created_at']),
             models.Index(fields=['product', 'rating']),
             models.Index(fields=['customer']),
+            models.Index(fields=['created_at', 'id']),
         ]
     
     def __str__(self):
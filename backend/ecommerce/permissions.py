@@ -1,6 +1,7 @@
 from rest_framework import permissions
-from ecommerce.models import Customer, Order
+from ecommerce.models import Order
 from ecommerce.constants.order_status import OrderStatus
+from ecommerce.services import get_user_customer
 
 
 class IsReviewOwnerOrReadOnly(permissions.BasePermission):
@@ -24,12 +25,8 @@ class IsReviewOwnerOrReadOnly(permissions.BasePermission):
             return True
         
         # Write permissions chỉ cho owner
-        try:
-            user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-            customer = Customer.objects.get(user_id=user_id)
-            return obj.customer == customer
-        except Customer.DoesNotExist:
-            return False
+        customer = get_user_customer(request)
+        return customer is not None and obj.customer_id == customer.id
 
 
 class HasPurchasedProduct(permissions.BasePermission):
@@ -50,11 +47,13 @@ class HasPurchasedProduct(permissions.BasePermission):
             print(f"🔴 HasPurchasedProduct: User not authenticated")
             return False
         
+        customer = get_user_customer(request)
+        if customer is None:
+            self.message = "Không tìm thấy thông tin khách hàng"
+            print(f"❌ HasPurchasedProduct: Customer not found")
+            return False
+
         try:
-            user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-            print(f"🔍 HasPurchasedProduct: user_id = {user_id}")
-            
-            customer = Customer.objects.get(user_id=user_id)
             print(f"✅ HasPurchasedProduct: Found customer = {customer.id}")
             
             product_id = request.data.get('product')
@@ -82,10 +81,6 @@ class HasPurchasedProduct(permissions.BasePermission):
             print(f"✅ HasPurchasedProduct: Permission granted")
             return True
             
-        except Customer.DoesNotExist:
-            self.message = "Không tìm thấy thông tin khách hàng"
-            print(f"❌ HasPurchasedProduct: Customer not found")
-            return False
         except Exception as e:
             self.message = f"Lỗi khi kiểm tra quyền: {str(e)}"
             print(f"🔴 HasPurchasedProduct: Exception - {str(e)}")
@@ -110,9 +105,4 @@ class IsCustomerOrReadOnly(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        try:
-            user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-            Customer.objects.get(user_id=user_id)
-            return True
-        except Customer.DoesNotExist:
-            return False
+        return get_user_customer(request) is not None
@@ -1,7 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
 from base.serializers import WritableNestedSerializer
 from rest_framework.fields import UUIDField
 from ..models import Customer, Order
+from ..services import OrderTotalsService
 from .order_item import OrderItemSerializer
 
 
@@ -21,6 +23,19 @@ class OrderSerializer(WritableNestedSerializer):
         for item in value or []:
             item['amount'] = None
         return value
+
+    def create(self, validated_data):
+        # One totals refresh for all the nested items, committed together with them
+        with transaction.atomic(), OrderTotalsService.deferred():
+            instance = super().create(validated_data)
+        instance.forget_totals()
+        return instance
+
+    def update(self, instance, validated_data):
+        with transaction.atomic(), OrderTotalsService.deferred():
+            instance = super().update(instance, validated_data)
+        instance.forget_totals()
+        return instance
     
     class Meta:
         model = Order
@@ -38,6 +53,10 @@ class OrderSerializer(WritableNestedSerializer):
             "shipping_status",
             "order_status",
             "date",
+            "subtotal",
+            "item_count",
+            "tax_total",
+            "grand_total",
             "items",
             "created_at",
             "updated_at"
@@ -55,6 +74,6 @@ class OrderSerializer(WritableNestedSerializer):
             'order_status': {'required': False},
             'date': {'required': False}
         }
-        read_only_fields = ["id", "created_at", "updated_at"]
+        read_only_fields = ["id", "subtotal", "item_count", "tax_total", "grand_total", "created_at", "updated_at"]
         nested_create_fields = ["items"]
         nested_update_fields = ["items"]
\ No newline at end of file
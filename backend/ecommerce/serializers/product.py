@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.conf import settings
 from base.serializers import WritableNestedSerializer
+from base.services import ImageDerivatives
+from base.storages import file_url
 from contents.serializers import ShortContentSerializer, LongContentSerializer
 from ..models import ProductCategory, Product
 from .product_category import ProductCategorySerializer
@@ -22,11 +24,14 @@ class ProductSerializer(WritableNestedSerializer):
     promotions = PromotionSerializer(many=True, required=False, read_only=True)
     inventory = InventoryShortSerializer(read_only=True)
     thumbnail = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
     
     in_stock = serializers.SerializerMethodField()
     available_stock = serializers.SerializerMethodField()
     is_low_stock = serializers.SerializerMethodField()
     is_out_of_stock = serializers.SerializerMethodField()
+    average_rating = serializers.FloatField(read_only=True)
+    review_count = serializers.IntegerField(read_only=True)
     
     def get_in_stock(self, obj):
         """Get stock from Inventory via Product.in_stock property"""
@@ -44,6 +49,12 @@ class ProductSerializer(WritableNestedSerializer):
         """Check if stock is out"""
         return obj.is_out_of_stock
     
+    def get_thumbnail_srcset(self, obj):
+        """{"webp": "<url> 160w, ...", "jpeg": ...} once the resized copies are ready, else None"""
+        if ImageDerivatives.is_current(obj.thumbnail_variants, obj.thumbnail):
+            return ImageDerivatives.srcset(obj.thumbnail_variants, file_url)
+        return None
+
     def get_thumbnail(self, obj):
         if obj.thumbnail:
             thumbnail_path = obj.thumbnail.name.replace("\\", "/")
@@ -59,6 +70,7 @@ class ProductSerializer(WritableNestedSerializer):
             "id",
             "name",
             "thumbnail",
+            "thumbnail_srcset",
             "images",
             "description",
             "price",
@@ -67,6 +79,8 @@ class ProductSerializer(WritableNestedSerializer):
             "available_stock",
             "is_low_stock",
             "is_out_of_stock",
+            "average_rating",
+            "review_count",
             "categories",
             "category_ids",
             "promotions",
@@ -88,6 +102,6 @@ class ProductSerializer(WritableNestedSerializer):
             'height': {'required': False},
             'tax_rate': {'required': False}
         }
-        read_only_fields = ["id", "promotions", "in_stock", "available_stock", "is_low_stock", "is_out_of_stock", "created_at", "updated_at"]
+        read_only_fields = ["id", "promotions", "in_stock", "available_stock", "is_low_stock", "is_out_of_stock", "average_rating", "review_count", "created_at", "updated_at"]
         nested_create_fields = ["name", "unit", "images", "description"]
         nested_update_fields = ["name", "unit", "images", "description"]
\ No newline at end of file
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from rest_framework.fields import UUIDField
 from django.conf import settings
+from base.services import ImageDerivatives
+from base.storages import file_url
 from ..models import Product, ProductImage
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -12,7 +14,14 @@ class ProductImageSerializer(serializers.ModelSerializer):
         source='product'
     )
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     
+    def get_image_srcset(self, obj):
+        """srcset strings per format, None until the resized copies are generated."""
+        if ImageDerivatives.is_current(obj.image_variants, obj.image):
+            return ImageDerivatives.srcset(obj.image_variants, file_url)
+        return None
+
     def get_image(self, obj):
         """Return absolute API URL for image with normalized path."""
         if obj.image:
@@ -30,6 +39,7 @@ class ProductImageSerializer(serializers.ModelSerializer):
             "id",
             "product_id",
             "image",
+            "image_srcset",
             "created_at",
             "updated_at"
         ]
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.conf import settings
 from base.serializers import WritableNestedSerializer
+from base.services import ImageDerivatives
+from base.storages import file_url
 from ..models import ProductCategory, Product
 from contents.serializers import ShortContentSerializer, LongContentSerializer
 from .product_category import ProductCategorySerializer
@@ -14,6 +16,13 @@ class ProductShortSerializer(WritableNestedSerializer):
                                                    queryset=ProductCategory.objects.all(),
                                                    source='categories')
     thumbnail = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
+
+    def get_thumbnail_srcset(self, obj):
+        if ImageDerivatives.is_current(obj.thumbnail_variants, obj.thumbnail):
+            return ImageDerivatives.srcset(obj.thumbnail_variants, file_url)
+        return None
+
     def get_thumbnail(self, obj):
         if obj.thumbnail:
             thumbnail_path = obj.thumbnail.name.replace("\\", "/")
@@ -28,6 +37,7 @@ class ProductShortSerializer(WritableNestedSerializer):
             "id",
             "name",
             "thumbnail",
+            "thumbnail_srcset",
             "price",
             "unit",
             "in_stock",
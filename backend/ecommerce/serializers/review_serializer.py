@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.db.models import Count, Q
-from ecommerce.models import ProductReview, ReviewHelpful, Customer
+from ecommerce.models import ProductReview, ReviewHelpful
+from ecommerce.services import get_user_customer
 
 
 class ReviewHelpfulSerializer(serializers.ModelSerializer):
@@ -46,15 +47,12 @@ class ProductReviewSerializer(serializers.ModelSerializer):
         """Kiểm tra user hiện tại đã đánh dấu helpful chưa"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            try:
-                user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-                customer = Customer.objects.get(user_id=user_id)
+            customer = get_user_customer(request)
+            if customer is not None:
                 return ReviewHelpful.objects.filter(
                     review=obj,
                     customer=customer
                 ).exists()
-            except Customer.DoesNotExist:
-                pass
         return False
     
     def get_created_at_display(self, obj):
@@ -113,10 +111,8 @@ class ProductReviewCreateSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             raise serializers.ValidationError("Bạn phải đăng nhập để đánh giá")
         
-        try:
-            user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-            customer = Customer.objects.get(user_id=user_id)
-        except Customer.DoesNotExist:
+        customer = get_user_customer(request)
+        if customer is None:
             raise serializers.ValidationError("Không tìm thấy thông tin khách hàng")
         
         product = data.get('product')
@@ -1 +1,8 @@
-from .customer import CustomerService
\ No newline at end of file
+from .customer import CustomerService
+from .customer_context import CustomerContext, get_customer_context, get_current_customer, get_user_customer
+from .statistic import StatisticService
+from .inventory import InventoryService, InsufficientStock
+from .rating import RatingService
+from .product_search import ProductSearchService
+from .order_totals import OrderTotalsService
+from .inventory_valuation import InventoryValuationService
@@ -0,0 +1,145 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from ..models import Customer
+
+# Customer rows are cached briefly; saving or deleting a customer drops the entry.
+CUSTOMER_CACHE_TIMEOUT = 60
+
+
+class CustomerContext:
+    """
+    Who is calling: bearer token, user, token scopes and shop customer.
+    Each part is resolved lazily and at most once per request, see `get_customer_context`.
+
+    The customer comes from, in order:
+    1. the access token -> customer id mapping written at login,
+    2. the session `customer_id`,
+    3. the customer linked to the authenticated user.
+    Ownership checks (reviews) use `user_customer`, which only trusts the user.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    @cached_property
+    def token(self):
+        auth_header = self.request.META.get("HTTP_AUTHORIZATION", "")
+        if auth_header.startswith("Bearer "):
+            return auth_header.split(" ")[1]
+        return None
+
+    @cached_property
+    def user(self):
+        user = getattr(self.request, "user", None)
+        if user is not None and getattr(user, "is_authenticated", False):
+            return user
+        return None
+
+    @cached_property
+    def scopes(self):
+        # DRF's OAuth2Authentication already loaded the token into `request.auth`.
+        scope = getattr(getattr(self.request, "auth", None), "scope", None)
+        return frozenset(scope.split()) if scope else frozenset()
+
+    def has_any_scope(self, *scopes):
+        return not self.scopes.isdisjoint(scopes)
+
+    @cached_property
+    def customer_id(self):
+        customer_id = None
+        if self.token:
+            customer_id = cache.get(self.token_cache_key(self.token))
+        if not customer_id:
+            try:
+                customer_id = self.request.session.get("customer_id")
+            except AttributeError:
+                customer_id = None
+        return customer_id
+
+    @cached_property
+    def customer(self):
+        if self.customer_id:
+            return self.get_customer(self.customer_id)
+        return self.user_customer
+
+    @cached_property
+    def user_customer(self):
+        """The customer linked to the authenticated user, whatever the token mapping or session say."""
+        if self.user is None:
+            return None
+        user_key = self.user_cache_key(self.user.pk)
+        customer_id = cache.get(user_key)
+        if customer_id:
+            customer = self.get_customer(customer_id)
+            if customer is not None and customer.user_id == self.user.pk:
+                return customer
+        customer = Customer.objects.filter(user_id=self.user.pk).first()
+        if customer is not None:
+            cache.set(user_key, str(customer.id), CUSTOMER_CACHE_TIMEOUT)
+            cache.set(self.customer_cache_key(customer.id), customer, CUSTOMER_CACHE_TIMEOUT)
+        return customer
+
+    @staticmethod
+    def token_cache_key(token):
+        # Hash the token to avoid cache key length issues
+        return f"customer_token_{hashlib.sha256(token.encode()).hexdigest()}"
+
+    @staticmethod
+    def customer_cache_key(customer_id):
+        return f"customer:{customer_id}"
+
+    @staticmethod
+    def user_cache_key(user_id):
+        return f"customer:user:{user_id}"
+
+    @classmethod
+    def remember_token(cls, token, customer_id, timeout):
+        cache.set(cls.token_cache_key(token), str(customer_id), timeout=timeout)
+
+    @classmethod
+    def forget_token(cls, token):
+        cache.delete(cls.token_cache_key(token))
+
+    @classmethod
+    def get_customer(cls, customer_id):
+        key = cls.customer_cache_key(customer_id)
+        customer = cache.get(key)
+        if customer is None:
+            customer = Customer.objects.filter(id=customer_id).first()
+            if customer is not None:
+                cache.set(key, customer, CUSTOMER_CACHE_TIMEOUT)
+        return customer
+
+    @classmethod
+    def invalidate(cls, customer):
+        keys = [cls.customer_cache_key(customer.id)]
+        if customer.user_id:
+            keys.append(cls.user_cache_key(customer.user_id))
+        cache.delete_many(keys)
+
+
+def get_customer_context(request):
+    """
+    The CustomerContext of `request` (a DRF Request or a Django HttpRequest),
+    created on first use and kept on the underlying HttpRequest.
+    """
+    http_request = getattr(request, "_request", request)
+    context = getattr(http_request, "customer_context", None)
+    if context is None:
+        context = CustomerContext(request)
+        http_request.customer_context = context
+    elif http_request is not request:
+        # Prefer the DRF request: it carries the authenticated user and token.
+        context.request = request
+    return context
+
+
+def get_current_customer(request):
+    return get_customer_context(request).customer
+
+
+def get_user_customer(request):
+    return get_customer_context(request).user_customer
@@ -0,0 +1,222 @@
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from base.services import BaseService
+from ..models import Inventory, InventoryTransaction
+from .product_search import ProductSearchService
+from .inventory_valuation import InventoryValuationService
+
+
+class InsufficientStock(Exception):
+    """Raised by InventoryService.reserve; `errors` lists every product that failed."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+class InventoryService(BaseService):
+    """
+    Reserve / ship / unreserve / receive / issue stock for a set of products in one pass.
+    All affected Inventory rows are locked with a single ordered SELECT ... FOR UPDATE,
+    changed with one F()-based UPDATE and logged with one bulk_create.
+    """
+
+    @staticmethod
+    def group_items(items):
+        """
+        :param items: iterable of (product_id, quantity); repeated products are summed
+        :return: OrderedDict product_id -> quantity
+        """
+        quantities = OrderedDict()
+        for product_id, quantity in items:
+            key = str(product_id)
+            quantities[key] = quantities.get(key, 0) + float(quantity)
+        return quantities
+
+    @staticmethod
+    def lock(product_ids):
+        """
+        Lock the Inventory rows of `product_ids` in primary key order, so two
+        requests touching the same products can not deadlock. Call inside a transaction.
+        :return: dict product_id -> Inventory
+        """
+        inventories = (
+            Inventory.objects.select_for_update()
+            .filter(product_id__in=list(product_ids))
+            .order_by("id")
+        )
+        return {str(inventory.product_id): inventory for inventory in inventories}
+
+    @classmethod
+    def apply(cls, moves, transaction_type, reference_number="", reason="", user=None):
+        """
+        :param moves: list of (inventory, quantity, reserved_delta, current_delta)
+        """
+        if not moves:
+            return []
+        deltas = {"reserved_quantity": {}, "current_quantity": {}}
+        for inventory, quantity, reserved_delta, current_delta in moves:
+            if reserved_delta:
+                deltas["reserved_quantity"][inventory.pk] = reserved_delta
+            if current_delta:
+                deltas["current_quantity"][inventory.pk] = current_delta
+
+        updates = {}
+        for field, changes in deltas.items():
+            if changes:
+                updates[field] = F(field) + Case(
+                    *[When(pk=pk, then=Value(delta)) for pk, delta in changes.items()],
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+        if updates:
+            Inventory.objects.filter(pk__in=[move[0].pk for move in moves]).update(
+                updated_at=timezone.now(), **updates
+            )
+            # update() sends no signals; stock flags are part of the search documents.
+            ProductSearchService.schedule(
+                product_ids=[move[0].product_id for move in moves], text_changed=False
+            )
+            if deltas["current_quantity"]:
+                InventoryValuationService.stock_changed()
+
+        return InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(
+                inventory=inventory,
+                transaction_type=transaction_type,
+                quantity=quantity,
+                reference_number=reference_number,
+                reason=reason,
+                created_by=user,
+            )
+            for inventory, quantity, reserved_delta, current_delta in moves
+        ])
+
+    @classmethod
+    def reserve(cls, items, reference_number="", reason="", user=None):
+        """
+        Reserve every item or nothing.
+        :raises InsufficientStock: when a product has no inventory or not enough available stock
+        """
+        quantities = cls.group_items(items)
+        with transaction.atomic():
+            inventories = cls.lock(quantities.keys())
+            errors = []
+            moves = []
+            for product_id, quantity in quantities.items():
+                inventory = inventories.get(product_id)
+                if inventory is None:
+                    errors.append(f"Product {product_id} does not have inventory configured")
+                elif inventory.available_quantity < quantity:
+                    errors.append(
+                        f"Not enough stock for product {product_id}. "
+                        f"Available: {inventory.available_quantity}, Required: {quantity}"
+                    )
+                else:
+                    moves.append((inventory, quantity, quantity, 0))
+            if errors:
+                raise InsufficientStock(errors)
+            return cls.apply(moves, "reserve", reference_number, reason, user)
+
+    @classmethod
+    def ship(cls, items, reference_number="", reason="", user=None):
+        """
+        Move reserved stock out. Products without enough reserved stock are skipped.
+        :return: list of error messages for the skipped products
+        """
+        quantities = cls.group_items(items)
+        with transaction.atomic():
+            inventories = cls.lock(quantities.keys())
+            errors = []
+            moves = []
+            for product_id, quantity in quantities.items():
+                inventory = inventories.get(product_id)
+                if inventory is None:
+                    errors.append(f"Product {product_id} has no inventory configured")
+                elif inventory.reserved_quantity < quantity:
+                    errors.append(f"Insufficient reserved quantity for product {product_id}")
+                else:
+                    moves.append((inventory, quantity, -quantity, -quantity))
+            cls.apply(moves, "out", reference_number, reason, user)
+        return errors
+
+    @classmethod
+    def unreserve(cls, items, reference_number="", reason="", user=None):
+        """
+        Release reserved stock, never below zero.
+        :return: list of warnings for products whose quantity had to be adjusted
+        """
+        quantities = cls.group_items(items)
+        with transaction.atomic():
+            inventories = cls.lock(quantities.keys())
+            errors = []
+            moves = []
+            for product_id, quantity in quantities.items():
+                inventory = inventories.get(product_id)
+                if inventory is None:
+                    errors.append(f"Product {product_id} has no inventory configured")
+                    continue
+                if inventory.reserved_quantity < quantity:
+                    quantity = max(0, inventory.reserved_quantity)
+                    errors.append(f"Adjusted unreserve quantity for product {product_id}")
+                moves.append((inventory, quantity, -quantity, 0))
+            cls.apply(moves, "unreserve", reference_number, reason, user)
+        return errors
+
+    @classmethod
+    def lock_or_create(cls, product_ids):
+        """
+        Like `lock`, creating the missing Inventory rows first (empty stock). Call inside a transaction.
+        """
+        inventories = cls.lock(product_ids)
+        missing = [product_id for product_id in product_ids if product_id not in inventories]
+        if missing:
+            Inventory.objects.bulk_create(
+                [
+                    Inventory(product_id=product_id, current_quantity=0.0, min_quantity=0.0, reserved_quantity=0.0)
+                    for product_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+            inventories.update(cls.lock(missing))
+        return inventories
+
+    @classmethod
+    def receive(cls, items, reference_number="", reason="", user=None):
+        """
+        Add stock (e.g. a goods receipt), creating the inventory of products that have none.
+        :return: the InventoryTransaction rows, one per product
+        """
+        quantities = cls.group_items(items)
+        with transaction.atomic():
+            inventories = cls.lock_or_create(list(quantities.keys()))
+            moves = [
+                (inventories[product_id], quantity, 0, quantity)
+                for product_id, quantity in quantities.items()
+            ]
+            return cls.apply(moves, "in", reference_number, reason, user)
+
+    @classmethod
+    def issue(cls, items, reference_number="", reason="", user=None):
+        """
+        Remove stock (e.g. reverting a goods receipt), never below zero.
+        :return: list of error messages for the products without inventory
+        """
+        quantities = cls.group_items(items)
+        with transaction.atomic():
+            inventories = cls.lock(quantities.keys())
+            errors = []
+            moves = []
+            for product_id, quantity in quantities.items():
+                inventory = inventories.get(product_id)
+                if inventory is None:
+                    errors.append(f"Product {product_id} has no inventory configured")
+                    continue
+                current = inventory.current_quantity or 0.0
+                moves.append((inventory, -quantity, 0, max(0, current - quantity) - current))
+            cls.apply(moves, "out", reference_number, reason, user)
+        return errors
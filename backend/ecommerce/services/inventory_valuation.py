@@ -0,0 +1,179 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Abs, Coalesce
+from django.utils import timezone
+
+from base.caches import GenerationToken, cache_key, invalidation_timeout
+from base.services import BaseService
+from ..models import Inventory, InventoryConfiguration, InventoryTransaction
+
+CONFIG_KEY = cache_key("inventory", "active-config")
+STOCK_GENERATION = GenerationToken(cache_key("inventory", "stock-generation"))
+# Stock summaries are also recomputed after this many seconds, for writes that send no signal.
+STATS_TIMEOUT = 60 * 10
+
+# Ledger types that moved current_quantity: in/add add stock, out/remove take it away.
+STOCK_IN_TYPES = ("in", "add")
+STOCK_OUT_TYPES = ("out", "remove")
+
+
+class InventoryValuationService(BaseService):
+    """
+    Stock counts and valuation for the warehouse dashboard, computed by the database:
+    one aggregate query for the totals, one for the per-category breakdown.
+
+    Results are cached per version of the active InventoryConfiguration and per stock
+    generation. The generation is replaced (on commit) by every inventory movement and
+    price change, see ecommerce.signals and InventoryService.apply. Without a shared
+    cache nothing is kept longer than UNSHARED_CACHE_TIMEOUT seconds.
+    """
+
+    # Configuration --------------------------------------------------------------
+    @staticmethod
+    def active_config():
+        """InventoryConfiguration.get_active_config(), cached until the configuration changes."""
+        config = cache.get(CONFIG_KEY)
+        if config is None:
+            config = InventoryConfiguration.get_active_config()
+            cache.set(CONFIG_KEY, config, invalidation_timeout())
+        return config
+
+    @staticmethod
+    def config_changed():
+        transaction.on_commit(lambda: cache.delete(CONFIG_KEY))
+
+    @staticmethod
+    def config_version(config):
+        return f"{config.pk}-{config.updated_at.timestamp() if config.updated_at else 0}"
+
+    # Invalidation ---------------------------------------------------------------
+    @staticmethod
+    def generation():
+        return STOCK_GENERATION.get()
+
+    @staticmethod
+    def stock_changed():
+        STOCK_GENERATION.replace()
+
+    # Expressions ----------------------------------------------------------------
+    @staticmethod
+    def low_stock_threshold(config):
+        """InventoryConfiguration.get_low_stock_threshold as an expression on Inventory."""
+        if config.low_stock_threshold_type == "percentage":
+            return Case(
+                When(max_quantity__gt=0, then=F("max_quantity") * Value(config.low_stock_threshold_value / 100)),
+                default=F("min_quantity"),
+                output_field=FloatField(),
+            )
+        if config.low_stock_threshold_type == "fixed":
+            return Value(config.low_stock_threshold_value, output_field=FloatField())
+        return F("min_quantity")
+
+    @classmethod
+    def stock_filters(cls, config):
+        """Q objects of the out/low/in stock states, as in InventoryConfiguration.is_*_stock."""
+        threshold = cls.low_stock_threshold(config)
+        out_of_stock = Q(current_quantity__lte=config.out_of_stock_threshold)
+        return {
+            "out_of_stock": out_of_stock,
+            "low_stock": ~out_of_stock & Q(current_quantity__lte=threshold),
+            "in_stock": Q(current_quantity__gt=threshold),
+        }
+
+    @classmethod
+    def aggregates(cls, config):
+        states = cls.stock_filters(config)
+        return {
+            "total_products": Count("id"),
+            "total_quantity": Coalesce(Sum("current_quantity"), Value(0.0)),
+            "total_value": Coalesce(
+                Sum(Coalesce(F("product__price"), Value(0.0)) * F("current_quantity"), output_field=FloatField()),
+                Value(0.0),
+            ),
+            "low_stock_count": Count("id", filter=states["low_stock"]),
+            "out_of_stock_count": Count("id", filter=states["out_of_stock"]),
+            "in_stock_count": Count("id", filter=states["in_stock"]),
+        }
+
+    # Summaries ------------------------------------------------------------------
+    @classmethod
+    def summary(cls, config=None):
+        """Totals of the whole inventory and per product category (cached)."""
+        config = config or cls.active_config()
+        key = cache_key("inventory", "stats", cls.config_version(config), cls.generation())
+        data = cache.get(key)
+        if data is None:
+            data = cls.compute(config)
+            cache.set(key, data, invalidation_timeout(STATS_TIMEOUT))
+        return data
+
+    @classmethod
+    def compute(cls, config):
+        queryset = Inventory.objects.all()
+        aggregates = cls.aggregates(config)
+        data = queryset.order_by().aggregate(**aggregates)
+        # A product in several categories counts in each of them.
+        data["categories"] = [
+            {
+                "category_id": row.pop("product__categories__id"),
+                "category_name": row.pop("product__categories__name__origin"),
+                **row,
+            }
+            for row in queryset.order_by()
+            .values("product__categories__id", "product__categories__name__origin")
+            .annotate(**aggregates)
+            .order_by("-total_value")
+        ]
+        return data
+
+    @classmethod
+    def valuation_at(cls, at=None):
+        """
+        Stock quantity and value at the datetime `at`: the current quantities minus the
+        ledger movements recorded after it, for the inventories that existed then.
+        Prices are the current ones (there is no price history), reserved stock is not
+        a movement, and "set"/"adjust" entries, whose ledger quantity is not the change,
+        are not replayed.
+        Without `at` it is the current stock, taken from the cached summary().
+        """
+        if at is None:
+            summary = cls.summary()
+            data = {name: summary[name] for name in ("total_products", "total_quantity", "total_value")}
+            data["at"] = timezone.now().isoformat()
+            return data
+
+        key = cache_key("inventory", "valuation", at.isoformat(), cls.generation())
+        data = cache.get(key)
+        if data is None:
+            movements = (
+                InventoryTransaction.objects.filter(inventory_id=OuterRef("pk"), created_at__gt=at)
+                .order_by()
+                .values("inventory_id")
+                .annotate(
+                    moved=Sum(
+                        Case(
+                            When(transaction_type__in=STOCK_IN_TYPES, then=Abs("quantity")),
+                            When(transaction_type__in=STOCK_OUT_TYPES, then=-Abs("quantity")),
+                            default=Value(0.0),
+                            output_field=FloatField(),
+                        )
+                    )
+                )
+                .values("moved")
+            )
+            queryset = Inventory.objects.filter(created_at__lte=at).annotate(
+                quantity_at=F("current_quantity")
+                - Coalesce(Subquery(movements, output_field=FloatField()), Value(0.0))
+            )
+            data = queryset.order_by().aggregate(
+                total_products=Count("id"),
+                total_quantity=Coalesce(Sum("quantity_at"), Value(0.0)),
+                total_value=Coalesce(
+                    Sum(Coalesce(F("product__price"), Value(0.0)) * F("quantity_at"), output_field=FloatField()),
+                    Value(0.0),
+                ),
+            )
+            data["at"] = at.isoformat()
+            cache.set(key, data, invalidation_timeout(STATS_TIMEOUT))
+        return data
@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Abs, Coalesce
+
+from base.services import BaseService
+from ..models import Order, OrderItem
+
+# Stored totals differing from the items by more than this are reported by `verify`.
+TOLERANCE = 0.005
+
+
+class OrderTotalsService(BaseService):
+    """
+    Maintain the stored totals of Order (subtotal, item_count, tax_total, grand_total)
+    so order lists, payment callbacks and reports read one row instead of
+    aggregating the items.
+
+    OrderItem writes refresh their order in the same transaction: save/delete through
+    the signals in ecommerce.signals, bulk_create/bulk_update/update through
+    OrderItemQuerySet. Inside `deferred()` the refreshes are collected and run as one
+    query when the block exits. `verify` finds (and repairs) orders whose stored totals
+    do not match their items, e.g. after raw SQL.
+    """
+
+    _local = threading.local()
+
+    @staticmethod
+    def item_totals():
+        """Subqueries of the items' sum and count, for an Order queryset."""
+        items = OrderItem.objects.filter(order_id=OuterRef("pk")).order_by().values("order_id")
+        subtotal = Coalesce(
+            Subquery(items.annotate(total=Sum("amount")).values("total"), output_field=FloatField()),
+            Value(0.0),
+        )
+        item_count = Coalesce(Subquery(items.annotate(count=Count("id")).values("count")), Value(0))
+        return subtotal, item_count
+
+    @classmethod
+    def refresh(cls, order_ids):
+        """Recompute the totals of `order_ids` from their items, with a single UPDATE."""
+        order_ids = {order_id for order_id in order_ids if order_id is not None}
+        if not order_ids:
+            return 0
+        pending = getattr(cls._local, "pending", None)
+        if pending is not None:
+            pending.update(order_ids)
+            return 0
+        subtotal, item_count = cls.item_totals()
+        tax_total = subtotal * F("vat_rate") / 100
+        return Order.objects.filter(pk__in=order_ids).update(
+            subtotal=subtotal,
+            item_count=item_count,
+            tax_total=tax_total,
+            grand_total=subtotal + tax_total + F("shipping_fee"),
+        )
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        """Refresh the orders touched in the block once, when it exits."""
+        if getattr(cls._local, "pending", None) is not None:
+            yield
+            return
+        cls._local.pending = set()
+        try:
+            yield
+            order_ids = cls._local.pending
+        finally:
+            cls._local.pending = None
+        cls.refresh(order_ids)
+
+    @classmethod
+    def verify(cls, repair=False, batch_size=1000):
+        """
+        Ids of the orders whose stored totals do not match their items.
+        With `repair=True` they are recomputed.
+        """
+        subtotal, item_count = cls.item_totals()
+        tax_total = subtotal * F("vat_rate") / 100
+        mismatched = list(
+            Order.objects.annotate(
+                items_subtotal=subtotal,
+                items_count=item_count,
+                items_tax_total=tax_total,
+                items_grand_total=subtotal + tax_total + F("shipping_fee"),
+            )
+            .annotate(
+                subtotal_diff=Abs(F("subtotal") - F("items_subtotal")),
+                tax_total_diff=Abs(F("tax_total") - F("items_tax_total")),
+                grand_total_diff=Abs(F("grand_total") - F("items_grand_total")),
+            )
+            .filter(
+                ~Q(item_count=F("items_count"))
+                | Q(subtotal_diff__gt=TOLERANCE)
+                | Q(tax_total_diff__gt=TOLERANCE)
+                | Q(grand_total_diff__gt=TOLERANCE)
+            )
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        if repair:
+            for start in range(0, len(mismatched), batch_size):
+                with transaction.atomic():
+                    cls.refresh(mismatched[start:start + batch_size])
+        return mismatched
@@ -0,0 +1,168 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from base.services import BaseService, JobQueue
+from ..documents import ProductDocument
+from ..documents.product import content_texts
+from ..models import Product
+
+logger = logging.getLogger("project")
+
+_pending = threading.local()
+
+
+class ProductSearchService(BaseService):
+    """
+    Product keyword search.
+
+    With OPEN_SEARCH_ENABLED, keywords go to the `ecommerce_products` index (ProductDocument);
+    otherwise, or when the cluster fails, to Product.search_text, which is FULLTEXT indexed on MySQL.
+    After each committed transaction search_text is refreshed for the products touched in it,
+    and the index by a job (queue "search"), so requests never wait for the cluster;
+    see `schedule` and ecommerce.signals.
+    """
+
+    @staticmethod
+    def opensearch_enabled():
+        return getattr(settings, "OPEN_SEARCH_ENABLED", False)
+
+    @staticmethod
+    def build_search_text(product):
+        parts = content_texts(product.name) + content_texts(product.unit) + content_texts(product.description)
+        for category in product.categories.all():
+            parts += content_texts(category.name)
+        return "\n".join(parts)
+
+    @staticmethod
+    def pending():
+        if not hasattr(_pending, "products"):
+            _pending.products = set()
+            _pending.short_contents = set()
+            _pending.long_contents = set()
+            _pending.text_changed = False
+        return _pending
+
+    @classmethod
+    def schedule(cls, product_ids=(), short_content_ids=(), long_content_ids=(), text_changed=True):
+        """
+        Refresh the given products (and the products using the given contents) after commit.
+        `text_changed=False` (e.g. stock moves) only matters to the OpenSearch index.
+        """
+        if not text_changed and not cls.opensearch_enabled():
+            return
+        pending = cls.pending()
+        pending.products.update(str(product_id) for product_id in product_ids if product_id)
+        pending.short_contents.update(content_id for content_id in short_content_ids if content_id)
+        pending.long_contents.update(content_id for content_id in long_content_ids if content_id)
+        pending.text_changed = pending.text_changed or text_changed
+        # Every commit flushes everything queued so far; later callbacks find nothing left.
+        transaction.on_commit(cls.flush)
+
+    @classmethod
+    def flush(cls):
+        pending = cls.pending()
+        product_ids = set(pending.products)
+        short_contents, long_contents = set(pending.short_contents), set(pending.long_contents)
+        pending.products.clear()
+        pending.short_contents.clear()
+        pending.long_contents.clear()
+        text_changed, pending.text_changed = pending.text_changed, False
+
+        if short_contents or long_contents:
+            product_ids.update(
+                str(product_id)
+                for product_id in Product.objects.filter(
+                    Q(name_id__in=short_contents)
+                    | Q(unit_id__in=short_contents)
+                    | Q(categories__name_id__in=short_contents)
+                    | Q(description_id__in=long_contents)
+                ).values_list("id", flat=True).distinct()
+            )
+        if not product_ids:
+            return
+        try:
+            if text_changed:
+                cls.update_search_text(cls.load(product_ids))
+            if cls.opensearch_enabled():
+                JobQueue.enqueue(
+                    "ecommerce.services.product_search.index_products_job",
+                    {"product_ids": sorted(product_ids)},
+                    queue="search",
+                )
+        except Exception as e:
+            logger.error(f"Product search refresh failed: {e}", exc_info=True)
+
+    @staticmethod
+    def load(product_ids):
+        return list(ProductDocument().get_queryset(filter_=Q(pk__in=list(product_ids))))
+
+    @classmethod
+    def refresh(cls, product_ids, parallel=False):
+        """
+        Rebuild search_text and the search documents of `product_ids` right away.
+        :return: number of products refreshed
+        """
+        products = cls.load(product_ids)
+        cls.update_search_text(products)
+        if cls.opensearch_enabled():
+            cls.index(product_ids, products, parallel=parallel)
+        return len(products)
+
+    @classmethod
+    def update_search_text(cls, products):
+        changed = []
+        for product in products:
+            search_text = cls.build_search_text(product)
+            if product.search_text != search_text:
+                product.search_text = search_text
+                changed.append(product)
+        if changed:
+            Product.objects.bulk_update(changed, ["search_text"], batch_size=500)
+
+    @classmethod
+    def index(cls, product_ids, products=None, parallel=False):
+        """
+        Send the documents of `product_ids` to OpenSearch; ids that no longer exist
+        are removed from the index. The index is not refreshed, it does that by itself.
+        """
+        products = cls.load(product_ids) if products is None else products
+        document = ProductDocument()
+        if products:
+            document.update(products, "index", refresh=False, parallel=parallel)
+        missing = set(map(str, product_ids)) - {str(product.pk) for product in products}
+        if missing:
+            document.bulk(
+                [{"_op_type": "delete", "_index": ProductDocument.Index.name, "_id": product_id}
+                 for product_id in missing],
+                raise_on_error=False,
+            )
+
+    @classmethod
+    def search(cls, queryset, keyword, ranked=True):
+        """
+        Filter `queryset` to products matching `keyword`.
+        :param ranked: order OpenSearch results by relevance
+        """
+        if cls.opensearch_enabled():
+            try:
+                ids = ProductDocument.search_ids(keyword)
+            except Exception as e:
+                logger.warning(f"OpenSearch product search failed, using the database: {e}")
+            else:
+                queryset = queryset.filter(pk__in=ids)
+                if ranked and ids:
+                    queryset = queryset.order_by(Case(
+                        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+                        output_field=IntegerField(),
+                    ))
+                return queryset
+        return queryset.filter(search_text__match=keyword)
+
+
+def index_products_job(product_ids):
+    """JobQueue handler: send the search documents of `product_ids` to OpenSearch."""
+    ProductSearchService.index(product_ids)
@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, When
+from django.utils import timezone
+
+from base.services import BaseService
+from ..models import ProductRatingSummary, ProductReview
+
+RATINGS = range(1, 6)
+
+
+class RatingService(BaseService):
+    """
+    Maintain ProductRatingSummary rows (count, sum and 1-5 histogram of approved reviews).
+    Writes are applied as F() deltas so concurrent reviews never lose counts.
+    """
+
+    @classmethod
+    def record(cls, product_id, rating, sign=1):
+        """Add (sign=1) or remove (sign=-1) one approved review with `rating`."""
+        if product_id is None or rating not in RATINGS:
+            return
+        with transaction.atomic():
+            ProductRatingSummary.objects.get_or_create(product_id=product_id)
+            summaries = ProductRatingSummary.objects.filter(product_id=product_id)
+            summaries.update(
+                review_count=F("review_count") + sign,
+                rating_sum=F("rating_sum") + sign * rating,
+                **{f"rating_{rating}": F(f"rating_{rating}") + sign},
+                updated_at=timezone.now()
+            )
+            # Separate statement: MySQL would otherwise see the half-updated row.
+            summaries.update(rating_average=cls.average_expression())
+
+    @staticmethod
+    def average_expression():
+        return Case(
+            When(review_count__gt=0, then=F("rating_sum") * 1.0 / F("review_count")),
+            default=0.0,
+            output_field=FloatField(),
+        )
+
+    @classmethod
+    def record_review(cls, review, sign=1):
+        """Apply `review` if it counts, i.e. is approved."""
+        if review and review["is_approved"]:
+            cls.record(review["product_id"], review["rating"], sign=sign)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every summary from the approved reviews.
+        :return: number of summary rows
+        """
+        totals = {}
+        rows = (
+            ProductReview.objects.filter(is_approved=True)
+            .values("product_id", "rating")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            if row["rating"] not in RATINGS:
+                continue
+            summary = totals.setdefault(
+                row["product_id"], ProductRatingSummary(product_id=row["product_id"])
+            )
+            summary.review_count += row["count"]
+            summary.rating_sum += row["count"] * row["rating"]
+            setattr(summary, f"rating_{row['rating']}", row["count"])
+
+        for summary in totals.values():
+            summary.rating_average = summary.rating_sum / summary.review_count
+
+        with transaction.atomic():
+            ProductRatingSummary.objects.all().delete()
+            ProductRatingSummary.objects.bulk_create(totals.values(), batch_size=1000)
+        return len(totals)
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from base.services import BaseService
+from ..models import (
+    Customer,
+    DailyProductStatistic,
+    DailyStatistic,
+    Order,
+    OrderItem,
+    Product,
+)
+
+
+class StatisticService(BaseService):
+    """
+    Maintain the daily dashboard rollups (DailyStatistic / DailyProductStatistic).
+    Writes are applied as F() deltas so concurrent requests never lose counts.
+    """
+
+    @staticmethod
+    def to_date(value):
+        if value is None:
+            value = timezone.now()
+        if isinstance(value, datetime):
+            if timezone.is_aware(value):
+                value = timezone.localtime(value)
+            return value.date()
+        return value
+
+    @classmethod
+    def record(cls, day, **deltas):
+        """
+        Add `deltas` (order_count, revenue, new_customers, new_products) to the day row.
+        """
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        day = cls.to_date(day)
+        with transaction.atomic():
+            DailyStatistic.objects.get_or_create(date=day)
+            DailyStatistic.objects.filter(date=day).update(
+                **{field: F(field) + value for field, value in deltas.items()},
+                updated_at=timezone.now()
+            )
+
+    @classmethod
+    def record_product(cls, day, product_id, quantity=0.0, revenue=0.0):
+        if product_id is None or (not quantity and not revenue):
+            return
+        day = cls.to_date(day)
+        with transaction.atomic():
+            DailyProductStatistic.objects.get_or_create(date=day, product_id=product_id)
+            DailyProductStatistic.objects.filter(date=day, product_id=product_id).update(
+                quantity=F("quantity") + (quantity or 0.0),
+                revenue=F("revenue") + (revenue or 0.0),
+                updated_at=timezone.now()
+            )
+
+    @classmethod
+    def record_order_item(cls, order_created_at, product_id, quantity, amount, sign=1):
+        if order_created_at is None:
+            # The order is already gone; the rollup is repaired by the backfill command.
+            return
+        day = cls.to_date(order_created_at)
+        cls.record(day, revenue=sign * (amount or 0.0))
+        cls.record_product(
+            day,
+            product_id,
+            quantity=sign * (quantity or 0.0),
+            revenue=sign * (amount or 0.0)
+        )
+
+    @classmethod
+    def rebuild(cls, start=None, end=None):
+        """
+        Recompute the rollups from the source tables for [start, end] (inclusive).
+        Without bounds the whole history is rebuilt.
+        :return: (number of day rows, number of product/day rows)
+        """
+        def in_range(queryset, field):
+            if start is not None:
+                queryset = queryset.filter(**{f"{field}__date__gte": start})
+            if end is not None:
+                queryset = queryset.filter(**{f"{field}__date__lte": end})
+            return queryset
+
+        def count_by_day(queryset):
+            return {
+                row["day"]: row["count"]
+                for row in in_range(queryset, "created_at")
+                .annotate(day=TruncDate("created_at"))
+                .values("day")
+                .annotate(count=Count("id"))
+                .order_by()
+            }
+
+        # Order count and revenue per day from the stored order totals
+        orders = {}
+        revenue = {}
+        for row in (
+            in_range(Order.objects.all(), "created_at")
+            .annotate(day=TruncDate("created_at"))
+            .values("day")
+            .annotate(count=Count("id"), revenue=Sum("subtotal"))
+            .order_by()
+        ):
+            orders[row["day"]] = row["count"]
+            revenue[row["day"]] = row["revenue"] or 0.0
+        customers = count_by_day(Customer.objects.all())
+        products = count_by_day(Product.objects.all())
+
+        item_rows = (
+            in_range(OrderItem.objects.exclude(product_id=None), "order__created_at")
+            .annotate(day=TruncDate("order__created_at"))
+            .values("day", "product_id")
+            .annotate(quantity=Sum("quantity"), revenue=Sum("amount"))
+            .order_by()
+        )
+        product_rows = [
+            DailyProductStatistic(
+                date=row["day"],
+                product_id=row["product_id"],
+                quantity=row["quantity"] or 0.0,
+                revenue=row["revenue"] or 0.0,
+            )
+            for row in item_rows
+        ]
+
+        days = set(orders) | set(customers) | set(products) | set(revenue)
+        day_rows = [
+            DailyStatistic(
+                date=day,
+                order_count=orders.get(day, 0),
+                revenue=revenue.get(day, 0.0),
+                new_customers=customers.get(day, 0),
+                new_products=products.get(day, 0),
+            )
+            for day in days
+        ]
+
+        with transaction.atomic():
+            stale_days = DailyStatistic.objects.all()
+            stale_products = DailyProductStatistic.objects.all()
+            if start is not None:
+                stale_days = stale_days.filter(date__gte=start)
+                stale_products = stale_products.filter(date__gte=start)
+            if end is not None:
+                stale_days = stale_days.filter(date__lte=end)
+                stale_products = stale_products.filter(date__lte=end)
+            stale_days.delete()
+            stale_products.delete()
+            DailyStatistic.objects.bulk_create(day_rows, batch_size=1000)
+            DailyProductStatistic.objects.bulk_create(product_rows, batch_size=1000)
+
+        return len(day_rows), len(product_rows)
@@ -1,6 +1,17 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Product, Inventory
+from base.services import ImageDerivatives
+from contents.models import ShortContent, ShortTranslate, LongContent, LongTranslate
+from .models import Product, ProductImage, ProductReview, Inventory, InventoryConfiguration, Order, OrderItem, Customer
+from .models.order_item import STATISTIC_FIELDS
+from .services import (
+    StatisticService,
+    CustomerContext,
+    RatingService,
+    ProductSearchService,
+    OrderTotalsService,
+    InventoryValuationService,
+)
 
 
 @receiver(post_save, sender=Product)
@@ -15,4 +26,249 @@ def create_inventory_for_product(sender, instance, created, **kwargs):
                 'max_quantity': None,
                 'reserved_quantity': 0
             }
-        )
\ No newline at end of file
+        )
+
+
+# Resized WebP/JPEG copies of product images, built in the background
+@receiver(post_save, sender=Product)
+def build_thumbnail_variants(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ImageDerivatives.schedule(instance, 'thumbnail', 'thumbnail_variants')
+
+
+@receiver(post_save, sender=ProductImage)
+def build_image_variants(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ImageDerivatives.schedule(instance, 'image', 'image_variants')
+
+
+# Daily dashboard rollups (see StatisticService)
+@receiver(post_save, sender=Product)
+def count_new_product(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        StatisticService.record(instance.created_at, new_products=1)
+
+
+@receiver(post_delete, sender=Product)
+def uncount_product(sender, instance, **kwargs):
+    StatisticService.record(instance.created_at, new_products=-1)
+
+
+@receiver(post_save, sender=Customer)
+def count_new_customer(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        StatisticService.record(instance.created_at, new_customers=1)
+
+
+@receiver(post_delete, sender=Customer)
+def uncount_customer(sender, instance, **kwargs):
+    StatisticService.record(instance.created_at, new_customers=-1)
+
+
+# Drop the cached customer row used by CustomerContext (profile update, status change...)
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_customer_cache(sender, instance, **kwargs):
+    CustomerContext.invalidate(instance)
+
+
+@receiver(post_save, sender=Order)
+def count_new_order(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        StatisticService.record(instance.created_at, order_count=1)
+
+
+@receiver(post_delete, sender=Order)
+def uncount_order(sender, instance, **kwargs):
+    StatisticService.record(instance.created_at, order_count=-1)
+
+
+def _order_created_at(item, order_id):
+    """created_at of the order `order_id`, from `item.order` when that order is already loaded."""
+    if OrderItem.order.is_cached(item) and item.order is not None and item.order.pk == order_id:
+        return item.order.created_at
+    return Order.objects.filter(pk=order_id).values_list('created_at', flat=True).first()
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_order_item(sender, instance, **kwargs):
+    """Keep the stored values so post_save can apply the difference."""
+    instance._statistic_previous = None
+    if not instance._state.adding and not kwargs.get('raw'):
+        # Items read from the database remember them (OrderItem.from_db)
+        instance._statistic_previous = getattr(instance, '_stored_values', None) or (
+            OrderItem.objects.filter(pk=instance.pk)
+            .values(*STATISTIC_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=OrderItem)
+def count_order_item(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    previous = getattr(instance, '_statistic_previous', None)
+    order_created_at = _order_created_at(instance, instance.order_id)
+    if previous is not None:
+        StatisticService.record_order_item(
+            order_created_at
+            if previous['order_id'] == instance.order_id
+            else _order_created_at(instance, previous['order_id']),
+            previous['product_id'],
+            previous['quantity'],
+            previous['amount'],
+            sign=-1
+        )
+    StatisticService.record_order_item(
+        order_created_at,
+        instance.product_id,
+        instance.quantity,
+        instance.amount
+    )
+    instance._stored_values = {name: getattr(instance, name) for name in STATISTIC_FIELDS}
+
+
+@receiver(post_delete, sender=OrderItem)
+def uncount_order_item(sender, instance, **kwargs):
+    StatisticService.record_order_item(
+        _order_created_at(instance, instance.order_id),
+        instance.product_id,
+        instance.quantity,
+        instance.amount,
+        sign=-1
+    )
+
+
+# Stored order totals (see OrderTotalsService), in the transaction of the item write
+@receiver(post_save, sender=OrderItem)
+def refresh_order_totals(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    previous = getattr(instance, '_statistic_previous', None)
+    OrderTotalsService.refresh({instance.order_id, previous['order_id'] if previous else None})
+
+
+@receiver(post_delete, sender=OrderItem)
+def refresh_order_totals_on_delete(sender, instance, **kwargs):
+    OrderTotalsService.refresh({instance.order_id})
+
+
+# Product rating summaries (see RatingService)
+RATING_FIELDS = {'product', 'product_id', 'rating', 'is_approved'}
+
+
+def _rating_unchanged(update_fields):
+    # e.g. save(update_fields=['helpful_count'])
+    return update_fields is not None and not RATING_FIELDS.intersection(update_fields)
+
+
+@receiver(pre_save, sender=ProductReview)
+def remember_review(sender, instance, **kwargs):
+    """Keep the stored values so post_save can apply the difference."""
+    instance._rating_previous = None
+    if _rating_unchanged(kwargs.get('update_fields')):
+        return
+    if not instance._state.adding and not kwargs.get('raw'):
+        instance._rating_previous = (
+            ProductReview.objects.filter(pk=instance.pk)
+            .values('product_id', 'rating', 'is_approved')
+            .first()
+        )
+
+
+@receiver(post_save, sender=ProductReview)
+def count_review(sender, instance, created, **kwargs):
+    if kwargs.get('raw') or _rating_unchanged(kwargs.get('update_fields')):
+        return
+    current = {
+        'product_id': instance.product_id,
+        'rating': instance.rating,
+        'is_approved': instance.is_approved,
+    }
+    previous = getattr(instance, '_rating_previous', None)
+    if previous == current:
+        return
+    RatingService.record_review(previous, sign=-1)
+    RatingService.record_review(current)
+
+
+@receiver(post_delete, sender=ProductReview)
+def uncount_review(sender, instance, **kwargs):
+    RatingService.record_review({
+        'product_id': instance.product_id,
+        'rating': instance.rating,
+        'is_approved': instance.is_approved,
+    }, sign=-1)
+
+
+# Product search index and search_text (see ProductSearchService), refreshed after commit
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def reindex_product(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ProductSearchService.schedule(product_ids=[instance.pk])
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def reindex_product_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # category.products.clear() does not pass pk_set
+        ProductSearchService.schedule(product_ids=list(instance.products.values_list('id', flat=True)))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            ProductSearchService.schedule(product_ids=[instance.pk])
+        elif pk_set:
+            ProductSearchService.schedule(product_ids=pk_set)
+
+
+@receiver(post_save, sender=ShortContent)
+def reindex_short_content(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ProductSearchService.schedule(short_content_ids=[instance.pk])
+
+
+@receiver(post_save, sender=LongContent)
+def reindex_long_content(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ProductSearchService.schedule(long_content_ids=[instance.pk])
+
+
+@receiver(post_save, sender=ShortTranslate)
+@receiver(post_delete, sender=ShortTranslate)
+def reindex_short_translate(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ProductSearchService.schedule(short_content_ids=[instance.content_id])
+
+
+@receiver(post_save, sender=LongTranslate)
+@receiver(post_delete, sender=LongTranslate)
+def reindex_long_translate(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ProductSearchService.schedule(long_content_ids=[instance.content_id])
+
+
+@receiver(post_save, sender=Inventory)
+def reindex_product_stock(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        ProductSearchService.schedule(product_ids=[instance.product_id], text_changed=False)
+
+
+# Cached stock summary and valuation (see InventoryValuationService)
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+@receiver(post_save, sender=Product)
+def invalidate_inventory_stats(sender, instance, **kwargs):
+    if not kwargs.get('raw'):
+        InventoryValuationService.stock_changed()
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def invalidate_inventory_categories(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        InventoryValuationService.stock_changed()
+
+
+@receiver(post_save, sender=InventoryConfiguration)
+@receiver(post_delete, sender=InventoryConfiguration)
+def invalidate_inventory_config(sender, instance, **kwargs):
+    InventoryValuationService.config_changed()
@@ -1,3 +1,785 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.db.models import Avg, Count
+from django.test.utils import CaptureQueriesContext
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from contents.models import LongContent, ShortContent, ShortTranslate
+from .constants import OrderStatus
+from .documents import ProductDocument
+from .models import (
+    Customer, DailyProductStatistic, DailyStatistic, GoodsReceipt, GoodsReceiptItem, Inventory, InventoryTransaction, Order, OrderItem,
+    Product, ProductCategory, ProductImage, ProductReview, Promotion, PromotionItem,
+)
+from .permissions import IsReviewOwnerOrReadOnly
+from .serializers import GoodsReceiptSerializer, OrderSerializer, ProductSerializer
+from .services import (
+    CustomerContext, InsufficientStock, InventoryService, InventoryValuationService, ProductSearchService, RatingService,
+    get_current_customer, get_user_customer,
+)
+from .views import GoodsReceiptViewSet, ProductViewSet, order_status_data, recent_orders
+from .views.vnpay_views import create_payment
+
+
+class InMemoryIndex:
+    """Stands in for the OpenSearch cluster: applies ProductDocument bulk actions to a dict."""
+
+    def __init__(self):
+        self.documents = {}
+        self.requests = 0
+
+    def bulk(self, actions, **kwargs):
+        self.requests += 1
+        for action in actions:
+            if action["_op_type"] == "delete":
+                self.documents.pop(str(action["_id"]), None)
+            else:
+                self.documents[str(action["_id"])] = action["_source"]
+        return len(self.documents), []
+
+    def search_ids(self, keyword, size=1000):
+        keyword = keyword.lower()
+        return [
+            product_id
+            for product_id, source in self.documents.items()
+            if any(keyword in text.lower() for text in source["names"] + source["category_names"])
+        ][:size]
+
+
+class ProductSearchTest(TestCase):
+    def create_product(self, name, translation=None):
+        content = ShortContent.objects.create(origin=name)
+        if translation:
+            ShortTranslate.objects.create(content=content, value=translation)
+        return Product.objects.create(name=content, price=10)
+
+    def test_search_text_is_refreshed_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = self.create_product("Áo thun", "T-shirt")
+        product.refresh_from_db()
+        self.assertEqual(product.search_text, "Áo thun\nT-shirt")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ShortTranslate.objects.filter(content=product.name).update(value="Tee")
+            ShortContent.objects.get(pk=product.name_id).save()
+        product.refresh_from_db()
+        self.assertEqual(product.search_text, "Áo thun\nTee")
+
+    def test_database_search(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            shirt = self.create_product("Áo thun", "T-shirt")
+            self.create_product("Quần", "Trousers")
+        self.assertEqual(list(ProductSearchService.search(Product.objects.all(), "shirt")), [shirt])
+
+    @override_settings(OPEN_SEARCH_ENABLED=True)
+    def test_index_is_updated_by_a_job(self):
+        index = InMemoryIndex()
+        with mock.patch.object(ProductDocument, "bulk", side_effect=index.bulk), \
+                mock.patch.object(ProductDocument, "search_ids", side_effect=index.search_ids), \
+                mock.patch("ecommerce.services.product_search.JobQueue.enqueue") as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                shirt = self.create_product("Áo thun", "T-shirt")
+                trousers = self.create_product("Quần", "Trousers")
+            # One job for the transaction, nothing sent to the cluster by the request itself
+            enqueue.assert_called_once()
+            self.assertEqual(index.requests, 0)
+            handler, payload = enqueue.call_args.args
+            self.assertEqual(enqueue.call_args.kwargs["queue"], "search")
+            self.assertEqual(set(payload["product_ids"]), {str(shirt.pk), str(trousers.pk)})
+
+            import_string(handler)(**payload)
+            self.assertEqual(index.requests, 1)
+            self.assertEqual(index.documents[str(shirt.pk)]["names"], ["Áo thun", "T-shirt"])
+            self.assertEqual(list(ProductSearchService.search(Product.objects.all(), "shirt")), [shirt])
+
+            # Products deleted in the meantime are removed from the index
+            trousers_id = str(trousers.pk)
+            trousers.delete()
+            import_string(handler)(product_ids=[trousers_id])
+            self.assertNotIn(trousers_id, index.documents)
+            self.assertIn(str(shirt.pk), index.documents)
+
+# GET /products/: count, page, then one query per prefetched relation whatever the page size.
+LIST_QUERIES = 15
+# GET /products/<id>/: the same without the count.
+RETRIEVE_QUERIES = 14
+
+
+class ProductCatalogQueriesTest(TestCase):
+    """The product list and detail endpoints run a fixed number of queries (ProductManager.catalog)."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.category = ProductCategory.objects.create(name=self.content("Shirts", "Áo"))
+        now = timezone.now()
+        self.promotion = Promotion.objects.create(
+            name="Sale", start=now - timedelta(days=1), end=now + timedelta(days=1)
+        )
+
+    @staticmethod
+    def content(origin, translation):
+        content = ShortContent.objects.create(origin=origin)
+        ShortTranslate.objects.create(content=content, value=translation)
+        return content
+
+    def create_products(self, count):
+        products = []
+        for number in range(count):
+            product = Product.objects.create(
+                name=self.content(f"Shirt {number}", f"Áo {number}"),
+                unit=self.content("piece", "cái"),
+                description=LongContent.objects.create(origin="Cotton"),
+                price=10 + number,
+            )
+            product.categories.add(self.category)
+            ProductImage.objects.create(product=product)
+            PromotionItem.objects.create(promotion=self.promotion, product=product, discount=10)
+            products.append(product)
+        return products
+
+    def get(self, action, **kwargs):
+        view = ProductViewSet.as_view({"get": action})
+        response = view(self.factory.get("/", {"page_size": 50}), **kwargs)
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_queries(self):
+        self.create_products(2)
+        with self.assertNumQueries(LIST_QUERIES):
+            self.get("list")
+        # Ten products cost the same as two
+        self.create_products(8)
+        with self.assertNumQueries(LIST_QUERIES):
+            self.assertEqual(len(self.get("list").data["results"]), 10)
+
+    def test_retrieve_queries(self):
+        product = self.create_products(3)[0]
+        with self.assertNumQueries(RETRIEVE_QUERIES):
+            self.get("retrieve", pk=product.pk)
+
+
+class ReviewOwnershipTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create(email="owner@example.com")
+        self.customer = Customer.objects.create(email="owner@example.com", user=self.user)
+        self.other = Customer.objects.create(email="other@example.com")
+        product = Product.objects.create(name=ShortContent.objects.create(origin="Reviewed"))
+        self.review = ProductReview.objects.create(product=product, customer=self.other, rating=5, comment="Good")
+
+    def request(self, token=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        request = RequestFactory().put("/", **headers)
+        request.user = self.user
+        request.session = {}
+        return request
+
+    def test_reviews_trust_the_user_not_the_token_or_session(self):
+        CustomerContext.remember_token("stolen", self.other.id, 60)
+        request = self.request(token="stolen")
+        request.session["customer_id"] = str(self.other.id)
+        self.assertEqual(get_current_customer(request), self.other)
+        self.assertEqual(get_user_customer(request), self.customer)
+        self.assertFalse(IsReviewOwnerOrReadOnly().has_object_permission(request, None, self.review))
+
+    def test_owner_may_edit(self):
+        self.review.customer = self.customer
+        self.assertTrue(IsReviewOwnerOrReadOnly().has_object_permission(self.request(), None, self.review))
+
+
+class RatingSummaryTest(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="reviewer@example.com")
+        self.product = Product.objects.create(name=ShortContent.objects.create(origin="Rated"))
+        self.other = Product.objects.create(name=ShortContent.objects.create(origin="Other"))
+
+    def review(self, rating, product=None, **kwargs):
+        return ProductReview.objects.create(
+            product=product or self.product, customer=self.customer, rating=rating, comment="-", **kwargs
+        )
+
+    @staticmethod
+    def aggregated(product):
+        """What the properties returned before the summary: aggregates over approved reviews."""
+        reviews = product.reviews.filter(is_approved=True)
+        distribution = {rating: 0 for rating in range(1, 6)}
+        for row in reviews.values("rating").annotate(count=Count("rating")):
+            distribution[row["rating"]] = row["count"]
+        average = reviews.aggregate(avg=Avg("rating"))["avg"]
+        return round(average or 0, 1), reviews.count(), distribution
+
+    def assertSummary(self, *products):
+        for product in products or (self.product, self.other):
+            expected = self.aggregated(product)
+            product = Product.objects.get(pk=product.pk)
+            self.assertEqual(
+                (product.average_rating, product.review_count, product.rating_distribution), expected
+            )
+            annotated = Product.objects.with_rating().get(pk=product.pk)
+            self.assertEqual((annotated.average_rating, annotated.review_count), expected[:2])
+
+    def test_review_writes_update_the_summary(self):
+        self.assertSummary()
+        good = self.review(5)
+        self.review(2)
+        hidden = self.review(1, is_approved=False)
+        self.assertSummary()
+        self.assertEqual(Product.objects.get(pk=self.product.pk).average_rating, 3.5)
+
+        hidden.is_approved = True
+        hidden.save()
+        self.assertSummary()
+        good.is_approved = False
+        good.save()
+        self.assertSummary()
+        good.is_approved = True
+        good.save()
+        self.assertSummary()
+
+        good.rating = 4
+        good.save()
+        self.assertSummary()
+        good.product = self.other
+        good.save()
+        self.assertSummary()
+
+        # Saves that do not touch the rating leave it alone
+        with CaptureQueriesContext(connection) as queries:
+            good.helpful_count = 3
+            good.save(update_fields=["helpful_count"])
+        self.assertEqual(len(queries), 1)
+
+        good.delete()
+        hidden.delete()
+        self.assertSummary()
+        self.assertEqual(Product.objects.get(pk=self.other.pk).rating_distribution, {i: 0 for i in range(1, 6)})
+
+    def test_rebuild_matches_the_incremental_summary(self):
+        self.review(5)
+        self.review(4)
+        self.review(4, product=self.other)
+        self.review(1, is_approved=False)
+        incremental = {
+            product.pk: (product.average_rating, product.review_count, product.rating_distribution)
+            for product in Product.objects.all()
+        }
+        self.assertEqual(RatingService.rebuild(), 2)
+        rebuilt = {
+            product.pk: (product.average_rating, product.review_count, product.rating_distribution)
+            for product in Product.objects.all()
+        }
+        self.assertEqual(rebuilt, incremental)
+        self.assertSummary()
+
+
+class ConcurrentReserveTest(TransactionTestCase):
+    """Many checkouts reserving the same product at once must never oversell it."""
+
+    workers = 20
+    stock = 10
+    quantity = 2
+
+    def reserve(self, product_id, start, outcomes):
+        start.wait()
+        try:
+            while True:
+                try:
+                    InventoryService.reserve([(product_id, self.quantity)], reference_number="stress")
+                    outcomes.append("reserved")
+                    return
+                except InsufficientStock:
+                    outcomes.append("refused")
+                    return
+                except OperationalError:
+                    # sqlite has no row locks: a conflicting writer fails with "database is locked"
+                    if connection.vendor != "sqlite":
+                        raise
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def test_parallel_reserves_do_not_oversell(self):
+        product = Product.objects.create(name=ShortContent.objects.create(origin="Stress"), price=10)
+        Inventory.objects.filter(product=product).update(current_quantity=self.stock)
+
+        start = threading.Barrier(self.workers)
+        outcomes = []
+        threads = [
+            threading.Thread(target=self.reserve, args=(product.pk, start, outcomes))
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        inventory = Inventory.objects.get(product=product)
+        expected = self.stock // self.quantity
+        self.assertEqual(len(outcomes), self.workers)
+        self.assertEqual(outcomes.count("reserved"), expected)
+        self.assertEqual(inventory.reserved_quantity, expected * self.quantity)
+        self.assertEqual(inventory.available_quantity, 0)
+        self.assertEqual(
+            InventoryTransaction.objects.filter(inventory=inventory, reference_number="stress").count(),
+            expected,
+        )
+
+
+class InventoryValuationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_current_valuation_reuses_the_summary(self):
+        product = Product.objects.create(name=ShortContent.objects.create(origin="Valued"), price=10)
+        Inventory.objects.filter(product=product).update(current_quantity=3)
+        at_now = InventoryValuationService.valuation_at(timezone.now())
+        InventoryValuationService.summary()
+        with self.assertNumQueries(0):
+            current = InventoryValuationService.valuation_at()
+        fields = ("total_products", "total_quantity", "total_value")
+        self.assertEqual([current[name] for name in fields], [at_now[name] for name in fields])
+        self.assertEqual(current["total_value"], 30)
+
+
+class OrderItemStatisticsTest(TestCase):
+    def test_item_update_reuses_the_loaded_row_and_order(self):
+        product = Product.objects.create(name=ShortContent.objects.create(origin="Counted"), price=10)
+        order = Order.objects.create()
+        OrderItem.objects.create(order=order, product=product, quantity=1, price=10)
+        item = OrderItem.objects.select_related("order").get(order=order)
+
+        item.quantity = 3
+        with CaptureQueriesContext(connection) as queries:
+            item.save()
+        sql = [query["sql"] for query in queries]
+        self.assertFalse([query for query in sql if query.startswith('SELECT "ecommerce_order_items"."order_id"')])
+        self.assertFalse([query for query in sql if query.startswith('SELECT "ecommerce_orders"."created_at"')])
+
+        item.quantity = 2
+        item.save()
+        self.assertEqual(DailyStatistic.objects.get(date=timezone.localdate(order.created_at)).revenue, 20)
+
+
+class DailyStatisticsTest(TestCase):
+    def setUp(self):
+        self.today = timezone.now()
+        self.yesterday = self.today - timedelta(days=1)
+        self.shirt = Product.objects.create(name=ShortContent.objects.create(origin="Shirt"), price=10)
+        self.hat = Product.objects.create(name=ShortContent.objects.create(origin="Hat"), price=4)
+        Customer.objects.create(email="buyer@example.com", created_at=self.yesterday)
+
+    @staticmethod
+    def rollups():
+        days = {
+            (row.date, row.order_count, row.revenue, row.new_customers, row.new_products)
+            for row in DailyStatistic.objects.all()
+            if row.order_count or row.revenue or row.new_customers or row.new_products
+        }
+        # Rows emptied by deletes stay behind in the incremental rollup
+        products = {
+            (row.date, row.product_id, row.quantity, row.revenue)
+            for row in DailyProductStatistic.objects.all()
+            if row.quantity or row.revenue
+        }
+        return days, products
+
+    def day(self, when):
+        return DailyStatistic.objects.get(date=timezone.localdate(when))
+
+    def product_day(self, when, product):
+        return DailyProductStatistic.objects.get(date=timezone.localdate(when), product=product)
+
+    def test_item_writes_move_the_counters(self):
+        order = Order.objects.create(created_at=self.yesterday)
+        item = OrderItem.objects.create(order=order, product=self.shirt, quantity=2, price=10)
+        self.assertEqual((self.day(self.yesterday).order_count, self.day(self.yesterday).revenue), (1, 20))
+        self.assertEqual(self.product_day(self.yesterday, self.shirt).quantity, 2)
+
+        item = OrderItem.objects.get(pk=item.pk)
+        item.quantity = 3
+        item.save()
+        self.assertEqual(self.day(self.yesterday).revenue, 30)
+        self.assertEqual(self.product_day(self.yesterday, self.shirt).quantity, 3)
+
+        # Moving the item to another product and to an order of another day
+        later = Order.objects.create(created_at=self.today)
+        item.product = self.hat
+        item.order = later
+        item.price = 4
+        item.save()
+        self.assertEqual(self.day(self.yesterday).revenue, 0)
+        self.assertEqual(self.product_day(self.yesterday, self.shirt).quantity, 0)
+        self.assertEqual((self.day(self.today).revenue, self.product_day(self.today, self.hat).revenue), (12, 12))
+
+        item.delete()
+        self.assertEqual(self.day(self.today).revenue, 0)
+        self.assertEqual(self.product_day(self.today, self.hat).quantity, 0)
+
+    def test_order_status_change_only_moves_the_status_counts(self):
+        order = Order.objects.create(created_at=self.yesterday)
+        OrderItem.objects.create(order=order, product=self.shirt, quantity=1, price=10)
+        before = self.rollups()
+        admin = get_user_model().objects.create(email="admin@example.com")
+
+        def status_counts():
+            request = APIRequestFactory().get("/")
+            force_authenticate(request, user=admin)
+            return {row["status_code"]: row["count"] for row in order_status_data(request).data}
+
+        self.assertEqual(status_counts(), {OrderStatus.NEW: 1})
+        order.order_status = OrderStatus.COMPLETED
+        order.save()
+        self.assertEqual(status_counts(), {OrderStatus.COMPLETED: 1})
+        # Orders and revenue count whatever the status, as the dashboard always did
+        self.assertEqual(self.rollups(), before)
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        first = Order.objects.create(created_at=self.yesterday)
+        OrderItem.objects.create(order=first, product=self.shirt, quantity=2, price=10)
+        moved = OrderItem.objects.create(order=first, product=self.hat, quantity=1, price=4)
+        second = Order.objects.create(created_at=self.today)
+        OrderItem.objects.create(order=second, product=self.shirt, quantity=1, price=10)
+        dropped = Order.objects.create(created_at=self.today)
+        OrderItem.objects.create(order=dropped, product=self.hat, quantity=5, price=4)
+
+        moved.order = second
+        moved.quantity = 2
+        moved.save()
+        dropped.delete()
+        second.order_status = OrderStatus.SHIPPED
+        second.save()
+
+        incremental = self.rollups()
+        out = StringIO()
+        call_command("backfill_daily_statistics", stdout=out)
+        self.assertIn("Done.", out.getvalue())
+        self.assertEqual(self.rollups(), incremental)
+
+        # A day range only rebuilds those days
+        DailyStatistic.objects.filter(date=timezone.localdate(self.today)).update(revenue=999)
+        day = timezone.localdate(self.yesterday).isoformat()
+        call_command("backfill_daily_statistics", start=day, end=day, stdout=StringIO())
+        self.assertEqual(self.day(self.today).revenue, 999)
+        call_command("backfill_daily_statistics", stdout=StringIO())
+        self.assertEqual(self.rollups(), incremental)
+
+
+class GoodsReceiptStockTest(TestCase):
+    """Goods receipts move stock through InventoryService.receive / issue, one statement set per receipt."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(email="stock@example.com")
+
+    @staticmethod
+    def create_product(name, stock=None):
+        product = Product.objects.create(name=ShortContent.objects.create(origin=name), price=10)
+        # Products get an empty inventory on creation (ecommerce.signals)
+        inventories = Inventory.objects.filter(product=product)
+        if stock is None:
+            inventories.delete()
+        else:
+            inventories.update(current_quantity=stock)
+        return product
+
+    @staticmethod
+    def create_receipt(lines):
+        receipt = GoodsReceipt.objects.create(reference_code="R")
+        GoodsReceiptItem.objects.bulk_create([
+            GoodsReceiptItem(receipt=receipt, product=product, quantity=quantity, unit_cost=1)
+            for product, quantity in lines
+        ])
+        return receipt
+
+    def post(self, action, receipt):
+        view = GoodsReceiptViewSet.as_view({"post": action}, permission_classes=[AllowAny])
+        request = APIRequestFactory().post("/")
+        force_authenticate(request, user=self.user)
+        return view(request, pk=receipt.pk)
+
+    @staticmethod
+    def stock(product):
+        return Inventory.objects.filter(product=product).values_list("current_quantity", flat=True).first()
+
+    @staticmethod
+    def ledger(reference_number):
+        return sorted(
+            InventoryTransaction.objects.filter(reference_number=reference_number)
+            .values_list("inventory__product__name__origin", "transaction_type", "quantity", "created_by")
+        )
+
+    def test_apply_and_unapply_a_receipt(self):
+        stocked = self.create_product("Stocked", stock=5)
+        new = self.create_product("New")
+        receipt = self.create_receipt([(stocked, 2), (new, 4), (stocked, 3)])
+
+        response = self.post("apply", receipt)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertTrue(response.data["is_applied"])
+        self.assertEqual((self.stock(stocked), self.stock(new)), (10, 4))
+        # Repeated products are one movement
+        self.assertEqual(
+            self.ledger(f"GR-{receipt.pk}"),
+            [("New", "in", 4, self.user.pk), ("Stocked", "in", 5, self.user.pk)],
+        )
+        self.assertEqual(self.post("apply", receipt).status_code, 400)
+
+        response = self.post("unapply", receipt)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertFalse(response.data["is_applied"])
+        self.assertEqual((self.stock(stocked), self.stock(new)), (5, 0))
+        self.assertEqual(
+            self.ledger(f"GR-UNAPPLY-{receipt.pk}"),
+            [("New", "out", -4, self.user.pk), ("Stocked", "out", -5, self.user.pk)],
+        )
+        self.assertEqual(self.post("unapply", receipt).status_code, 400)
+
+    def test_issue_reports_products_without_inventory(self):
+        stocked = self.create_product("Stocked", stock=3)
+        missing = self.create_product("Missing")
+        errors = InventoryService.issue([(stocked.pk, 5), (missing.pk, 1)], reference_number="ISSUE")
+        self.assertEqual(errors, [f"Product {missing.pk} has no inventory configured"])
+        # Never below zero, the ledger keeps the requested quantity
+        self.assertEqual(self.stock(stocked), 0)
+        self.assertIsNone(self.stock(missing))
+        self.assertEqual(self.ledger("ISSUE"), [("Stocked", "out", -5, None)])
+
+    def test_lock_or_create_adds_missing_inventories(self):
+        stocked = self.create_product("Stocked", stock=3)
+        new = self.create_product("New")
+        with transaction.atomic():
+            inventories = InventoryService.lock_or_create([str(stocked.pk), str(new.pk)])
+        self.assertEqual(set(inventories), {str(stocked.pk), str(new.pk)})
+        self.assertEqual(inventories[str(stocked.pk)].current_quantity, 3)
+        self.assertEqual(inventories[str(new.pk)].current_quantity, 0)
+        self.assertEqual(Inventory.objects.filter(product=new).count(), 1)
+
+    def test_statements_do_not_grow_with_the_lines(self):
+        def count(lines):
+            products = [self.create_product(f"P{number}", stock=1 if number % 2 else None) for number in range(lines)]
+            items = [(product.pk, 2) for product in products] * 2
+            with CaptureQueriesContext(connection) as received:
+                InventoryService.receive(items)
+            with CaptureQueriesContext(connection) as issued:
+                InventoryService.issue(items)
+            return len(received), len(issued)
+
+        self.assertEqual(count(2), count(8))
+
+    def test_apply_statements_do_not_grow_with_the_lines(self):
+        def count(lines):
+            products = [self.create_product(f"P{number}", stock=1 if number % 2 else None) for number in range(lines)]
+            receipt = self.create_receipt([(product, 2) for product in products] * 2)
+            with CaptureQueriesContext(connection) as applied:
+                self.post("apply", receipt)
+            with CaptureQueriesContext(connection) as unapplied:
+                self.post("unapply", receipt)
+            return len(applied), len(unapplied)
+
+        self.assertEqual(count(2), count(8))
+
+
+class BulkNestedSaveTest(TestCase):
+    """Nested to-many rows written by WritableNestedSerializer.bulk_save_relationship."""
+
+    def setUp(self):
+        self.shirt = self.create_product("Shirt")
+        self.trousers = self.create_product("Trousers")
+
+    @staticmethod
+    def create_product(name):
+        return Product.objects.create(name=ShortContent.objects.create(origin=name), price=10)
+
+    def save(self, serializer_class, data, instance=None):
+        serializer = serializer_class(instance, data=data, partial=instance is not None)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def receipt_lines(self, count):
+        return [
+            {"product_id": str((self.shirt, self.trousers)[number % 2].pk), "quantity": "2", "unit_cost": "1.50"}
+            for number in range(count)
+        ]
+
+    def test_receipt_lines_are_created_updated_and_removed_in_one_request(self):
+        receipt = self.save(GoodsReceiptSerializer, {"reference_code": "R1", "items": self.receipt_lines(3)})
+        lines = list(receipt.items.order_by("created_at"))
+        self.assertEqual(len(lines), 3)
+        # prepare_save() computed the amounts of the bulk-created rows
+        self.assertEqual({line.amount for line in lines}, {Decimal("3.00")})
+
+        kept, removed, _ = lines
+        updated_at = kept.updated_at
+        items = [
+            {"id": str(kept.pk), "product_id": str(self.shirt.pk), "quantity": "4", "unit_cost": "2.00"},
+            {"id": str(lines[2].pk), "product_id": str(self.shirt.pk), "quantity": "2", "unit_cost": "1.50"},
+            {"product_id": str(self.trousers.pk), "quantity": "1", "unit_cost": "5.00"},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            self.save(GoodsReceiptSerializer, {"items": items}, receipt)
+        updates = [query["sql"] for query in queries if query["sql"].startswith('UPDATE "ecommerce_goods_receipt_items"')]
+        self.assertEqual(len(updates), 1)
+        # Only the sent columns, the auto_now stamp and what prepare_save() changed are written
+        self.assertNotIn('"unit_id"', updates[0])
+        self.assertNotIn('"created_at"', updates[0])
+        self.assertIn('"amount"', updates[0])
+
+        kept.refresh_from_db()
+        self.assertEqual((kept.quantity, kept.amount), (Decimal("4.00"), Decimal("8.00")))
+        self.assertGreater(kept.updated_at, updated_at)
+        # The receipt foreign key is not nullable: removed lines are deleted
+        self.assertFalse(GoodsReceiptItem.objects.filter(pk=removed.pk).exists())
+        self.assertEqual(
+            sorted((line.product_id, line.amount) for line in receipt.items.all()),
+            sorted([(self.shirt.pk, Decimal("8.00")), (self.shirt.pk, Decimal("3.00")), (self.trousers.pk, Decimal("5.00"))]),
+        )
+        # Saving lines moves no stock, applying the receipt does
+        self.assertEqual(Inventory.objects.get(product=self.shirt).current_quantity, 0)
+        InventoryService.receive([(line.product_id, line.quantity) for line in receipt.items.all()], reference_number="R1")
+        self.assertEqual(Inventory.objects.get(product=self.shirt).current_quantity, 6)
+        self.assertEqual(Inventory.objects.get(product=self.trousers).current_quantity, 1)
+
+    def test_receipt_query_count_does_not_grow_with_lines(self):
+        counts = []
+        for lines in (2, 8):
+            receipt = GoodsReceipt.objects.create(reference_code=f"R{lines}")
+            with CaptureQueriesContext(connection) as queries:
+                self.save(GoodsReceiptSerializer, {"items": self.receipt_lines(lines)}, receipt)
+            counts.append(len(queries))
+            self.assertEqual(receipt.items.count(), lines)
+        self.assertEqual(counts[0], counts[1])
+
+    def test_product_images_are_created_and_detached_in_one_request(self):
+        product = self.save(ProductSerializer, {"price": 20, "images": [{}, {}]})
+        images = list(product.images.all())
+        self.assertEqual(len(images), 2)
+        self.assertEqual(Inventory.objects.filter(product=product).count(), 1)
+
+        kept, removed = images
+        with mock.patch("base.services.images.ImageDerivatives.schedule") as schedule:
+            self.save(ProductSerializer, {"images": [{"id": str(kept.pk)}, {}]}, product)
+        # post_save is still sent for every written row
+        self.assertEqual(schedule.call_count, 2)
+
+        self.assertEqual(product.images.count(), 2)
+        self.assertTrue(product.images.filter(pk=kept.pk).exists())
+        # ProductImage.product is nullable: removed images are detached, not deleted
+        removed.refresh_from_db()
+        self.assertIsNone(removed.product_id)
+        self.assertEqual(Inventory.objects.filter(product=product).count(), 1)
+
+    def test_product_image_query_count_does_not_grow_with_images(self):
+        counts = []
+        for images in (2, 8):
+            product = self.create_product(f"Product {images}")
+            with CaptureQueriesContext(connection) as queries:
+                self.save(ProductSerializer, {"images": [{} for _ in range(images)]}, product)
+            counts.append(len(queries))
+            self.assertEqual(product.images.count(), images)
+        self.assertEqual(counts[0], counts[1])
+
+
+class OrderTotalsTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name=ShortContent.objects.create(origin="Totals"), price=10)
+        self.order = Order.objects.create(vat_rate=10, shipping_fee=5)
+
+    def totals(self, order=None):
+        order = Order.objects.get(pk=(order or self.order).pk)
+        return order.subtotal, order.item_count, order.tax_total, order.grand_total
+
+    def test_item_writes_refresh_the_order(self):
+        item = OrderItem.objects.create(order=self.order, product=self.product, quantity=2, price=10)
+        self.assertEqual(self.totals(), (20, 1, 2, 27))
+        item.quantity = 3
+        item.save()
+        self.assertEqual(self.totals(), (30, 1, 3, 38))
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=1, price=5)
+        self.assertEqual(self.totals(), (35, 2, 3.5, 43.5))
+        item.delete()
+        self.assertEqual(self.totals(), (5, 1, 0.5, 10.5))
+
+    def test_saving_a_stale_order_keeps_the_item_totals(self):
+        stale = Order.objects.get(pk=self.order.pk)
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2, price=10)
+        stale.shipping_fee = 7
+        stale.save()
+        self.assertEqual(self.totals(), (20, 1, 2, 29))
+        # The totals of the saved instance are read again on access
+        self.assertEqual(stale.grand_total, 29)
+
+    def test_nested_create_refreshes_the_totals_once(self):
+        data = {
+            "vat_rate": 10,
+            "shipping_fee": 5,
+            "items": [
+                {"product_id": str(self.product.pk), "quantity": 2, "price": 10},
+                {"product_id": str(self.product.pk), "quantity": 1, "price": 5, "amount": 999},
+            ],
+        }
+        serializer = OrderSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as queries:
+            order = serializer.save()
+        refreshes = [query for query in queries if query["sql"].startswith('UPDATE "ecommerce_orders" SET "subtotal"')]
+        self.assertEqual(len(refreshes), 1)
+        # The client-sent amount is ignored
+        self.assertEqual(self.totals(order), (25, 2, 2.5, 32.5))
+        self.assertEqual(serializer.data["grand_total"], 32.5)
+
+    def test_readers_use_the_stored_totals(self):
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2, price=10)
+        request = APIRequestFactory().get("/", {"limit": 5})
+        with CaptureQueriesContext(connection) as queries:
+            response = recent_orders(request)
+        self.assertFalse([query for query in queries if "ecommerce_order_items" in query["sql"]])
+        self.assertEqual(response.data[0]["total_amount"], 20)
+        self.assertEqual(response.data[0]["grand_total"], 27)
+
+    @override_settings(VNPAY_TMN_CODE="TEST", VNPAY_HASH_SECRET_KEY="secret")
+    def test_vnpay_amount_is_the_stored_subtotal(self):
+        user = get_user_model().objects.create(email="payer@example.com")
+        self.order.customer = Customer.objects.create(email="payer@example.com", user=user)
+        self.order.save()
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2, price=10)
+        request = APIRequestFactory().post("/", {"order_id": str(self.order.pk)}, format="json")
+        force_authenticate(request, user=user)
+        # VNPay writes a debug file into the working directory
+        with mock.patch("ecommerce.vnpay.open", mock.mock_open(), create=True):
+            response = create_payment(request)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertIn("vnp_Amount=2000&", response.data["payment_url"])
+
+    def test_verify_order_totals_finds_and_repairs_drift(self):
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2, price=10)
+        other = Order.objects.create()
+        # Raw writes that bypass the refresh
+        Order.objects.filter(pk=self.order.pk).update(subtotal=999, grand_total=999)
+        OrderItem.objects.create(order=other, product=self.product, quantity=1, price=4)
+        Order.objects.filter(pk=other.pk).update(item_count=0)
+
+        out = StringIO()
+        call_command("verify_order_totals", stdout=out)
+        self.assertIn(str(self.order.pk), out.getvalue())
+        self.assertIn(str(other.pk), out.getvalue())
+        self.assertEqual(self.totals()[0], 999)
+
+        call_command("verify_order_totals", "--repair", stdout=StringIO())
+        self.assertEqual(self.totals(), (20, 1, 2, 27))
+        self.assertEqual(self.totals(other), (4, 1, 0, 4))
+        out = StringIO()
+        call_command("verify_order_totals", stdout=out)
+        self.assertIn("All order totals match", out.getvalue())
 
-# Create your tests here.
@@ -4,8 +4,9 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 from django.shortcuts import get_object_or_404
 
-from ..models import Cart, CartItem, Product, Customer
+from ..models import Cart, CartItem, Product
 from ..serializers import CartSerializer
+from ..services import get_current_customer
 from ..serializers.cart_item import CartItemSerializer
 
 class CartViewSet(BaseViewSet):
@@ -18,69 +19,6 @@ class CartViewSet(BaseViewSet):
     permission_classes = [AllowAny]
     required_alternate_scopes = {}
 
-    def _get_current_customer(self, request):
-        """Get current customer with proper authentication checks"""
-        customer_id = None
-        
-        # Priority 1: Check Bearer token in Authorization header
-        auth_header = request.META.get('HTTP_AUTHORIZATION')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            try:
-                from django.core.cache import cache
-                import hashlib
-                token_hash = hashlib.sha256(token.encode()).hexdigest()
-                cache_key = f'customer_token_{token_hash}'
-                customer_id = cache.get(cache_key)
-                
-                if customer_id:
-                    print(f"[CART] Found customer {customer_id} from token cache")
-                else:
-                    print(f"[CART] Token not found in cache or expired")
-            except Exception as e:
-                print(f"[CART] Error checking token cache: {e}")
-                customer_id = None
-
-        # Priority 2: Check session (fallback)
-        if not customer_id:
-            try:
-                customer_id = request.session.get('customer_id')
-                if customer_id:
-                    print(f"[CART] Found customer {customer_id} from session")
-            except Exception as e:
-                print(f"[CART] Error checking session: {e}")
-                customer_id = None
-
-        # If we have customer_id, fetch the actual customer object
-        if customer_id:
-            try:
-                customer = Customer.objects.get(id=customer_id)
-                print(f"[CART] Retrieved customer: {customer.id} ({customer.email})")
-                return customer
-            except Customer.DoesNotExist:
-                print(f"[CART] Customer {customer_id} not found in database")
-                return None
-
-        # Priority 3: Check authenticated DRF user (for admin/staff)
-        user = getattr(request, "user", None)
-        if user and getattr(user, 'is_authenticated', False):
-            user_id = getattr(user, 'id', None) or getattr(user, 'pk', None)
-            if user_id:
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                try:
-                    actual_user = User.objects.get(pk=user_id)
-                    customer = Customer.objects.filter(user=actual_user).first()
-                    if customer:
-                        print(f"[CART] Found customer {customer.id} from DRF user")
-                    return customer
-                except User.DoesNotExist:
-                    print(f"[CART] User {user_id} not found")
-                    return None
-
-        print(f"[CART] No customer found - not authenticated")
-        return None
-
     def _get_or_create_cart(self, customer):
         if customer is None:
             return None
@@ -88,7 +26,7 @@ class CartViewSet(BaseViewSet):
         return cart
 
     def list(self, request, *args, **kwargs):
-        customer = self._get_current_customer(request)
+        customer = get_current_customer(request)
         cart = self._get_or_create_cart(customer)
         if cart is None:
             data = CartSerializer(instance=Cart(), context=self.get_serializer_context()).data
@@ -99,7 +37,7 @@ class CartViewSet(BaseViewSet):
 
     def retrieve(self, request, *args, **kwargs):
         """Retrieve a specific cart by ID - ensure it belongs to current customer"""
-        customer = self._get_current_customer(request)
+        customer = get_current_customer(request)
         if customer is None:
             return Response({"detail": "Not authenticated"}, status=status.HTTP_401_UNAUTHORIZED)
         
@@ -119,7 +57,7 @@ class CartViewSet(BaseViewSet):
         Expected payload: { "product_id": number, "quantity": number }
         Returns: CartItem serialized
         """
-        customer = self._get_current_customer(request)
+        customer = get_current_customer(request)
         cart = self._get_or_create_cart(customer)
         if cart is None:
             return Response({"detail": "Customer not found."}, status=status.HTTP_400_BAD_REQUEST)
@@ -158,7 +96,7 @@ class CartViewSet(BaseViewSet):
 
     def update(self, request, *args, **kwargs):
         """Treat pk as CartItem id and update its quantity."""
-        customer = self._get_current_customer(request)
+        customer = get_current_customer(request)
         if customer is None:
             return Response({"detail": "Not authenticated"}, status=status.HTTP_401_UNAUTHORIZED)
         
@@ -185,7 +123,7 @@ class CartViewSet(BaseViewSet):
 
     def destroy(self, request, *args, **kwargs):
         """Treat pk as CartItem id and delete it."""
-        customer = self._get_current_customer(request)
+        customer = get_current_customer(request)
         if customer is None:
             return Response({"detail": "Not authenticated"}, status=status.HTTP_401_UNAUTHORIZED)
         
@@ -37,7 +37,12 @@ from oauth.serializers import UserShortSerializer
 from oauth.permissions import IsAdministrator
 from ..models import Customer
 from ..serializers import CustomerSerializer
-from ..services import CustomerService
+from ..services import (
+    CustomerContext,
+    CustomerService,
+    get_current_customer,
+    get_customer_context,
+)
 
 User = get_user_model()
 AccessToken = get_access_token_model()
@@ -275,11 +280,7 @@ class CustomerViewSet(OAuthLibMixin, BaseViewSet):
                     
                     # Also clear the cache for the old token
                     try:
-                        from django.core.cache import cache
-                        import hashlib
-                        old_token_hash = hashlib.sha256(old_access_token.encode()).hexdigest()
-                        old_cache_key = f'customer_token_{old_token_hash}'
-                        cache.delete(old_cache_key)
+                        CustomerContext.forget_token(old_access_token)
                         print(f"[LOGIN] Cleared cache for old token on validation fail")
                     except Exception as e:
                         print(f"[LOGIN] Failed to clear cache for old token: {e}")
@@ -308,11 +309,7 @@ class CustomerViewSet(OAuthLibMixin, BaseViewSet):
                 
                 # Also clear the cache for the old token
                 try:
-                    from django.core.cache import cache
-                    import hashlib
-                    old_token_hash = hashlib.sha256(old_access_token.encode()).hexdigest()
-                    old_cache_key = f'customer_token_{old_token_hash}'
-                    cache.delete(old_cache_key)
+                    CustomerContext.forget_token(old_access_token)
                     print(f"[LOGIN] Cleared cache for old token")
                 except Exception as e:
                     print(f"[LOGIN] Failed to clear cache for old token: {e}")
@@ -371,14 +368,9 @@ class CustomerViewSet(OAuthLibMixin, BaseViewSet):
         access_token = token_payload.get('access_token')
         if access_token:
             try:
-                from django.core.cache import cache
-                import hashlib
-                # Hash the token to avoid cache key length issues
-                token_hash = hashlib.sha256(access_token.encode()).hexdigest()
-                cache_key = f'customer_token_{token_hash}'
                 # Cache for the same duration as the access token (default 1 hour = 3600 seconds)
                 expires_in = token_payload.get('expires_in', 3600)
-                cache.set(cache_key, str(customer.id), timeout=expires_in)
+                CustomerContext.remember_token(access_token, customer.id, timeout=expires_in)
                 print(f"[LOGIN] Cached customer_id {customer.id} for token hash (expires in {expires_in}s)")
             except Exception as e:
                 print(f"[LOGIN] Failed to cache token: {e}")
@@ -443,11 +435,10 @@ class CustomerViewSet(OAuthLibMixin, BaseViewSet):
         # Clear cache for access token FIRST before revoking
         if access_token:
             try:
-                from django.core.cache import cache
-                import hashlib
-                token_hash = hashlib.sha256(access_token.encode()).hexdigest()
-                cache_key = f'customer_token_{token_hash}'
-                cache.delete(cache_key)
+                customer = get_current_customer(request)
+                if customer is not None:
+                    CustomerContext.invalidate(customer)
+                CustomerContext.forget_token(access_token)
                 print(f"[LOGOUT] Cleared cache for access token")
             except Exception as e:
                 print(f"[LOGOUT] Failed to clear cache: {e}")
@@ -544,32 +535,18 @@ class CustomerViewSet(OAuthLibMixin, BaseViewSet):
             print(f"Userinfo request session: {dict(request.session)}")
             print(f"Userinfo request cookies: {request.COOKIES}")
             
-            customer_id = None
-            auth_header = request.META.get('HTTP_AUTHORIZATION')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                print(f"Userinfo: Trying to find customer by token")
-                from django.core.cache import cache
-                import hashlib
-                token_hash = hashlib.sha256(token.encode()).hexdigest()
-                cache_key = f'customer_token_{token_hash}'
-                customer_id = cache.get(cache_key)
-                print(f"Userinfo: Found customer_id from cache: {customer_id}")
-
-            if not customer_id:
-                customer_id = request.session.get('customer_id')
-            
+            context = get_customer_context(request)
+            customer_id = context.customer_id
             if not customer_id:
                 print("No customer_id in session or cache")
                 return Response({"error": _("Not authenticated"), "session": dict(request.session)}, status=HTTP_401_UNAUTHORIZED)
             
-            print(f"Found customer_id in session: {customer_id}")
-            customer = Customer.objects.get(id=customer_id)
+            customer = context.customer
+            if customer is None:
+                print(f"Customer with id {customer_id} not found")
+                return Response({"error": _("Customer not found")}, status=HTTP_404_NOT_FOUND)
             serializer = CustomerSerializer(customer)
             return Response({"customer": serializer.data}, status=HTTP_200_OK)
-        except Customer.DoesNotExist:
-            print(f"Customer with id {customer_id} not found")
-            return Response({"error": _("Customer not found")}, status=HTTP_404_NOT_FOUND)
         except Exception as e:
             print(f"Userinfo error: {e}")
             return Response({"message": _("Customer not found.")}, status=HTTP_404_NOT_FOUND)
@@ -581,28 +558,11 @@ class CustomerViewSet(OAuthLibMixin, BaseViewSet):
             print(f"Profile update session: {request.session.get('customer_id')}")
             print(f"Authorization header: {request.META.get('HTTP_AUTHORIZATION')}")
             
-            customer_id = None
-            auth_header = request.META.get('HTTP_AUTHORIZATION')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                print(f"Trying to find customer by token")
-                from django.core.cache import cache
-                import hashlib
-                token_hash = hashlib.sha256(token.encode()).hexdigest()
-                cache_key = f'customer_token_{token_hash}'
-                customer_id = cache.get(cache_key)
-                print(f"Found customer_id from cache: {customer_id}")
-                if customer_id:
-                    print(f"Successfully authenticated with token")
-                else:
-                    print(f"Token not found in cache")
-            
-            if not customer_id:
-                customer_id = request.session.get('customer_id')
-            
+            customer_id = get_customer_context(request).customer_id
             if not customer_id:
                 return Response({"error": _("Not authenticated")}, status=HTTP_401_UNAUTHORIZED)
             
+            # Edit a fresh row, not the cached one; saving it invalidates the cache.
             customer = Customer.objects.get(id=customer_id)
             
             customer.first_name = request.data.get("first_name", customer.first_name)
@@ -646,21 +606,11 @@ class CustomerViewSet(OAuthLibMixin, BaseViewSet):
         try:
             print(f"Change password request data: {request.data}")
             
-            customer_id = None
-            auth_header = request.META.get('HTTP_AUTHORIZATION')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                from django.core.cache import cache
-                import hashlib
-                token_hash = hashlib.sha256(token.encode()).hexdigest()
-                cache_key = f'customer_token_{token_hash}'
-                customer_id = cache.get(cache_key)
-            if not customer_id:
-                customer_id = request.session.get('customer_id')
+            customer_id = get_customer_context(request).customer_id
             if not customer_id:
                 return Response({"error": _("Not authenticated")}, status=HTTP_401_UNAUTHORIZED)
 
-            customer = Customer.objects.get(id=customer_id)
+            customer = Customer.objects.select_related('user').get(id=customer_id)
             user = customer.user
             
             current_password = request.data.get("current_password")
@@ -7,8 +7,9 @@ from django.contrib.auth import get_user_model
 
 from base.views import BaseViewSet
 from common.constants import Http
-from ..models import GoodsReceipt, Product, Inventory, InventoryTransaction
+from ..models import GoodsReceipt
 from ..serializers import GoodsReceiptSerializer
+from ..services import InventoryService
 
 User = get_user_model()
 
@@ -28,6 +29,11 @@ class GoodsReceiptViewSet(BaseViewSet):
         "reference_code": "icontains",
         "note": "icontains",
     }
+    filter_map = {
+        "is_applied": "is_applied",
+        "reference_code": "reference_code",
+        "date": "date",
+    }
     serializer_class = GoodsReceiptSerializer
     required_alternate_scopes = {
         "list": [
@@ -169,22 +175,19 @@ class GoodsReceiptViewSet(BaseViewSet):
                 user_instance = None
 
         with transaction.atomic():
-            items = receipt.items.select_related("product").all()
-            for item in items:
-                product: Product = item.product
-                # Convert Decimal to float for calculation
-                quantity = float(item.quantity or 0.0)
-                
-                # ✅ USE HELPER METHOD - No need to update Product.in_stock manually
-                # add_stock() will update Inventory.current_quantity and create transaction log
-                product.add_stock(
-                    quantity=quantity,
-                    reason=receipt.note or "Goods receipt applied",
-                    reference_number=f"GR-{receipt.id}",
-                    user=user_instance
-                )
-
-        receipt.mark_applied()
+            # Re-read the flag under a row lock so concurrent calls apply the receipt once
+            if GoodsReceipt.objects.select_for_update().filter(pk=receipt.pk).values_list("is_applied", flat=True).get():
+                return Response({"detail": "Receipt already applied"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # One stock movement per product, whatever the number of lines
+            # (Inventory.current_quantity and the transaction log, see InventoryService)
+            InventoryService.receive(
+                [(item.product_id, item.quantity) for item in receipt.items.all()],
+                reference_number=f"GR-{receipt.id}",
+                reason=receipt.note or "Goods receipt applied",
+                user=user_instance
+            )
+            receipt.mark_applied()
 
         serializer = self.get_serializer(receipt)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -213,20 +216,22 @@ class GoodsReceiptViewSet(BaseViewSet):
                 user_instance = None
 
         with transaction.atomic():
-            items = receipt.items.select_related("product").all()
-            for item in items:
-                product: Product = item.product
-                # Convert Decimal to float for calculation
-                quantity = float(item.quantity or 0.0)
-                
-                # ✅ REDUCE STOCK - Reverse the apply operation
-                product.reduce_stock(
-                    quantity=quantity,
-                    reason=f"Unapply goods receipt: {receipt.note or 'No note'}",
-                    reference_number=f"GR-UNAPPLY-{receipt.id}",
-                    user=user_instance
+            if not GoodsReceipt.objects.select_for_update().filter(pk=receipt.pk).values_list("is_applied", flat=True).get():
+                return Response(
+                    {"detail": "Receipt is not applied yet. Nothing to unapply."},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
 
+            # ✅ REDUCE STOCK - Reverse the apply operation
+            errors = InventoryService.issue(
+                [(item.product_id, item.quantity) for item in receipt.items.all()],
+                reference_number=f"GR-UNAPPLY-{receipt.id}",
+                reason=f"Unapply goods receipt: {receipt.note or 'No note'}",
+                user=user_instance
+            )
+            if errors:
+                log.warning("[GoodsReceipt.unapply] id=%s %s", receipt.id, "; ".join(errors))
+
             # ✅ MARK AS UNAPPLIED
             receipt.is_applied = False
             receipt.applied_at = None
@@ -2,12 +2,15 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from rest_framework.response import Response
-from django.db.models import Q, Sum, Count
+from rest_framework.exceptions import ValidationError
+from datetime import datetime, time
 from django.db import transaction
-from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from common.constants import Http
 from base.views import BaseViewSet
-from ..models import Inventory, InventoryTransaction, Product, InventoryConfiguration
+from ..models import Inventory, InventoryTransaction, Product
+from ..services import InventoryValuationService
 from ..serializers import (
     InventorySerializer, 
     InventoryShortSerializer, 
@@ -21,6 +24,13 @@ class InventoryViewSet(BaseViewSet):
     search_map = {
         "product__name__origin": "icontains",
     }
+    # Category and stock status are applied by processParams below.
+    filter_map = {
+        "product": "product",
+        "categories": None,
+        "category_id": None,
+        "stock_status": None,
+    }
     serializer_class = InventorySerializer
     serializer_map = {
         "summary_list": InventoryShortSerializer,
@@ -34,20 +44,21 @@ class InventoryViewSet(BaseViewSet):
         "summary_list": [["ecommerce:inventory:view"], ["ecommerce:inventory:edit"]],
         "adjust_stock": [["ecommerce:inventory:edit"]],
         "get_stats": [["ecommerce:inventory:view"], ["ecommerce:inventory:edit"]],
+        "get_valuation": [["ecommerce:inventory:view"], ["ecommerce:inventory:edit"]],
         "get_low_stock": [["ecommerce:inventory:view"], ["ecommerce:inventory:edit"]],
         "inventory_config": [["ecommerce:inventory:view"], ["ecommerce:inventory:edit"]],
     }
 
     def get_permissions(self):
         """Allow public access for development"""
-        if self.action in ['list', 'retrieve', 'summary_list', 'get_stats', 'get_low_stock', 'inventory_config', 'update', 'partial_update']:
+        if self.action in ['list', 'retrieve', 'summary_list', 'get_stats', 'get_valuation', 'get_low_stock', 'inventory_config', 'update', 'partial_update']:
             return [AllowAny()]
         return [IsAuthenticated()]
     
     def processParams(self, request):
         """Override processParams to handle inventory-specific filters (category_id/category, etc.)"""
         # Get active configuration
-        config = InventoryConfiguration.get_active_config()
+        config = InventoryValuationService.active_config()
         
         # Extract category param(s) before parent processes (support both category_id and category)
         raw_category = request.query_params.get('category_id', None)
@@ -60,6 +71,8 @@ class InventoryViewSet(BaseViewSet):
         # Call parent to handle basic filtering and params
         try:
             queryset, page_size = super().processParams(request)
+        except ValidationError:
+            raise
         except Exception:
             # If parent fails, fall back to default queryset gracefully
             queryset = self.filter_queryset(self.get_queryset())
@@ -85,18 +98,14 @@ class InventoryViewSet(BaseViewSet):
             stock_status = raw_stock_status.strip().lower()
             if stock_status and stock_status not in {"nan", "undefined", "null", "none"}:
                 try:
+                    # Same thresholds as the stats (InventoryConfiguration.is_*_stock)
+                    states = InventoryValuationService.stock_filters(config)
                     if stock_status in ("out_of_stock", "out"):
-                        queryset = queryset.filter(current_quantity__lte=config.out_of_stock_threshold)
+                        queryset = queryset.filter(states["out_of_stock"])
                     elif stock_status in ("low_stock", "low"):
-                        # Filter items that are above out_of_stock but at or below their threshold
-                        # This is complex because threshold can vary by item, so we do it in Python
-                        # For now, use min_quantity as default (most common case)
-                        queryset = queryset.filter(
-                            current_quantity__gt=config.out_of_stock_threshold,
-                            current_quantity__lte=models.F('min_quantity')
-                        )
+                        queryset = queryset.filter(states["low_stock"])
                     elif stock_status in ("in_stock", "in"):
-                        queryset = queryset.filter(current_quantity__gt=models.F('min_quantity'))
+                        queryset = queryset.filter(states["in_stock"])
                     # else: ignore unknown value
                 except Exception:
                     # Fail-soft: ignore invalid filter
@@ -108,6 +117,8 @@ class InventoryViewSet(BaseViewSet):
         """Override list to add error handling"""
         try:
             return super().list(request, *args, **kwargs)
+        except ValidationError:
+            raise
         except Exception as e:
             return Response(
                 {'error': 'Failed to retrieve inventory list: ' + str(e)},
@@ -128,6 +139,8 @@ class InventoryViewSet(BaseViewSet):
             else:
                 data = self.get_serializer(queryset, many=True).data
                 return Response(data, status=status.HTTP_200_OK)
+        except ValidationError:
+            raise
         except Exception as e:
             return Response(
                 {'error': 'Failed to retrieve inventory list: ' + str(e)},
@@ -138,33 +151,12 @@ class InventoryViewSet(BaseViewSet):
     def get_stats(self, request, *args, **kwargs):
         """Get inventory statistics"""
         try:
-            # Get active configuration
-            config = InventoryConfiguration.get_active_config()
-            
-            total_products = self.get_queryset().count()
-            low_stock_count = self.get_queryset().filter(
-                current_quantity__lte=models.F('min_quantity'),
-                current_quantity__gt=config.out_of_stock_threshold
-            ).count()
-            out_of_stock_count = self.get_queryset().filter(
-                current_quantity__lte=config.out_of_stock_threshold
-            ).count()
-            
-            # Calculate total stock value
-            total_value = 0
-            for inventory in self.get_queryset():
-                try:
-                    if inventory.product and hasattr(inventory.product, 'price') and inventory.product.price:
-                        total_value += inventory.product.price * inventory.current_quantity
-                except (AttributeError, Exception):
-                    # Product deleted or missing price, skip it
-                    continue
+            # Counts, value and per-category breakdown come from two cached aggregate queries
+            config = InventoryValuationService.active_config()
+            summary = InventoryValuationService.summary(config)
 
             data = {
-                'total_products': total_products,
-                'total_value': total_value,
-                'low_stock_count': low_stock_count,
-                'out_of_stock_count': out_of_stock_count,
+                **summary,
                 'config': {
                     'out_of_stock_threshold': config.out_of_stock_threshold,
                     'low_stock_threshold_type': config.low_stock_threshold_type,
@@ -181,6 +173,28 @@ class InventoryViewSet(BaseViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=[Http.HTTP_GET], url_path="valuation")
+    def get_valuation(self, request, *args, **kwargs):
+        """Stock quantity and value at a point in time (?at=YYYY-MM-DD or an ISO datetime, default now)"""
+        raw_at = request.query_params.get('at')
+        at = None
+        if raw_at:
+            try:
+                day = parse_date(raw_at)
+                # A day means its end
+                at = datetime.combine(day, time.max) if day else parse_datetime(raw_at)
+            except ValueError:
+                at = None
+            if at is None:
+                return Response(
+                    {'error': 'Invalid date, expected YYYY-MM-DD or an ISO datetime'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+        data = InventoryValuationService.valuation_at(at)
+        return Response(data, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=[Http.HTTP_GET], url_path="low-stock")
     def get_low_stock(self, request, *args, **kwargs):
         """Get low stock items"""
@@ -266,7 +280,7 @@ class InventoryViewSet(BaseViewSet):
     def inventory_config(self, request, *args, **kwargs):
         """Get or update inventory configuration"""
         try:
-            config = InventoryConfiguration.get_active_config()
+            config = InventoryValuationService.active_config()
             
             # Handle GET request
             if request.method == Http.HTTP_GET.upper():
@@ -6,13 +6,15 @@ from common.constants import Http
 from base.views import BaseViewSet
 from ..models import Product
 from ..serializers import ProductSerializer, ProductShortSerializer
+from ..services import ProductSearchService
 
 
 class ProductViewSet(BaseViewSet):
     queryset = Product.objects.select_related('inventory').all()
-    search_map = {
-        "name__origin": "icontains",
-        "description__origin": "icontains"
+    filter_map = {
+        "categories": "categories",
+        "min_price": "price__gte",
+        "max_price": "price__lte",
     }
     serializer_class = ProductSerializer
     serializer_map = {
@@ -27,6 +29,26 @@ class ProductViewSet(BaseViewSet):
         "summary_list": [["ecommerce:products:view"], ["ecommerce:products:edit"]]
     }
 
+    def get_queryset(self):
+        # Read actions get every nested relation preloaded; writes keep the plain queryset
+        # so the response is not rendered from stale prefetch caches.
+        if self.action in ["list", "retrieve"]:
+            return Product.objects.catalog()
+        if self.action == "summary_list":
+            return Product.objects.summary_catalog()
+        return super().get_queryset()
+
+    def processParams(self, request):
+        # Keywords go through ProductSearchService (OpenSearch or the search_text index)
+        # instead of `search_map`.
+        queryset, page_size = super().processParams(request)
+        keyword = request.query_params.get('keyword') or request.query_params.get('search')
+        if keyword and keyword.strip():
+            queryset = ProductSearchService.search(
+                queryset, keyword.strip(), ranked=not request.query_params.get('ordering')
+            )
+        return queryset, page_size
+
     def get_permissions(self):
         """Allow public access for listing and viewing products."""
         if self.action in ["list", "retrieve", "summary_list"]:
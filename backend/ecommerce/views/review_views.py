@@ -2,10 +2,11 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from django.db import transaction
 from django.db.models import Avg, Count, Q
 from django.shortcuts import get_object_or_404
 
-from ecommerce.models import ProductReview, ReviewHelpful, Product, Customer
+from ecommerce.models import ProductReview, ReviewHelpful, Product
 from ecommerce.serializers.review_serializer import (
     ProductReviewSerializer,
     ProductReviewCreateSerializer,
@@ -13,6 +14,7 @@ from ecommerce.serializers.review_serializer import (
     ProductReviewListSerializer
 )
 from ecommerce.permissions import IsReviewOwnerOrReadOnly, HasPurchasedProduct
+from ecommerce.services import get_user_customer
 
 
 class ProductReviewViewSet(viewsets.ModelViewSet):
@@ -84,9 +86,19 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    # Review writes and their rating summary update (ecommerce.signals) commit together.
+    @transaction.atomic
     def perform_create(self, serializer):
         """Tạo review - customer được set từ serializer validation"""
         serializer.save()
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticatedOrReadOnly])
     def mark_helpful(self, request, pk=None):
@@ -97,10 +109,8 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
         review = self.get_object()
         
         # Lấy customer
-        user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-        try:
-            customer = Customer.objects.get(user_id=user_id)
-        except Customer.DoesNotExist:
+        customer = get_user_customer(request)
+        if customer is None:
             return Response(
                 {'detail': 'Không tìm thấy thông tin khách hàng'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -142,10 +152,8 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
         """
         review = self.get_object()
         
-        user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-        try:
-            customer = Customer.objects.get(user_id=user_id)
-        except Customer.DoesNotExist:
+        customer = get_user_customer(request)
+        if customer is None:
             return Response(
                 {'detail': 'Không tìm thấy thông tin khách hàng'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -186,7 +194,7 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            product = Product.objects.get(id=product_id)
+            product = Product.objects.select_related('rating_summary').get(id=product_id)
         except Product.DoesNotExist:
             return Response(
                 {'detail': 'Không tìm thấy sản phẩm'},
@@ -209,10 +217,8 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
         Lấy danh sách reviews của user hiện tại
         GET /reviews/my_reviews/
         """
-        user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-        try:
-            customer = Customer.objects.get(user_id=user_id)
-        except Customer.DoesNotExist:
+        customer = get_user_customer(request)
+        if customer is None:
             return Response(
                 {'detail': 'Không tìm thấy thông tin khách hàng'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -248,12 +254,8 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_200_OK
                 )
             
-            # Get user ID from JWT token
-            user_id = request.user.id if hasattr(request.user, 'id') else str(request.user)
-            
-            try:
-                customer = Customer.objects.get(user_id=user_id)
-            except Customer.DoesNotExist:
+            customer = get_user_customer(request)
+            if customer is None:
                 return Response(
                     {'can_review': False, 'message': 'Không tìm thấy thông tin khách hàng'},
                     status=status.HTTP_200_OK
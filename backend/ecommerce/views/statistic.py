@@ -1,13 +1,12 @@
 from django.db.models import Count, Sum, Avg, Q
-from django.db.models.functions import TruncDate, TruncMonth
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import timedelta
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 
-from ..models import Product, Order, Customer, OrderItem
+from ..models import Product, Order, DailyStatistic, DailyProductStatistic
 from ..constants import OrderStatus, PaymenStatus
 
 
@@ -22,53 +21,42 @@ def general_statistics(request):
         last_month_start = today.replace(day=1) - timedelta(days=1)
         last_month_start = last_month_start.replace(day=1)
         current_month_start = today.replace(day=1)
-        
-        total_products = Product.objects.count()
-        total_orders = Order.objects.count()
-        total_customers = Customer.objects.count()
-        
-        total_revenue = OrderItem.objects.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
 
-        products_last_month = Product.objects.filter(
-            created_at__gte=last_month_start,
-            created_at__lt=current_month_start
-        ).count()
-        products_this_month = Product.objects.filter(
-            created_at__gte=current_month_start
-        ).count()
-        products_growth = calculate_growth_percentage(products_last_month, products_this_month)
-        
-        orders_last_month = Order.objects.filter(
-            created_at__gte=last_month_start,
-            created_at__lt=current_month_start
-        ).count()
-        orders_this_month = Order.objects.filter(
-            created_at__gte=current_month_start
-        ).count()
-        orders_growth = calculate_growth_percentage(orders_last_month, orders_this_month)
-        
-        customers_last_month = Customer.objects.filter(
-            created_at__gte=last_month_start,
-            created_at__lt=current_month_start
-        ).count()
-        customers_this_month = Customer.objects.filter(
-            created_at__gte=current_month_start
-        ).count()
-        customers_growth = calculate_growth_percentage(customers_last_month, customers_this_month)
-        
-        revenue_last_month = OrderItem.objects.filter(
-            order__created_at__gte=last_month_start,
-            order__created_at__lt=current_month_start
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        revenue_this_month = OrderItem.objects.filter(
-            order__created_at__gte=current_month_start
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        revenue_growth = calculate_growth_percentage(revenue_last_month, revenue_this_month)
+        # Everything is read from the daily rollup in a single aggregate query.
+        last_month = Q(date__gte=last_month_start, date__lt=current_month_start)
+        this_month = Q(date__gte=current_month_start)
+        totals = DailyStatistic.objects.aggregate(
+            total_products=Sum('new_products'),
+            total_orders=Sum('order_count'),
+            total_customers=Sum('new_customers'),
+            total_revenue=Sum('revenue'),
+            products_last_month=Sum('new_products', filter=last_month),
+            products_this_month=Sum('new_products', filter=this_month),
+            orders_last_month=Sum('order_count', filter=last_month),
+            orders_this_month=Sum('order_count', filter=this_month),
+            customers_last_month=Sum('new_customers', filter=last_month),
+            customers_this_month=Sum('new_customers', filter=this_month),
+            revenue_last_month=Sum('revenue', filter=last_month),
+            revenue_this_month=Sum('revenue', filter=this_month),
+        )
+        totals = {key: value or 0 for key, value in totals.items()}
+
+        total_products = totals['total_products']
+        total_orders = totals['total_orders']
+        total_customers = totals['total_customers']
+        total_revenue = totals['total_revenue']
+        products_growth = calculate_growth_percentage(
+            totals['products_last_month'], totals['products_this_month']
+        )
+        orders_growth = calculate_growth_percentage(
+            totals['orders_last_month'], totals['orders_this_month']
+        )
+        customers_growth = calculate_growth_percentage(
+            totals['customers_last_month'], totals['customers_this_month']
+        )
+        revenue_growth = calculate_growth_percentage(
+            totals['revenue_last_month'], totals['revenue_this_month']
+        )
         
         data = {
             'total_products': total_products,
@@ -109,30 +97,20 @@ def sales_data(request):
         else:
             start_date = end_date - timedelta(days=30)
         
-        # Convert dates to datetime for proper comparison
-        from django.utils import timezone as tz
-        start_datetime = tz.make_aware(datetime.combine(start_date, datetime.min.time()))
-        end_datetime = tz.make_aware(datetime.combine(end_date, datetime.max.time()))
-        
-        sales_data = Order.objects.filter(
-            created_at__gte=start_datetime,
-            created_at__lte=end_datetime
-        ).annotate(
-            order_date=TruncDate('created_at')
-        ).values('order_date').annotate(
-            orders=Count('id'),
-            revenue=Sum('items__amount')
-        ).order_by('order_date')
+        sales_data = DailyStatistic.objects.filter(
+            date__gte=start_date,
+            date__lte=end_date
+        ).values('date', 'order_count', 'revenue')
         
         data = []
         current_date = start_date
-        sales_dict = {item['order_date']: item for item in sales_data}
+        sales_dict = {item['date']: item for item in sales_data}
         
         while current_date <= end_date:
             if current_date in sales_dict:
                 data.append({
                     'date': current_date.strftime('%Y-%m-%d'),
-                    'orders': sales_dict[current_date]['orders'],
+                    'orders': sales_dict[current_date]['order_count'],
                     'revenue': float(sales_dict[current_date]['revenue'] or 0)
                 })
             else:
@@ -194,23 +172,18 @@ def recent_orders(request):
     try:
         limit = int(request.GET.get('limit', 5))
         
-        orders = Order.objects.select_related('customer').prefetch_related(
-            'items'
-        ).order_by('-created_at')[:limit]
+        orders = Order.objects.select_related('customer').order_by('-created_at')[:limit]
         
         data = []
         for order in orders:
-            total_amount = order.items.aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
             data.append({
                 'id': order.id,
                 'customer_name': order.customer_name or (
                     f"{order.customer.first_name} {order.customer.last_name}" 
                     if order.customer else "Guest"
                 ),
-                'total_amount': total_amount,
+                'total_amount': order.subtotal,
+                'grand_total': order.grand_total,
                 'order_status': order.order_status,
                 'payment_status': order.payment_status,
                 'created_at': order.created_at.isoformat()
@@ -234,12 +207,23 @@ def top_products(request):
     try:
         limit = int(request.GET.get('limit', 5))
         
-        products = Product.objects.annotate(
-            sold_quantity=Sum('orderitem__quantity'),
-            total_revenue=Sum('orderitem__amount')
-        ).filter(
-            sold_quantity__isnull=False
-        ).order_by('-sold_quantity')[:limit]
+        rows = list(
+            DailyProductStatistic.objects.values('product_id').annotate(
+                sold_quantity=Sum('quantity'),
+                total_revenue=Sum('revenue')
+            ).order_by('-sold_quantity')[:limit]
+        )
+        product_map = Product.objects.select_related('name', 'inventory').in_bulk(
+            [row['product_id'] for row in rows]
+        )
+        products = []
+        for row in rows:
+            product = product_map.get(row['product_id'])
+            if product is None:
+                continue
+            product.sold_quantity = row['sold_quantity']
+            product.total_revenue = row['total_revenue']
+            products.append(product)
         
         data = []
         for product in products:
@@ -102,9 +102,8 @@ def create_payment(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Calculate total amount from order items
-        from django.db.models import Sum
-        total_amount = order.items.aggregate(total=Sum('amount'))['total'] or 0
+        # Total amount of the order items, stored on the order
+        total_amount = order.subtotal
         
         if total_amount <= 0:
             return Response(
@@ -210,7 +209,7 @@ def payment_ipn(request):
         
         # Get order
         try:
-            order = Order.objects.prefetch_related('items').get(id=order_id)
+            order = Order.objects.get(id=order_id)
         except Order.DoesNotExist:
             logger.error(f'Order {order_id} not found in IPN')
             return Response({
@@ -218,9 +217,8 @@ def payment_ipn(request):
                 'Message': 'Order Not Found'
             })
         
-        # Calculate total amount from order items
-        from django.db.models import Sum
-        order_total = order.items.aggregate(total=Sum('amount'))['total'] or 0
+        # Total amount of the order items, stored on the order
+        order_total = order.subtotal
         
         # Check amount
         if abs(float(order_total) - amount) > 0.01:
@@ -3,6 +3,7 @@ from django.conf import settings
 from oauth.models.user import User
 from ..models import UserToken, NotificationImage
 from base.services.base import BaseService
+from base.services.jobs import JobQueue
 
 import os
 from datetime import datetime
@@ -54,6 +55,18 @@ class CloudMessageService(BaseService):
             print(f"Error uploading image: {str(e)}")
             return None
 
+    @classmethod
+    def asyn_send_cloud_message(cls, user_id, title='', body='', local_image_path=None):
+        """
+        Queue `send_cloud_message` for the job worker (queue "push"), so the request
+        does not wait for the image upload and the FCM round trip.
+        """
+        return JobQueue.enqueue(
+            "firebase.services.cloud_message.send_cloud_message_job",
+            {"user_id": str(user_id), "title": title, "body": body, "local_image_path": local_image_path},
+            queue="push",
+        )
+
     @classmethod
     def send_cloud_message(cls, user_id, title='', body='', local_image_path=None):
         """
@@ -123,3 +136,8 @@ class CloudMessageService(BaseService):
         print(success_message)
 
         return success_message
+
+
+def send_cloud_message_job(user_id, title='', body='', local_image_path=None):
+    """JobQueue handler of CloudMessageService.asyn_send_cloud_message."""
+    CloudMessageService.send_cloud_message(user_id, title=title, body=body, local_image_path=local_image_path)
@@ -29,9 +29,8 @@ class UserTokenViewSet(BaseViewSet):
         title = request.data.get('title', 'Default Title')
         body = request.data.get('body', 'Default Body')
 
-        # Send the cloud message with the custom title and body
-        message = CloudMessageService.send_cloud_message(
+        # Queue the cloud message with the custom title and body
+        CloudMessageService.asyn_send_cloud_message(
             user_id=request.auth.user.id, title=title, body=body, local_image_path="media/notification/Logo.jpg")
 
-        # Return a response indicating success or failure
-        return Response({"message": message}, status=status.HTTP_200_OK)
+        return Response({"message": "The message was queued"}, status=status.HTTP_202_ACCEPTED)
@@ -1,7 +1,7 @@
 from django.db import models
-from base.models import TimeStampedModel
+from base.models import TimeStampedModel, TreeModel
 from .unit_type import UnitType  
-class Unit(TimeStampedModel):
+class Unit(TimeStampedModel, TreeModel):
     name = models.CharField(max_length=255)
     email = models.EmailField(max_length=255, blank=True, null=True)
     slack_channel = models.CharField(max_length=255, blank=True, null=True)
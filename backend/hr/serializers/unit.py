@@ -6,8 +6,8 @@ from hr.models.unit import Unit
 from businesses.models.employee import Employee
 from base.serializers.writable_nested import WritableNestedSerializer
 from .unit_type import UnitTypeSerializer
-from base.serializers.recursive import RecursiveSerializer
-class UnitSerializer(WritableNestedSerializer):
+from base.serializers.tree import TreeParentMixin, TreeSerializer
+class UnitSerializer(TreeParentMixin, WritableNestedSerializer):
     type = UnitTypeSerializer(read_only=True, required=False)
     type_id = serializers.PrimaryKeyRelatedField(required=False,
                                                 queryset=UnitType.objects.all(),
@@ -44,7 +44,8 @@ class UnitSerializer(WritableNestedSerializer):
         }
         
 
-class UnitTreeSerializer(serializers.ModelSerializer):
+class UnitTreeSerializer(TreeSerializer):
+    children_field = "units"
     type = UnitTypeSerializer(read_only=True, required=False)
     type_id = serializers.PrimaryKeyRelatedField(required=False,
                                                 queryset=UnitType.objects.all(),
@@ -56,7 +57,6 @@ class UnitTreeSerializer(serializers.ModelSerializer):
                                                 source='manager')
     members = EmployeeShortSerializer(many=True, required=False)
     member_ids = serializers.PrimaryKeyRelatedField(required=False, write_only=True, many=True, allow_null=True, allow_empty=True,queryset=Employee.objects.all(), source='members')                                  
-    units = RecursiveSerializer(many=True)
     class Meta:
         model = Unit
         fields = [
@@ -71,13 +71,11 @@ class UnitTreeSerializer(serializers.ModelSerializer):
             "manager_id",
             "members",
             "member_ids",
-            "units",
         ]
         extra_kwargs = {
             'type': {'required': False},
             'name': {'required': False},
             'email': {'required': False, "allow_null": True},
             'slack_channel': {'required': False, "allow_null": True},
-            'units': {'required': False},
         }
 
@@ -13,6 +13,10 @@ from businesses.serializers.employee import EmployeeShortSerializer
 
 class OfficeViewSet(BaseViewSet):
     queryset = Office.objects.all()
+    filter_map = {
+        "group": "group",
+        "manager": "manager",
+    }
     serializer_class = OfficeSerializer
     search_map ={
         "address": "icontains",
@@ -8,6 +8,7 @@ from base.utils.string import StringUtil
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
 from common.constants.http import Http
 from businesses.models.employee import Employee
 from businesses.serializers.employee import EmployeeShortSerializer
@@ -15,6 +16,12 @@ class UnitViewSet(BaseViewSet):
     queryset = Unit.objects.all()
     queryset_map = {
         "retrieve": Unit.objects.prefetch_related("members"),
+        "tree": Unit.objects.select_related("type", "manager__user").prefetch_related("members__user"),
+    }
+    filter_map = {
+        "parent": "parent",
+        "type": "type",
+        "manager": "manager",
     }
     serializer_class = UnitSerializer
     serializer_map = {
@@ -61,8 +68,13 @@ class UnitViewSet(BaseViewSet):
     
     @action(methods=[Http.HTTP_GET], detail=False)
     def tree(self, request, *args, **kwargs):
-        query_set = self.get_queryset().filter(parent=None)
-        serializer = self.get_serializer(query_set, many=True)
+        """The whole organization, or the subtree of `?root=<unit id>`, nested in memory."""
+        query_set = self.get_queryset()
+        root_id = StringUtil.get_id(request.query_params.get("root", ""))
+        if root_id:
+            root = get_object_or_404(Unit, pk=root_id)
+            query_set = query_set.filter(root.subtree_filter(include_self=True))
+        serializer = self.get_serializer(query_set.order_by("tree_depth", "name"), many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
         
         
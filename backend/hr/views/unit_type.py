@@ -8,6 +8,7 @@ from rest_framework.response import Response
 
 class UnitTypeViewSet(BaseViewSet):
     queryset = UnitType.objects.all()
+    filter_map = {}
     serializer_class = UnitTypeSerializer
     search_map = {
         "name": "icontains",
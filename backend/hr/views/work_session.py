@@ -11,6 +11,9 @@ from ..serializers import WorkSessionSerializer
 
 class WorkSessionViewSet(BaseViewSet):
     queryset = WorkSession.objects.all()
+    filter_map = {
+        "office": "office",
+    }
     serializer_class = WorkSessionSerializer
     required_alternate_scopes = {
         "create": [["offices:edit"]],
@@ -1,9 +1,9 @@
 from django.db import models
 from django.template.defaultfilters import slugify
-from base.models import AuditModel
+from base.models import AuditModel, TreeModel
 from .namespace import Namespace
 
-class Page(AuditModel):
+class Page(AuditModel, TreeModel):
     title = models.TextField(blank=True)
     slug = models.SlugField(max_length=255, blank=True, default="", null=True)
     content = models.TextField(null=True, blank=True, default="")
@@ -2,5 +2,6 @@ from .namespace import NamespaceSerializer
 from .namespace_short import NamespaceShortSerializer
 from .page import PageSerializer
 from .page_short import PageShortSerializer
+from .page_tree import PageTreeSerializer
 from .home_page import HomePageSerializer
 from .statistic import GeneralStatisticSerializer, PagesCountByDateSerializer
\ No newline at end of file
@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from base.serializers.tree import TreeParentMixin
 from oauth.serializers import UserShortSerializer
 from ..models import Page,Namespace
 from .namespace_short import NamespaceShortSerializer
 
-class PageSerializer(serializers.ModelSerializer):
+class PageSerializer(TreeParentMixin, serializers.ModelSerializer):
     parent_id = serializers.UUIDField(required=False, allow_null=True)
     namespace = NamespaceShortSerializer(required=False)
     namespace_id = serializers.PrimaryKeyRelatedField(
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from base.serializers import TreeSerializer
+from ..models import Page
+
+
+class PageTreeSerializer(TreeSerializer):
+    parent_id = serializers.UUIDField(read_only=True)
+    namespace_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = Page
+        fields = [
+            "id",
+            "parent_id",
+            "namespace_id",
+            "title",
+            "slug",
+        ]
+        read_only_fields = fields
@@ -1,9 +1,13 @@
-from base.views import BaseViewSet
+from base.views import BaseViewSet, TreeViewMixin
 from ..models import Page
-from ..serializers import PageSerializer, PageShortSerializer
+from ..serializers import PageSerializer, PageShortSerializer, PageTreeSerializer
 
-class PageViewSet(BaseViewSet):
+class PageViewSet(TreeViewMixin, BaseViewSet):
     queryset = Page.objects.all()
+    queryset_map = {
+        "tree": Page.objects.defer("content"),
+    }
+    tree_ordering = ("title",)
     search_map = {
         "title": "icontains",
         "description": "icontains"
@@ -11,11 +15,20 @@ class PageViewSet(BaseViewSet):
     serializer_class = PageSerializer
     serializer_map = {
         "list": PageShortSerializer,
+        "tree": PageTreeSerializer,
     }
     required_alternate_scopes = {
         "list": [["knowledge:pages:view"], ["knowledge:pages:edit"]],
         "retrieve": [["knowledge:pages:view"], ["knowledge:pages:edit"]],
+        "tree": [["knowledge:pages:view"], ["knowledge:pages:edit"]],
         "create": [["knowledge:pages:edit"]],
         "update": [["knowledge:pages:edit"]],
         "destroy": [["knowledge:pages:edit"]]
-    }
\ No newline at end of file
+    }
+
+    def filter_tree_queryset(self, queryset):
+        """Pages of `?namespace=<id>`."""
+        namespace_id = self.request.query_params.get("namespace")
+        if namespace_id:
+            queryset = queryset.filter(namespace_id=namespace_id)
+        return queryset
@@ -1,17 +1,21 @@
 from django.contrib.auth import get_user_model
 from rest_framework.permissions import AllowAny
-from base.views import ViewOnlyViewSet
+from base.views import TreeViewMixin, ViewOnlyViewSet
 from ..models import Page
-from ..serializers import PageSerializer, PageShortSerializer
+from ..serializers import PageSerializer, PageShortSerializer, PageTreeSerializer
 from ..filters import PublicAcessFilterBackend
 
 User = get_user_model()
 
-class PagePublicViewSet(ViewOnlyViewSet):
+class PagePublicViewSet(TreeViewMixin, ViewOnlyViewSet):
     authentication_classes=[]
     permission_classes=[AllowAny]
     queryset = Page.objects.all()
+    queryset_map = {
+        "tree": Page.objects.defer("content"),
+    }
     filter_backends = [PublicAcessFilterBackend]
+    tree_ordering = ("title",)
     search_map = {
         "name": "icontains",
         "description": "icontains"
@@ -19,8 +23,17 @@ class PagePublicViewSet(ViewOnlyViewSet):
     serializer_class = PageSerializer
     serializer_map = {
         "list": PageShortSerializer,
+        "tree": PageTreeSerializer,
     }
     required_alternate_scopes = {
         "list": [["knowledge:pages:view"], ["knowledge:pages:edit"]],
-        "retrieve": [["knowledge:pages:view"], ["knowledge:pages:edit"]]
+        "retrieve": [["knowledge:pages:view"], ["knowledge:pages:edit"]],
+        "tree": [["knowledge:pages:view"], ["knowledge:pages:edit"]]
     }
+
+    def filter_tree_queryset(self, queryset):
+        """Pages of `?namespace=<id>`."""
+        namespace_id = self.request.query_params.get("namespace")
+        if namespace_id:
+            queryset = queryset.filter(namespace_id=namespace_id)
+        return queryset
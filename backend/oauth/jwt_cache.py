@@ -0,0 +1,96 @@
+import datetime
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+def token_digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    Thread-safe LRU of the claims of verified tokens, keyed by token digest. An entry never outlives the token's `exp`.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        if not expires_at or expires_at <= time.time() or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(getattr(settings, "JWT_VERIFIED_CACHE_SIZE", 10000))
+
+
+def revoked_cache_key(key):
+    return f"jwt_revoked:{key}"
+
+
+def revocation_timeout(expires):
+    """Seconds until `expires` (aware, or naive UTC), or the access token lifetime if unknown."""
+    if expires is None:
+        return settings.OAUTH2_PROVIDER.get("ACCESS_TOKEN_EXPIRE_SECONDS", 36000)
+    if timezone.is_naive(expires):
+        # Stored naive in UTC, see AccessToken.is_expired
+        expires = expires.replace(tzinfo=datetime.timezone.utc)
+    return max(1, int(expires.timestamp() - time.time()) + 1)
+
+
+def revoke_token(token, expires=None):
+    """
+    Forget a revoked token in this process and mark it revoked for the others
+    (through the default cache) until it would have expired anyway.
+    """
+    if not token:
+        return
+    digest = token_digest(token)
+    verified_tokens.discard(digest)
+    cache.set(revoked_cache_key(digest), True, revocation_timeout(expires))
+
+
+def revoke_id_token(jti, expires=None):
+    """ID tokens are not stored verbatim, so they are marked revoked by `jti`."""
+    if jti:
+        cache.set(revoked_cache_key(f"jti:{jti}"), True, revocation_timeout(expires))
+
+
+def is_revoked(digest, jti=None):
+    keys = [revoked_cache_key(digest)]
+    if jti:
+        keys.append(revoked_cache_key(f"jti:{jti}"))
+    return bool(cache.get_many(keys))
@@ -0,0 +1,73 @@
+"""
+Time CustomOAuth2Validator.validate_bearer_jwt_token on one RS256 token:
+with the verified-token cache (hit) and with it emptied before every call (miss).
+The user and application created for the run are deleted afterwards.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from oauthlib.common import Request
+from oauth2_provider.settings import oauth2_settings
+
+from oauth.jwt_cache import verified_tokens
+from oauth.models import Application
+from oauth.oauth_validators import CustomOAuth2Validator, _audience_keys
+from oauth.tokens import signed_token_generator
+
+
+class Command(BaseCommand):
+    help = 'Benchmark JWT bearer token validation (cache hit and miss)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1000,
+            help='Validations per measurement',
+        )
+
+    def handle(self, *args, **options):
+        if not oauth2_settings.OIDC_RSA_PRIVATE_KEY:
+            raise CommandError('OIDC_RSA_PRIVATE_KEY is not configured')
+        iterations = max(1, options['iterations'])
+        user = get_user_model().objects.create(email=f'benchmark-{uuid.uuid4()}@example.com')
+        application = Application.objects.create(
+            client_id=str(uuid.uuid4()),
+            client_type=Application.CLIENT_CONFIDENTIAL,
+            authorization_grant_type=Application.GRANT_PASSWORD,
+            algorithm=Application.RS256_ALGORITHM,
+            name='token validation benchmark',
+        )
+        try:
+            request = Request('http://localhost')
+            request.user = user
+            request.client_id = application.client_id
+            request.scope = 'read'
+            request.scopes = ['read']
+            request.refresh_token_instance = None
+            request.expires_in = 3600
+            token = signed_token_generator(oauth2_settings.OIDC_RSA_PRIVATE_KEY, issuer='benchmark')(request)
+            validator = CustomOAuth2Validator()
+            if not validator.validate_bearer_jwt_token(token, ['read'], Request('http://localhost')):
+                raise CommandError('The benchmark token was rejected')
+
+            def measure(cold):
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    if cold:
+                        verified_tokens.clear()
+                        _audience_keys.clear()
+                    validator.validate_bearer_jwt_token(token, ['read'], Request('http://localhost'))
+                return (time.perf_counter() - start) / iterations * 1e6
+
+            miss = measure(cold=True)
+            hit = measure(cold=False)
+        finally:
+            application.delete()
+            user.delete()
+
+        self.stdout.write(f'Cache miss: {miss:.0f} us/validation')
+        self.stdout.write(f'Cache hit:  {hit:.0f} us/validation')
+        self.stdout.write(self.style.SUCCESS(f'Done. {iterations} validations per measurement'))
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 import pytz
+from ..jwt_cache import revoke_token, revoke_id_token
 
 utc=pytz.UTC
 
@@ -33,6 +34,11 @@ class Grant(AbstractGrant):
 class IDToken(AbstractIDToken):
     application = models.ForeignKey(Application, on_delete=models.CASCADE)
 
+    def revoke(self):
+        """Also stop accepting the token from the verified-token caches."""
+        revoke_id_token(self.jti, self.expires)
+        super().revoke()
+
 class AccessToken(AbstractAccessToken):
     """
     Change token fields from char field to text field (fix token too long)
@@ -70,6 +76,11 @@ class AccessToken(AbstractAccessToken):
 
         return  timezone.now() >= utc.localize(self.expires)
 
+    def revoke(self):
+        """Also stop accepting the (JWT) token from the verified-token caches."""
+        revoke_token(self.token, self.expires)
+        super().revoke()
+
 class RefreshToken(AbstractRefreshToken):
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name="refresh_tokens")
     access_token = models.OneToOneField(
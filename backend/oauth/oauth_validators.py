@@ -1,9 +1,16 @@
 import json
-from jwcrypto import jwt
+import logging
+import threading
+import time
+from functools import lru_cache
+from jwcrypto import jwk, jws, jwt
 from jwcrypto.common import JWException
 from jwcrypto.jwt import JWTExpired
 from oauth2_provider.oauth2_validators import OAuth2Validator
+from oauth2_provider.settings import oauth2_settings
+from .jwt_cache import verified_tokens, token_digest, is_revoked
 from .tokens import JWTAccessToken
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from oauth2_provider.models import (
@@ -13,6 +20,18 @@ from oauth2_provider.models import (
 IDToken = get_id_token_model()
 AccessToken = get_access_token_model()
 User = get_user_model()
+log = logging.getLogger("oauth2_provider")
+
+# aud -> (expires_at, key); applications rarely change, so keys are reused for a while
+_audience_keys = {}
+_audience_keys_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def load_rsa_key(pem):
+    """Parse the OIDC RSA key once per process instead of on every request."""
+    return jwk.JWK.from_pem(pem.encode("utf8"))
+
 
 class CustomOAuth2Validator(OAuth2Validator):
     def validate_bearer_token(self, token, scopes, request):
@@ -42,6 +61,54 @@ class CustomOAuth2Validator(OAuth2Validator):
         return True
 
     def _load_id_token(self, token):
+        digest = token_digest(token)
+        claims = self._verified_claims(token, digest)
+        if claims is None or is_revoked(digest, claims.get("jti")):
+            return None
+        jti = claims.get("jti")
+        if jti is None:
+            return JWTAccessToken(claims)
+        # Only the signature check is cached: the row is read on every request, so a
+        # revoked (deleted) ID token is rejected by every process right away.
+        return IDToken.objects.select_related("application", "user").filter(jti=jti).first()
+
+    def _get_key_for_token(self, token):
+        """
+        Same as OAuth2Validator._get_key_for_token, but the application lookup and the
+        parsed key are kept per audience for JWT_KEY_CACHE_SECONDS.
+        """
+        unverified_token = jws.JWS()
+        unverified_token.deserialize(token)
+        claims = json.loads(unverified_token.objects["payload"].decode("utf-8"))
+        if "aud" not in claims:
+            return None
+        audience = claims["aud"] if isinstance(claims["aud"], str) else " ".join(claims["aud"])
+        now = time.time()
+        cached = _audience_keys.get(audience)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        application = self._get_client_by_audience(claims["aud"])
+        if not application:
+            # Not cached, so an application created in the meantime is found on the next request
+            return None
+        if application.algorithm == application.RS256_ALGORITHM and oauth2_settings.OIDC_RSA_PRIVATE_KEY:
+            key = load_rsa_key(oauth2_settings.OIDC_RSA_PRIVATE_KEY)
+        else:
+            key = application.jwk_key
+        if key:
+            with _audience_keys_lock:
+                _audience_keys[audience] = (now + getattr(settings, "JWT_KEY_CACHE_SECONDS", 300), key)
+        return key
+
+    def _verified_claims(self, token, digest):
+        """
+        Claims of a validly signed, unexpired token, verified once and then served from
+        `verified_tokens` until the token expires.
+        """
+        claims = verified_tokens.get(digest)
+        if claims is not None:
+            return claims
         try:
             key = self._get_key_for_token(token)
         except Exception:
@@ -50,15 +117,12 @@ class CustomOAuth2Validator(OAuth2Validator):
         if not key:
             return None
         try:
-            jwt_token = jwt.JWT(key=key, jwt=token)
-            claims = json.loads(jwt_token.claims)
-            jti = claims.get("jti")
-            if jti is None:
-                return JWTAccessToken(claims)
-            return IDToken.objects.get(jti=jti)
-        except (JWException, JWTExpired, IDToken.DoesNotExist) as e:
-            print(e)
+            claims = json.loads(jwt.JWT(key=key, jwt=token).claims)
+        except (JWException, JWTExpired, ValueError) as e:
+            log.debug("Rejected JWT: %s", e)
             return None
+        verified_tokens.set(digest, claims, claims.get("exp"))
+        return claims
 
     # Set `oidc_claim_scope = None` to ignore scopes that limit which claims to return,
     # otherwise the OIDC standard scopes are used.
@@ -73,28 +137,21 @@ class CustomOAuth2Validator(OAuth2Validator):
     
     # If we use jwt token for accesstoken
     def validate_bearer_jwt_token(self, token, scopes, request):
+        digest = token_digest(token)
         try:
-            key = self._get_key_for_token(token)
-        except Exception:
-            # Invalid JWS/JWT format or unsupported representation
-            return False
-        if not key:
-            return False
-
-        try:
-            jwt_token = jwt.JWT(key=key, jwt=token)
-            claims = json.loads(jwt_token.claims)
-            jti = claims.get("jti")
-            if jti is None:
-                access_token = JWTAccessToken(claims)
-                if access_token.is_valid(scopes):
-                    request.client = access_token.application
-                    request.user = access_token.user
-                    request.scopes = list(access_token.scopes)
-                    request.access_token = access_token
-                    return True
+            claims = self._verified_claims(token, digest)
+            if claims is None or claims.get("jti") is not None or is_revoked(digest):
+                return False
+            access_token = JWTAccessToken(claims)
+            if access_token.is_valid(scopes):
+                request.client = access_token.application
+                request.user = access_token.user
+                request.scopes = list(access_token.scopes)
+                request.access_token = access_token
+                return True
         except Exception:
             return False
+        return False
 
     def validate_user(self, username, password, client, request, *args, **kwargs):
         """
@@ -1,6 +1,7 @@
 import logging
 from django.conf import settings
 from oauth2_provider.contrib.rest_framework.permissions import TokenMatchesOASRequirements
+from .scope_masks import allows, compile_alternates, scope_string_mask
 
 
 log = logging.getLogger("oauth2_provider")
@@ -20,6 +21,17 @@ class TokenHasActionScope(TokenMatchesOASRequirements):
     TODO: DRY: subclass TokenHasScope and iterate over values of required_scope?
     """
 
+    # view class -> {action: (scope mask, ...)}, compiled on the first request of each view
+    _compiled = {}
+
+    def get_alternate_masks(self, request, view):
+        view_class = type(view)
+        masks = self._compiled.get(view_class)
+        if masks is None:
+            masks = compile_alternates(self.get_required_alternate_scopes(request, view))
+            self._compiled[view_class] = masks
+        return masks
+
     def has_permission(self, request, view):
         token = request.auth
 
@@ -27,20 +39,20 @@ class TokenHasActionScope(TokenMatchesOASRequirements):
             return False
 
         if hasattr(token, "scope"):  # OAuth 2
-            required_alternate_scopes = self.get_required_alternate_scopes(request, view)
+            alternate_masks = self.get_alternate_masks(request, view)
 
             a = view.action.lower() if view.action is not None else None
 
-            if a in required_alternate_scopes:
-                log.debug(
-                    "Required scopes alternatives to access resource: {0}".format(
-                        required_alternate_scopes[a]
+            if a in alternate_masks:
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        "Required scopes alternatives to access resource: {0}".format(
+                            self.get_required_alternate_scopes(request, view)[a]
+                        )
                     )
-                )
-                for alt in required_alternate_scopes[a]:
-                    if token.is_valid(alt):
-                        return True
-                return False
+                if token.is_expired():
+                    return False
+                return allows(scope_string_mask(token.scope), alternate_masks[a])
             else:
                 log.warning("no scope alternates defined for method {0}".format(a))
                 return False
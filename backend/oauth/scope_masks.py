@@ -0,0 +1,48 @@
+import threading
+from functools import lru_cache
+
+_bits = {}
+_bits_lock = threading.Lock()
+
+
+def scope_bit(name):
+    """Bit of a scope name; every distinct name gets its own bit on first use."""
+    bit = _bits.get(name)
+    if bit is None:
+        with _bits_lock:
+            bit = _bits.get(name)
+            if bit is None:
+                bit = 1 << len(_bits)
+                _bits[name] = bit
+    return bit
+
+
+def scopes_mask(scopes):
+    mask = 0
+    for name in scopes:
+        mask |= scope_bit(name)
+    return mask
+
+
+@lru_cache(maxsize=4096)
+def scope_string_mask(scope):
+    """Mask of a space separated token scope string; few distinct strings exist, so they are memoized."""
+    return scopes_mask(scope.split()) if scope else 0
+
+
+def compile_alternates(required_alternate_scopes):
+    """
+    {"list": [["a:view"], ["a:edit"]], ...} -> {"list": (mask_view, mask_edit), ...}
+    """
+    return {
+        action: tuple(scopes_mask(alternate) for alternate in alternates)
+        for action, alternates in required_alternate_scopes.items()
+    }
+
+
+def allows(token_mask, alternate_masks):
+    """True when the token holds every scope of at least one alternate."""
+    for required in alternate_masks:
+        if token_mask & required == required:
+            return True
+    return False
@@ -1,3 +1,150 @@
-from django.test import TestCase
+import time
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from jwcrypto import jwt
+from oauthlib.common import Request
+from oauth2_provider.settings import oauth2_settings
+
+from .jwt_cache import verified_tokens
+from .models import AccessToken, Application, IDToken
+from .oauth_validators import CustomOAuth2Validator, _audience_keys, load_rsa_key
+from .permissions import TokenHasActionScope
+from .tokens import signed_token_generator
+
+
+class TokenValidationTest(TestCase):
+    def setUp(self):
+        verified_tokens.clear()
+        _audience_keys.clear()
+        cache.clear()
+        self.user = get_user_model().objects.create(email=f"{uuid.uuid4()}@example.com")
+        self.application = self.create_application()
+        self.validator = CustomOAuth2Validator()
+
+    def create_application(self, client_id=None):
+        return Application.objects.create(
+            client_id=client_id or str(uuid.uuid4()),
+            client_type=Application.CLIENT_CONFIDENTIAL,
+            authorization_grant_type=Application.GRANT_PASSWORD,
+            algorithm=Application.RS256_ALGORITHM,
+            name="test",
+        )
+
+    def access_token(self, client_id):
+        request = Request("http://localhost")
+        request.user = self.user
+        request.client_id = client_id
+        request.scope = "read"
+        request.scopes = ["read"]
+        request.refresh_token_instance = None
+        request.expires_in = 3600
+        return signed_token_generator(oauth2_settings.OIDC_RSA_PRIVATE_KEY, issuer="test")(request)
+
+    def id_token(self):
+        jti = uuid.uuid4()
+        IDToken.objects.create(
+            user=self.user,
+            application=self.application,
+            jti=jti,
+            expires=timezone.now() + timedelta(hours=1),
+            scope="openid",
+        )
+        token = jwt.JWT(
+            header={"alg": "RS256"},
+            claims={
+                "aud": self.application.client_id,
+                "sub": str(self.user.id),
+                "jti": str(jti),
+                "exp": int(time.time()) + 3600,
+            },
+        )
+        token.make_signed_token(load_rsa_key(oauth2_settings.OIDC_RSA_PRIVATE_KEY))
+        return token.serialize(), jti
+
+    def test_bearer_jwt_is_verified_once(self):
+        token = self.access_token(self.application.client_id)
+        self.assertTrue(self.validator.validate_bearer_jwt_token(token, ["read"], Request("http://localhost")))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.validator.validate_bearer_jwt_token(token, ["read"], Request("http://localhost")))
+
+    def test_revoked_access_token_is_rejected(self):
+        token = self.access_token(self.application.client_id)
+        self.assertTrue(self.validator.validate_bearer_jwt_token(token, ["read"], Request("http://localhost")))
+        AccessToken.objects.create(
+            user=self.user,
+            application=self.application,
+            token=token,
+            expires=timezone.now() + timedelta(hours=1),
+            scope="read",
+        ).revoke()
+        self.assertFalse(self.validator.validate_bearer_jwt_token(token, ["read"], Request("http://localhost")))
+
+    def test_deleted_id_token_is_rejected_after_a_cached_verification(self):
+        token, jti = self.id_token()
+        self.assertTrue(self.validator.validate_id_token(token, [], Request("http://localhost")))
+        # Deleted without revoke() in this process, e.g. by another worker
+        IDToken.objects.filter(jti=jti).delete()
+        self.assertFalse(self.validator.validate_id_token(token, [], Request("http://localhost")))
+
+    def test_unknown_audience_is_not_cached(self):
+        client_id = str(uuid.uuid4())
+        token = self.access_token(client_id)
+        self.assertFalse(self.validator.validate_bearer_jwt_token(token, ["read"], Request("http://localhost")))
+        self.create_application(client_id)
+        self.assertTrue(self.validator.validate_bearer_jwt_token(token, ["read"], Request("http://localhost")))
+
+
+class TokenHasActionScopeTest(SimpleTestCase):
+    required_alternate_scopes = {
+        "list": [["shop:products:view"], ["shop:products:edit"]],
+        "update": [["shop:products:edit", "shop:prices:edit"], ["shop:admin"]],
+    }
+
+    def setUp(self):
+        # A new view class per test, so every test compiles its own masks
+        self.view_class = type("View", (), {"required_alternate_scopes": self.required_alternate_scopes})
+
+    def allowed(self, scope, action, expires_in=3600):
+        # is_expired() reads `expires` as naive UTC
+        expires = (timezone.now() + timedelta(seconds=expires_in)).replace(tzinfo=None)
+        token = AccessToken(scope=scope, expires=expires)
+        view = self.view_class()
+        view.action = action
+        allowed = TokenHasActionScope().has_permission(SimpleNamespace(auth=token), view)
+        alternates = self.view_class.required_alternate_scopes.get(action, [])
+        # Same answer as the scope lists oauth2_provider compares
+        self.assertEqual(allowed, expires_in > 0 and any(token.allow_scopes(scopes) for scopes in alternates))
+        return allowed
+
+    def test_any_alternate_grants_the_action(self):
+        self.assertTrue(self.allowed("shop:products:view", "list"))
+        self.assertTrue(self.allowed("openid shop:products:edit", "list"))
+        self.assertTrue(self.allowed("shop:prices:edit shop:products:edit", "update"))
+        self.assertTrue(self.allowed("shop:admin", "update"))
+
+    def test_missing_scope_is_denied(self):
+        self.assertFalse(self.allowed("shop:products:edit", "update"))
+        self.assertFalse(self.allowed("shop:products:view", "update"))
+        self.assertFalse(self.allowed("", "list"))
+        self.assertFalse(self.allowed("shop:products:view", "list", expires_in=-1))
+
+    def test_action_without_alternates_is_denied(self):
+        self.assertFalse(self.allowed("shop:admin shop:products:edit shop:prices:edit", "destroy"))
+        self.assertFalse(self.allowed("shop:admin", None))
+
+    def test_scopes_outside_the_compiled_table(self):
+        # Names first seen on the token get bits no compiled mask contains
+        scope = f"unknown:{uuid.uuid4()} other:{uuid.uuid4()}"
+        self.assertFalse(self.allowed(scope, "list"))
+        self.assertTrue(self.allowed(f"{scope} shop:products:view", "list"))
+        # A view compiled after the token was seen requires one of those names
+        self.view_class = type("View", (), {"required_alternate_scopes": {"list": [[scope.split()[1]]]}})
+        self.assertTrue(self.allowed(scope, "list"))
+        self.assertFalse(self.allowed("shop:products:view", "list"))
 
-# Create your tests here.
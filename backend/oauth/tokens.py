@@ -1,5 +1,6 @@
 from datetime import datetime
 import json
+import time
 from jwcrypto import jws
 from django.utils import timezone
 from oauthlib.common import generate_signed_token
@@ -71,6 +72,9 @@ class JWTApplication():
 class JWTAccessToken():
     def __init__(self, claims):
         self.scope = claims["scope"]
+        # Parsed once; allow_scopes/scopes run on every permission check
+        self.scope_names = tuple(self.scope.split()) if self.scope else ()
+        self.scope_set = frozenset(self.scope_names)
         self.user = JWTUser(
             id=claims["sub"],
             email=claims.get("email", None),
@@ -82,6 +86,7 @@ class JWTAccessToken():
             name=claims.get("client_name", None)
         )
         unix_timestamp = int(claims.get("exp", None))
+        self.expires_at = unix_timestamp
         self.expires = datetime.utcfromtimestamp(unix_timestamp)
     
     def allow_scopes(self, scopes):
@@ -96,10 +101,7 @@ class JWTAccessToken():
         if self.scope is None:
             return False
 
-        provided_scopes = set(self.scope.split())
-        resource_scopes = set(scopes)
-
-        return resource_scopes.issubset(provided_scopes)
+        return self.scope_set.issuperset(scopes)
     
     def is_expired(self):
         """
@@ -108,7 +110,7 @@ class JWTAccessToken():
         if not self.expires:
             return True
 
-        return  timezone.now() >= utc.localize(self.expires)
+        return time.time() >= self.expires_at
     
     def is_valid(self, scopes=None):
         """
@@ -126,5 +128,4 @@ class JWTAccessToken():
         # Don't move this import to global scope, because it it lazay object.
         from oauth2_provider.scopes import get_scopes_backend
         all_scopes = get_scopes_backend().get_all_scopes()
-        token_scopes = self.scope.split()
-        return {name: desc for name, desc in all_scopes.items() if name in token_scopes}
+        return {name: all_scopes[name] for name in self.scope_names if name in all_scopes}
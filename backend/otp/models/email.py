@@ -1,9 +1,10 @@
 from django.contrib.humanize.templatetags.humanize import naturaltime
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
 from django.template import Context, Template
 from django.template.loader import get_template
 from django.utils.translation import gettext
+from base.services import Mailing
 
 from .base import (
     CooldownMixin,
@@ -106,20 +107,22 @@ class EmailOTPDevice(TimestampMixin, CooldownMixin, ThrottlingMixin, SideChannel
 
         return message
 
-    def send_mail(self, body, **kwargs):
+    def send_mail(self, body, html_message=None):
         """
-        A simple wrapper for :func:`django.core.mail.send_mail`.
+        Queue the token email for the job worker (see :class:`base.services.Mailing`).
 
         Subclasses (e.g. proxy models) may override this to customize delivery.
 
         """
-        send_mail(
+        message = EmailMultiAlternatives(
             str(settings.OTP_EMAIL_SUBJECT),
             body,
             settings.OTP_EMAIL_SENDER,
             [self.email or self.user.email],
-            **kwargs,
         )
+        if html_message:
+            message.attach_alternative(html_message, "text/html")
+        Mailing.asyn_send_message(message)
 
     def verify_token(self, token):
         """"""
@@ -0,0 +1,124 @@
+"""
+Management command to move files out of binary_database_files into the
+configured file storage (FILE_STORAGE_BACKEND = local / s3)
+"""
+import posixpath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import FileField
+from django.utils.module_loading import import_string
+from binary_database_files.models import File
+
+from base.storages import is_hashed_name
+
+
+def file_fields():
+    for model in apps.get_models():
+        if model is File:
+            continue
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField):
+                yield model, field
+
+
+class Command(BaseCommand):
+    help = 'Stream files stored in the database into the file storage and repoint every FileField'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--to',
+            choices=['local', 's3'],
+            help='Target storage. Defaults to FILE_STORAGE_BACKEND.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Rows (and BLOBs) loaded per batch',
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete the database copies once every field has been moved',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the files that would be moved',
+        )
+
+    def handle(self, *args, **options):
+        backend = options['to'] or settings.FILE_STORAGE_BACKEND
+        if backend not in ('local', 's3'):
+            raise CommandError('Set FILE_STORAGE_BACKEND to local or s3, or pass --to')
+        try:
+            storage = import_string(settings.FILE_STORAGE_BACKENDS[backend])()
+        except ImportError as e:
+            raise CommandError(f'Storage backend "{backend}" is not available: {e}')
+
+        self.batch_size = max(1, options['batch_size'])
+        self.dry_run = options['dry_run']
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('Running in DRY-RUN mode.'))
+
+        moved_names = set()
+        total_moved = total_missing = 0
+        for model, field in file_fields():
+            moved, missing = self.export_field(storage, model, field, moved_names)
+            total_moved += moved
+            total_missing += missing
+            if moved or missing:
+                self.stdout.write(
+                    f'{model._meta.label}.{field.name}: {moved} moved, {missing} missing'
+                )
+
+        if options['delete'] and not self.dry_run and moved_names:
+            names = sorted(moved_names)
+            for start in range(0, len(names), self.batch_size):
+                File.objects.filter(name__in=names[start:start + self.batch_size]).delete()
+            self.stdout.write(f'Deleted {len(names)} database files')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Done. Moved: {total_moved}, missing in database: {total_missing}')
+        )
+
+    def export_field(self, storage, model, field, moved_names):
+        manager = model._default_manager
+        queryset = (
+            manager.exclude(**{field.attname: ''})
+            .exclude(**{f'{field.attname}__isnull': True})
+            .order_by('pk')
+        )
+        moved = missing = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            rows = list(batch.values_list('pk', field.attname)[:self.batch_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            # Names already moved by an earlier run are content-hashed.
+            rows = [(pk, name) for pk, name in rows if not is_hashed_name(name)]
+            names = {name for _, name in rows}
+            blobs = dict(
+                File.objects.filter(name__in=names).values_list('name', 'content')
+            ) if names else {}
+
+            for pk, name in rows:
+                content = blobs.get(name)
+                if content is None:
+                    missing += 1
+                    continue
+                moved += 1
+                if self.dry_run:
+                    continue
+                new_name = storage.save(
+                    name, ContentFile(bytes(content), name=posixpath.basename(name))
+                )
+                manager.filter(pk=pk).update(**{field.attname: new_name})
+                moved_names.add(name)
+        return moved, missing
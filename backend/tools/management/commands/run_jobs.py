@@ -0,0 +1,105 @@
+"""
+Worker for the database job queue (base.services.JobQueue): mail, push, SMS, PDF, search index.
+Run one or more of these next to the web processes.
+"""
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.services.jobs import JobQueue, worker_name
+
+# How often finished jobs older than JOB_DONE_RETENTION_DAYS are deleted.
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (mail, push, SMS, PDF) with a bounded number of threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            dest='queues',
+            help='Only run jobs of this queue (repeatable). Defaults to every queue.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Jobs run at the same time',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when no job is due',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are due now, then exit',
+        )
+        parser.add_argument(
+            '--retry-dead',
+            action='store_true',
+            help='Put dead jobs back in the queue and exit',
+        )
+
+    def handle(self, *args, **options):
+        queues = options['queues']
+        if options['retry_dead']:
+            count = JobQueue.retry_dead(queues)
+            self.stdout.write(self.style.SUCCESS(f'{count} dead jobs queued again'))
+            return
+
+        self.stopping = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.stop)
+
+        concurrency = max(1, options['concurrency'])
+        name = worker_name()
+        self.stdout.write(f'Worker {name}: {concurrency} threads, queues: {", ".join(queues or ["*"])}')
+        heartbeat_interval = getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 60)
+        succeeded = failed = 0
+        last_purge = last_heartbeat = 0
+        # Future -> id of the job it runs, for the heartbeat.
+        running = {}
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='jobs') as executor:
+            while running or not self.stopping.is_set():
+                if time.monotonic() - last_heartbeat > heartbeat_interval:
+                    JobQueue.heartbeat(list(running.values()), name)
+                    last_heartbeat = time.monotonic()
+
+                if not self.stopping.is_set():
+                    if time.monotonic() - last_purge > PURGE_INTERVAL:
+                        JobQueue.purge()
+                        last_purge = time.monotonic()
+
+                    free = concurrency - len(running)
+                    jobs = JobQueue.claim(free, queues, name) if free else []
+                    for job in jobs:
+                        running[executor.submit(JobQueue.run, job)] = job.pk
+
+                if not running:
+                    if options['once']:
+                        break
+                    self.stopping.wait(options['poll_interval'])
+                    continue
+                # Wait for a free thread (or new jobs to become due).
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    if future.result():
+                        succeeded += 1
+                    else:
+                        failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Stopped. Succeeded: {succeeded}, failed: {failed}'))
+
+    def stop(self, signum, frame):
+        self.stdout.write('Finishing running jobs...')
+        self.stopping.set()
@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils import timezone
+
+from base.models import TimeStampedModel
+from common.constants import JobStatus
+
+
+class Job(TimeStampedModel):
+    """
+    A unit of background work run by `python manage.py run_jobs` (see base.services.JobQueue).
+    `handler` is the dotted path of a function called with `payload` as keyword arguments.
+    """
+
+    queue = models.CharField(max_length=64, default="default")
+    handler = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.IntegerField(choices=JobStatus.CHOICES, default=JobStatus.PENDING)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.handler} ({self.get_status_display()})"
+
+    class Meta:
+        db_table = "tools_jobs"
+        ordering = ["run_at"]
+        indexes = [
+            models.Index(fields=["status", "queue", "run_at"], name="tools_jobs_claim_idx"),
+        ]
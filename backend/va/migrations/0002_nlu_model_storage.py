@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-18 17:05
+
+import va.models.model
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('va', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='nlumodel',
+            name='file',
+            field=models.FileField(storage=va.models.model.nlu_model_storage, upload_to=va.models.model.nlu_model_upload_path),
+        ),
+    ]
@@ -1,14 +1,24 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.db import models
+from django.utils.module_loading import import_string
 from base.models.timestamped import TimeStampedModel
 from .bot import Bot
 import os
 def nlu_model_upload_path(instance, file_name):
     return os.path.join(instance.bot.output_folder,file_name)
 
+def nlu_model_storage():
+    """Storage of model archives: NLU_MODEL_STORAGE_BACKEND when set, else the default storage."""
+    backend = getattr(settings, "NLU_MODEL_STORAGE_BACKEND", "")
+    if not backend or backend == settings.FILE_STORAGE_BACKEND:
+        return default_storage
+    return import_string(settings.FILE_STORAGE_BACKENDS[backend])()
+
 class NLUModel(TimeStampedModel):
     name =  models.CharField(max_length=255, blank=True) 
     hash = models.CharField(max_length=64, blank=True, null=True)
-    file = models.FileField(upload_to=nlu_model_upload_path)
+    file = models.FileField(upload_to=nlu_model_upload_path, storage=nlu_model_storage)
     bot = models.ForeignKey(Bot, null=True, blank=True, on_delete=models.CASCADE, related_name="models")
     
     def __str__(self):
@@ -0,0 +1,2 @@
+from .training_export import TrainingDataExporter
+from .model_archive import ModelArchive
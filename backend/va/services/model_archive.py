@@ -0,0 +1,70 @@
+import hashlib
+import json
+import tarfile
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+
+# Bytes read from the request per round; the archive is never held in memory as a whole.
+CHUNK_SIZE = 1024 * 1024
+METADATA_NAMES = ("metadata.json", "./metadata.json")
+
+
+class ModelArchive:
+    """
+    A trained Rasa model (tar.gz) received from the NLU service, spooled to a
+    temporary file (FILE_UPLOAD_TEMP_DIR) while its sha256 is computed in the same pass.
+
+        with ModelArchive.receive(request._request, "bot.model.tar.gz") as archive:
+            archive.metadata()       # only metadata.json is decompressed
+            model.file.save(name, archive.file)
+    """
+
+    def __init__(self, file, hash, size):
+        self.file = file
+        self.hash = hash
+        self.size = size
+
+    @classmethod
+    def receive(cls, stream, name, content_type="application/x-tar", chunk_size=CHUNK_SIZE):
+        file = TemporaryUploadedFile(name, content_type, 0, None)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                file.write(chunk)
+                size += len(chunk)
+            file.flush()
+            file.seek(0)
+        except BaseException:
+            file.close()
+            raise
+        file.size = size
+        return cls(file, digest.hexdigest(), size)
+
+    def metadata(self):
+        """
+        metadata.json of the archive, or None when it has none. The tar is read as a
+        stream and stops at that member, so the model files are not extracted.
+        """
+        self.file.seek(0)
+        try:
+            with tarfile.open(fileobj=self.file.file, mode="r|gz") as tar:
+                for member in tar:
+                    if member.isfile() and member.name in METADATA_NAMES:
+                        return json.load(tar.extractfile(member))
+            return None
+        finally:
+            self.file.seek(0)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
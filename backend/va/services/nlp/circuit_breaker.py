@@ -0,0 +1,69 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Stop calling a service that keeps failing. After `failure_threshold` failures in a row
+    the circuit opens and calls are refused for `reset_timeout` seconds; then one trial
+    call is let through (half-open), which closes the circuit again or re-opens it.
+
+        if breaker.allow():
+            try:
+                ...  # call, then breaker.success() or breaker.failure()
+            finally:
+                breaker.release()
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        """Whether a call may be made now."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release(self):
+        """
+        End the call let through by allow(). A trial call that ended without success()
+        or failure() (cancelled, unexpected error) must not keep the circuit half-open
+        with no trial left to close it.
+        """
+        with self._lock:
+            self._trial_running = False
@@ -11,6 +11,14 @@ class NLUService:
     def get_nlu_status(cls):
         return cls.client.get_nlu_status()
     
+    @classmethod
+    async def aget_nlu_version(cls):
+        return await cls.client.aget_nlu_version()
+
+    @classmethod
+    async def aget_nlu_status(cls):
+        return await cls.client.aget_nlu_status()
+
     @classmethod
     def get_nlu_host(cls):
         return cls.client.get_nlu_host()
\ No newline at end of file
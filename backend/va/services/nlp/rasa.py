@@ -1,19 +1,189 @@
+import asyncio
+import json
+import threading
+import weakref
+
+import aiohttp
 import requests
 from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from .circuit_breaker import CircuitBreaker
+
+# Headers that describe the upstream connection or encoding, not the proxied content.
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "content-encoding",
+    "content-length",
+}
+
+
+class RasaResponse:
+    """Answer of the Rasa server, detached from the HTTP client so it can be cached."""
+
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @classmethod
+    def from_upstream(cls, status_code, content, headers):
+        return cls(
+            status_code,
+            content,
+            {key: value for key, value in headers.items() if key.lower() not in HOP_BY_HOP_HEADERS},
+        )
+
+    @classmethod
+    def unavailable(cls, detail, status_code=503):
+        return cls(
+            status_code,
+            json.dumps({"detail": detail}).encode(),
+            {"Content-Type": "application/json"},
+        )
+
+    def to_cache(self):
+        return self.status_code, self.content, self.headers
+
+    @classmethod
+    def from_cache(cls, entry):
+        return cls(*entry)
+
 
 class Rasa:
     """
     Gateway  for Rasa
+
+    Calls go through one pooled keep-alive session (an aiohttp session per event loop
+    for the `a*` variants) with connect/read timeouts. GET /status and /version are
+    cached for RASA_CACHE_SECONDS, and a circuit breaker answers 503 right away while
+    the server keeps failing, instead of holding a worker until every call times out.
     """
 
     def __init__(self):
         self.endpoint = getattr(settings, 'RASA_ENDPOINT')
+        self.connect_timeout = getattr(settings, "RASA_CONNECT_TIMEOUT", 2)
+        self.read_timeout = getattr(settings, "RASA_READ_TIMEOUT", 10)
+        self.pool_size = getattr(settings, "RASA_POOL_SIZE", 10)
+        self.cache_seconds = getattr(settings, "RASA_CACHE_SECONDS", 5)
+        self.breaker = CircuitBreaker(
+            getattr(settings, "RASA_BREAKER_FAILURES", 5),
+            getattr(settings, "RASA_BREAKER_RESET_SECONDS", 30),
+        )
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._async_sessions = weakref.WeakKeyDictionary()
 
+    # Clients -----------------------------------------------------------------
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def async_session(self):
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout),
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    def cache_key(self, path):
+        return f"va:rasa:{self.endpoint}{path}"
+
+    # Requests ----------------------------------------------------------------
+    def get(self, path, cached=False):
+        if cached and self.cache_seconds:
+            entry = cache.get(self.cache_key(path))
+            if entry is not None:
+                return RasaResponse.from_cache(entry)
+        if not self.breaker.allow():
+            return RasaResponse.unavailable("The NLU service is unavailable.")
+        try:
+            response = self.fetch(path)
+        finally:
+            self.breaker.release()
+        if cached and self.cache_seconds and response.status_code == 200:
+            cache.set(self.cache_key(path), response.to_cache(), self.cache_seconds)
+        return response
+
+    async def aget(self, path, cached=False):
+        if cached and self.cache_seconds:
+            entry = await cache.aget(self.cache_key(path))
+            if entry is not None:
+                return RasaResponse.from_cache(entry)
+        if not self.breaker.allow():
+            return RasaResponse.unavailable("The NLU service is unavailable.")
+        try:
+            response = await self.afetch(path)
+        finally:
+            self.breaker.release()
+        if cached and self.cache_seconds and response.status_code == 200:
+            await cache.aset(self.cache_key(path), response.to_cache(), self.cache_seconds)
+        return response
+
+    def fetch(self, path):
+        try:
+            upstream = self.session.get(
+                f"{self.endpoint}{path}", timeout=(self.connect_timeout, self.read_timeout)
+            )
+        except requests.Timeout:
+            self.breaker.failure()
+            return RasaResponse.unavailable("The NLU service did not answer in time.", 504)
+        except requests.RequestException:
+            self.breaker.failure()
+            return RasaResponse.unavailable("The NLU service is unavailable.", 502)
+        return self.record(RasaResponse.from_upstream(
+            upstream.status_code, upstream.content, upstream.headers
+        ))
+
+    async def afetch(self, path):
+        try:
+            async with self.async_session().get(f"{self.endpoint}{path}") as upstream:
+                response = RasaResponse.from_upstream(
+                    upstream.status, await upstream.read(), upstream.headers
+                )
+        except asyncio.TimeoutError:
+            self.breaker.failure()
+            return RasaResponse.unavailable("The NLU service did not answer in time.", 504)
+        except aiohttp.ClientError:
+            self.breaker.failure()
+            return RasaResponse.unavailable("The NLU service is unavailable.", 502)
+        return self.record(response)
+
+    def record(self, response):
+        """Count a 5xx answer as a failure of the server."""
+        if response.status_code >= 500:
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+        return response
+
+    # API ---------------------------------------------------------------------
     def get_nlu_status(self):
-        return requests.get(f"{self.endpoint}/status")
-    
+        return self.get("/status", cached=True)
+
     def get_nlu_version(self):
-        return requests.get(f"{self.endpoint}/version")
-    
+        return self.get("/version", cached=True)
+
+    async def aget_nlu_status(self):
+        return await self.aget("/status", cached=True)
+
+    async def aget_nlu_version(self):
+        return await self.aget("/version", cached=True)
+
     def get_nlu_host(self):
-        return getattr(settings, 'RASA_ENDPOINT')
\ No newline at end of file
+        return getattr(settings, 'RASA_ENDPOINT')
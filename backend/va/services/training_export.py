@@ -0,0 +1,210 @@
+import hashlib
+import json
+
+import yaml
+from django.db.models import Count, Max, Prefetch
+from rest_framework.utils.encoders import JSONEncoder
+
+from ..constants import StoryStepTypes
+from ..serializers import EntitySerializer, ResponseSerializer, RuleSerializer, StorySerializer, SynonymSerializer
+from ..serializers.intent_training import IntentTrainigSerializer
+from ..models import (
+    Entity,
+    Intent,
+    Response,
+    Rule,
+    RuleStep,
+    Story,
+    StoryStep,
+    Synonym,
+    SynonymVariant,
+    Utterance,
+    UtteranceEntity,
+)
+
+# Rows fetched per round trip; prefetches run per chunk as well.
+CHUNK_SIZE = 500
+
+
+class LiteralString(str):
+    """Dumped as a `|` block, the way Rasa writes intent examples."""
+
+
+yaml.SafeDumper.add_representer(
+    LiteralString,
+    lambda dumper, data: dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|"),
+)
+
+
+def dump_yaml(data):
+    return yaml.safe_dump(data, allow_unicode=True, sort_keys=False)
+
+
+def mark_entities(text, entities):
+    """`I live in Hanoi` + entity(10-15, city) -> `I live in [Hanoi](city)`"""
+    for entity in sorted(entities, key=lambda e: e.start or 0, reverse=True):
+        text = f"{text[:entity.start]}[{entity.text}]({entity.entity.name}){text[entity.end:]}"
+    return text
+
+
+def story_steps(steps):
+    result = []
+    for step in sorted(steps, key=lambda s: s.order or 0):
+        name = (step.payload or {}).get("name")
+        if step.type == StoryStepTypes.INTENT:
+            result.append({"intent": name})
+        elif step.type in (StoryStepTypes.RESPONSE, StoryStepTypes.ACTION):
+            result.append({"action": name})
+    return result
+
+
+class TrainingDataExporter:
+    """
+    Training data of a bot, written section by section so it can be streamed:
+    `json_chunks` keeps the BotTrainingSerializer layout, `yaml_chunks` writes
+    Rasa config/domain/nlu/stories/rules YAML. Every collection is read in chunks
+    with its children prefetched, so memory stays flat and queries stay constant per chunk.
+    """
+
+    def __init__(self, bot, context=None):
+        self.bot = bot
+        self.context = context or {}
+
+    # Querysets ---------------------------------------------------------------
+    def intents(self):
+        utterances = Utterance.objects.prefetch_related(
+            Prefetch("utterance_entities", queryset=UtteranceEntity.objects.select_related("entity"))
+        )
+        return Intent.objects.filter(bot=self.bot).prefetch_related(Prefetch("utterances", queryset=utterances))
+
+    def entities(self):
+        return Entity.objects.filter(bot=self.bot)
+
+    def synonyms(self):
+        return Synonym.objects.filter(bot=self.bot).prefetch_related("variants")
+
+    def responses(self):
+        return Response.objects.filter(bot=self.bot)
+
+    def stories(self):
+        return Story.objects.filter(bot=self.bot).prefetch_related("steps")
+
+    def rules(self):
+        return Rule.objects.filter(bot=self.bot).prefetch_related("steps")
+
+    def etag(self, output="json"):
+        """
+        Changes whenever a row of the bot's training data is added, changed or deleted.
+        `output` ("json" or "yaml") is part of the tag: the two formats are different bodies.
+        """
+        bot_filters = [
+            (Intent, "bot"),
+            (Utterance, "intent__bot"),
+            (UtteranceEntity, "utterance__intent__bot"),
+            (Entity, "bot"),
+            (Synonym, "bot"),
+            (SynonymVariant, "synonym__bot"),
+            (Response, "bot"),
+            (Story, "bot"),
+            (StoryStep, "story__bot"),
+            (Rule, "bot"),
+            (RuleStep, "rule__bot"),
+        ]
+        digest = hashlib.sha256(f"{output}:{self.bot.pk}:{self.bot.updated_at.isoformat()}".encode())
+        for model, path in bot_filters:
+            stats = model.objects.filter(**{path: self.bot}).aggregate(
+                count=Count("pk"), last=Max("updated_at")
+            )
+            digest.update(f"|{model._meta.db_table}:{stats['count']}:{stats['last']}".encode())
+        return f'"{digest.hexdigest()[:32]}"'
+
+    # JSON --------------------------------------------------------------------
+    def dumps(self, data):
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+    def json_array(self, queryset, serializer_class):
+        yield "["
+        for index, row in enumerate(queryset.iterator(chunk_size=CHUNK_SIZE)):
+            yield ("," if index else "") + self.dumps(serializer_class(row, context=self.context).data)
+        yield "]"
+
+    def json_chunks(self):
+        bot = self.bot
+        yield '{"id":%s,"name":%s,"config":%s' % (
+            self.dumps(bot.id), self.dumps(bot.name), self.dumps(bot.config)
+        )
+        for key, queryset, serializer_class in (
+            ("intents", self.intents(), IntentTrainigSerializer),
+            ("entities", self.entities(), EntitySerializer),
+            ("synonyms", self.synonyms(), SynonymSerializer),
+            ("responses", self.responses(), ResponseSerializer),
+            ("stories", self.stories(), StorySerializer),
+            ("rules", self.rules(), RuleSerializer),
+        ):
+            yield f',"{key}":'
+            yield from self.json_array(queryset, serializer_class)
+        yield ',"output_folder":%s}' % self.dumps(bot.output_folder)
+
+    # Rasa YAML ---------------------------------------------------------------
+    def yaml_chunks(self):
+        bot = self.bot
+        if bot.config:
+            yield dump_yaml({**bot.config, "assistant_id": str(bot.id)})
+
+        domain = {}
+        entities = list(self.entities().values_list("name", flat=True))
+        if entities:
+            domain["entities"] = entities
+        intents = list(Intent.objects.filter(bot=bot).values_list("name", flat=True))
+        if intents:
+            domain["intents"] = intents
+        responses = {}
+        for response in self.responses().iterator(chunk_size=CHUNK_SIZE):
+            message = {}
+            if response.text:
+                message["text"] = response.text
+            if response.image:
+                request = self.context.get("request")
+                url = response.image.url
+                message["image"] = request.build_absolute_uri(url) if request is not None else url
+            if response.custom:
+                message["custom"] = response.custom
+            responses[response.name] = [message]
+        if responses:
+            domain["responses"] = responses
+        yield dump_yaml(domain)
+
+        yield from self.yaml_section("nlu", (
+            {"intent": intent.name, "examples": LiteralString("".join(
+                f"- {mark_entities(u.text, u.utterance_entities.all())}\n" for u in intent.utterances.all()
+            ))}
+            for intent in self.intents().iterator(chunk_size=CHUNK_SIZE)
+        ))
+        yield from self.yaml_section("stories", (
+            {"story": story.name, "steps": story_steps(story.steps.all())}
+            for story in self.stories().iterator(chunk_size=CHUNK_SIZE)
+        ))
+        yield from self.yaml_section("rules", (
+            self.rule_item(rule) for rule in self.rules().iterator(chunk_size=CHUNK_SIZE)
+        ))
+
+    @staticmethod
+    def yaml_section(name, items):
+        """`name:` followed by one list item per chunk; nothing at all when `items` is empty."""
+        started = False
+        for item in items:
+            if item.get("examples") == "":
+                continue
+            if not started:
+                started = True
+                yield f"{name}:\n"
+            yield dump_yaml([item])
+
+    @staticmethod
+    def rule_item(rule):
+        item = {"rule": rule.name, "steps": story_steps(rule.steps.all())}
+        if rule.conversation_start:
+            item["conversation_start"] = True
+        if not rule.wait_for_user_input:
+            item["wait_for_user_input"] = False
+        return item
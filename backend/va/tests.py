@@ -1,3 +1,235 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from base.storages import HashedFileSystemStorage
+from .models import Bot, NLUModel
+from .services import TrainingDataExporter
+from .services.nlp.circuit_breaker import CircuitBreaker
+from .services.nlp.rasa import Rasa
+from .views.nlu import NLUViewSet
+
+
+class StubRasaHandler(BaseHTTPRequestHandler):
+    """GET /status and /version like Rasa; /error answers 500, /slow sleeps past the read timeout."""
+
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        if self.path == "/slow":
+            time.sleep(1)
+        if self.path == "/error":
+            status, body = 500, {"error": "boom"}
+        elif self.path in ("/status", "/slow"):
+            status, body = 200, {"model_file": "model.tar.gz", "num_active_training_jobs": 0}
+        elif self.path == "/version":
+            status, body = 200, {"version": "3.6.0"}
+        else:
+            status, body = 404, {"error": "not found"}
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class RasaGatewayTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubRasaHandler)
+        cls.server.hits = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.server.hits.clear()
+
+    def rasa(self, endpoint=None, **settings):
+        options = {
+            "RASA_ENDPOINT": endpoint or self.endpoint,
+            "RASA_READ_TIMEOUT": 0.3,
+            "RASA_CACHE_SECONDS": 5,
+            "RASA_BREAKER_FAILURES": 2,
+            "RASA_BREAKER_RESET_SECONDS": 30,
+            **settings,
+        }
+        with override_settings(**options):
+            return Rasa()
+
+    def test_status_is_cached(self):
+        rasa = self.rasa()
+        first = rasa.get_nlu_status()
+        second = rasa.get_nlu_status()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(json.loads(second.content)["model_file"], "model.tar.gz")
+        self.assertEqual(second.headers["Content-Type"], "application/json")
+        self.assertNotIn("Content-Length", second.headers)
+        self.assertEqual(self.server.hits, ["/status"])
+
+    def test_errors_open_the_circuit(self):
+        rasa = self.rasa()
+        self.assertEqual(rasa.get("/error").status_code, 500)
+        self.assertEqual(rasa.get("/error").status_code, 500)
+        self.assertEqual(rasa.breaker.state, CircuitBreaker.OPEN)
+        # Refused without calling the server
+        self.assertEqual(rasa.get("/version").status_code, 503)
+        self.assertEqual(self.server.hits, ["/error", "/error"])
+
+    def test_half_open_trial_closes_the_circuit(self):
+        rasa = self.rasa(RASA_BREAKER_RESET_SECONDS=0)
+        rasa.get("/error")
+        rasa.get("/error")
+        self.assertEqual(rasa.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(rasa.get("/version").status_code, 200)
+        self.assertEqual(rasa.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_timeout_and_connection_errors(self):
+        self.assertEqual(self.rasa().get("/slow").status_code, 504)
+        # Nothing listens on the discard port
+        self.assertEqual(self.rasa("http://127.0.0.1:9").get("/status").status_code, 502)
+
+    def test_async_status_is_cached(self):
+        rasa = self.rasa()
+
+        async def call():
+            try:
+                return await rasa.aget_nlu_status(), await rasa.aget_nlu_status()
+            finally:
+                await rasa.async_session().close()
+
+        first, second = asyncio.run(call())
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(self.server.hits, ["/status"])
+
+    def test_cancelled_trial_does_not_keep_the_circuit_half_open(self):
+        rasa = self.rasa(RASA_BREAKER_RESET_SECONDS=0)
+        rasa.get("/error")
+        rasa.get("/error")
+
+        async def cancelled_trial():
+            task = asyncio.create_task(rasa.aget("/slow"))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await rasa.async_session().close()
+
+        asyncio.run(cancelled_trial())
+        self.assertEqual(rasa.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(rasa.breaker.allow())
+
+
+class TrainingDataExporterTest(TestCase):
+    def test_etag_depends_on_the_output_format(self):
+        exporter = TrainingDataExporter(Bot.objects.create(name="Support"))
+        self.assertEqual(exporter.etag("json"), exporter.etag())
+        self.assertNotEqual(exporter.etag("json"), exporter.etag("yaml"))
+
+
+class NLUModelArchiveTest(TestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        patcher = mock.patch.object(
+            NLUModel._meta.get_field("file"), "storage", HashedFileSystemStorage(location=location)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bot = Bot.objects.create(name="Support", output_folder="bots/support")
+
+    def archive(self, metadata):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            members = {"model/weights.bin": os.urandom(200_000)}
+            if metadata is not None:
+                members["metadata.json"] = json.dumps(metadata).encode()
+            for name, content in members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+        return buffer.getvalue()
+
+    def upload(self, body):
+        # As routed: with the action's permission and authentication classes
+        view = NLUViewSet.as_view({"post": "callback"}, **NLUViewSet.callback.kwargs)
+        return view(APIRequestFactory().post("/", body, content_type="application/x-tar"))
+
+    def download(self, model, **headers):
+        view = NLUViewSet.as_view({"get": "models"}, **NLUViewSet.models.kwargs)
+        return view(APIRequestFactory().get("/", **headers), model_pk=str(model.pk))
+
+    def test_callback_stores_the_archive(self):
+        body = self.archive({"assistant_id": str(self.bot.pk), "trained_at": "2024-06-01", "model_id": "m1"})
+        response = self.upload(body)
+        self.assertEqual(response.status_code, 200)
+        model = NLUModel.objects.get(bot=self.bot)
+        self.assertEqual(model.name, "Support - 2024-06-01")
+        self.assertEqual(model.hash, hashlib.sha256(body).hexdigest())
+        with model.file.open("rb") as file:
+            self.assertEqual(file.read(), body)
+
+    def test_callback_refuses_bad_archives(self):
+        for body in (b"not a tar", self.archive(None), self.archive({"assistant_id": "nope"})):
+            with self.subTest(body=body[:10]), self.assertRaises(ValueError):
+                self.upload(body)
+        self.assertFalse(NLUModel.objects.exists())
+
+    def test_archive_download_ranges(self):
+        body = self.archive({"assistant_id": str(self.bot.pk), "trained_at": "2024-06-01", "model_id": "m1"})
+        self.upload(body)
+        model = NLUModel.objects.get(bot=self.bot)
+        etag = f'"{model.hash}"'
+
+        response = self.download(model)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), body)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        response = self.download(model, HTTP_RANGE="bytes=100-1099")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-1099/{len(body)}")
+        self.assertEqual(response["Content-Length"], "1000")
+        self.assertEqual(b"".join(response.streaming_content), body[100:1100])
+
+        # Resuming the tail
+        response = self.download(model, HTTP_RANGE=f"bytes={len(body) - 10}-", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), body[-10:])
+
+        # A changed archive is sent whole
+        response = self.download(model, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+        response = self.download(model, HTTP_RANGE=f"bytes={len(body)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(body)}")
+
+        self.assertEqual(self.download(model, HTTP_IF_NONE_MATCH=etag).status_code, 304)
 
-# Create your tests here.
@@ -4,6 +4,10 @@ from ..serializers import ActionSerializer
 
 class ActionViewSet(BaseViewSet):
     queryset = Action.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= ActionSerializer
     required_alternate_scopes = {
         "create": [["virtual-assistants:edit"]],
@@ -1,12 +1,15 @@
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from rest_framework.decorators import action
-from rest_framework.response import Response
 from common.constants import Http
 from base.views.base import BaseViewSet
 from ..models import Bot
 from ..serializers import BotSerializer, BotTrainingSerializer
+from ..services import TrainingDataExporter
 
 class BotViewSet(BaseViewSet):
     queryset = Bot.objects.all() 
+    filter_map = {}
     serializer_class= BotSerializer
     serializer_map = {
         "training_data": BotTrainingSerializer,
@@ -22,7 +25,21 @@ class BotViewSet(BaseViewSet):
 
     @action(detail=True, methods=[Http.HTTP_GET], url_path="training-data")
     def training_data(self, request, *args, **kwargs):
+        """
+        Stream the training data of the bot: JSON in the BotTrainingSerializer layout,
+        or Rasa YAML with `?output=yaml`. Send If-None-Match with the last ETag to
+        get a 304 when nothing changed.
+        """
         instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
-    
\ No newline at end of file
+        exporter = TrainingDataExporter(instance, context=self.get_serializer_context())
+        output = "yaml" if request.query_params.get("output") == "yaml" else "json"
+        etag = exporter.etag(output)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if output == "yaml":
+                response = StreamingHttpResponse(exporter.yaml_chunks(), content_type="application/x-yaml")
+            else:
+                response = StreamingHttpResponse(exporter.json_chunks(), content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
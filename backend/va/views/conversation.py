@@ -4,6 +4,10 @@ from ..serializers import ConversationSerializer
 
 class ConversationViewSet(BaseViewSet):
     queryset = Conversation.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= ConversationSerializer
     required_alternate_scopes = {
         "create": [["virtual-assistants:edit"]],
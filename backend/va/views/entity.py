@@ -5,6 +5,10 @@ from ..filters import BotFilterBackend
 
 class EntityViewSet(BaseViewSet):
     queryset = Entity.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= EntitySerializer
     filter_backends = [BotFilterBackend]
 
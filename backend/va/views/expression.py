@@ -5,6 +5,10 @@ from ..serializers import ExpressionSerializer
 
 class ExpressionViewSet(BaseViewSet):
     queryset = Expression.objects.all() 
+    filter_map = {
+        "intent": "intent",
+        "intentIds": "intent",
+    }
     serializer_class= ExpressionSerializer
     required_alternate_scopes = {
         "create": [["virtual-assistants:edit"]],
@@ -6,6 +6,10 @@ from ..filters import BotFilterBackend
 
 class IntentViewSet(BaseViewSet):
     queryset = Intent.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= IntentSerializer
     filter_backends = [BotFilterBackend]
     required_alternate_scopes = {
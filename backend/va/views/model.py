@@ -5,6 +5,10 @@ from ..serializers import NLUModelSerializer
 
 class NLUModelViewSet(BaseViewSet):
     queryset = NLUModel.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= NLUModelSerializer
     required_alternate_scopes = {
         "create": [["virtual-assistants:edit"]],
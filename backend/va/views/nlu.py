@@ -1,10 +1,11 @@
-import io
 import tarfile
 import json
-import hashlib
+import zlib
+from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
-from django.http import HttpResponse, StreamingHttpResponse
-from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
@@ -12,6 +13,8 @@ from rest_framework.status import HTTP_200_OK
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.exceptions import NotFound
 from common.constants import Http
+from base.views.files import parse_range, read_range
+from ..services import ModelArchive
 from ..services.nlp import NLUService
 from ..models import Bot, NLUModel
 
@@ -66,80 +69,86 @@ class NLUViewSet(GenericViewSet):
     @action(detail=False, methods=[Http.HTTP_GET], url_path="models/(?P<model_pk>[^/.]+)", permission_classes=[AllowAny], authentication_classes=[])
     def models(self, request, *args, **kwargs):
         """
-        Retrieve model file by model id
+        Retrieve model file by model id.
+        Answers If-None-Match with 304 and a single `Range: bytes=` with 206, so an
+        interrupted download can be resumed.
         """
         model_pk = kwargs.get('model_pk')
         try:
             model = NLUModel.objects.get(pk=model_pk)
-            if model.file:
-                with model.file.open('rb') as f:
-                    response = StreamingHttpResponse(f, content_type='application/x-tar')
-                    response['Content-Disposition'] = f'attachment; filename={model_pk}.tar.gz'
-                    response['Content-Length'] = model.file.size
-                    response['ETag'] = model.hash
-                    response['filename'] =  f'{model.bot.id}.{model.id}.tar.gz'
-                    return response
         except NLUModel.DoesNotExist:
             raise ValueError(_("Invalid model id"))
-        raise NotFound(_("The model were not found"))
+        if not model.file:
+            raise NotFound(_("The model were not found"))
+
+        etag = quote_etag(model.hash) if model.hash else None
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            size = model.file.size
+            byte_range = None
+            range_header = request.META.get("HTTP_RANGE")
+            if range_header and request.META.get("HTTP_IF_RANGE", etag) == etag:
+                byte_range = parse_range(range_header, size)
+
+            if byte_range is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+            elif byte_range is None:
+                response = FileResponse(model.file.open('rb'), content_type='application/x-tar')
+                response['Content-Length'] = size
+            else:
+                start, end = byte_range
+                response = StreamingHttpResponse(
+                    read_range(model.file.open('rb'), start, end),
+                    status=206,
+                    content_type='application/x-tar',
+                )
+                response['Content-Length'] = end - start + 1
+                response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Disposition'] = f'attachment; filename={model_pk}.tar.gz'
+            response['filename'] = f'{model.bot_id}.{model.id}.tar.gz'
+        if etag:
+            response['ETag'] = etag
+        response['Accept-Ranges'] = 'bytes'
+        return response
 
     @action(detail=False, methods=[Http.HTTP_POST], url_path="callback", permission_classes=[AllowAny], authentication_classes=[])
     def callback(self, request, *args, **kwargs):
         """
-        API to get NLU host
+        Receive a trained model archive (application/x-tar, gzipped) from the NLU service.
+        The body is streamed to a temporary file, never read into memory as a whole.
         """
         #Todo: Limit the host that can call this api
-        origin = request.META.get("HTTP_ORIGIN")
-        origin = (
-            request.META.get("REMOTE_ADDR")
-            if origin is None
-            else origin
-        )
-        
-        content_type =  request.content_type
-        if content_type == 'application/x-tar':
-            try:
-                # bytes = io.BytesIO(response.content)
-                # tar = tarfile.open(fileobj=request._stream.body, mode='r:gz')
+        if request.content_type != 'application/x-tar':
+            raise ValueError(_("Invalid content."))
 
-                # Stream directly from the stream object
-                byte_stream = io.BytesIO(request._request.body)
-                with tarfile.open(fileobj=byte_stream, mode='r:gz') as tar:
-                    with tar.extractfile('metadata.json') as f:
-                        if f: # Check if the file exists in the archive
-                            json_data = json.load(f)
-                            assistant_id = json_data.get('assistant_id')
-                            trained_at = json_data.get('trained_at')
-                            model_id = json_data.get('model_id')
-                            if assistant_id is not None:
-                                bot = Bot.objects.get(pk=assistant_id)
-                                if bot is not None:
-                                    model_name =  f'{bot.name} - {trained_at}'
-                                    file_name = f'{assistant_id}.{model_id}.tar.gz'
-                                    file_object = ContentFile(request._request.body, name=file_name)
-                                    hasher = hashlib.sha256() # Or hashlib.md5()
-                                    file_object.seek(0)  # Ensure the file pointer is at the beginning
-                                    for chunk in file_object.chunks():
-                                        hasher.update(chunk)
-                                    hash = hasher.hexdigest()
-                                    model = NLUModel.objects.create(
-                                        name=model_name,
-                                        hash=hash,
-                                        bot=bot
-                                    )
-                                    model.file.save(file_name, file_object)
-                                    model.save()
-                                    return Response(
-                                        {"message": _('OK')},
-                                        status=HTTP_200_OK
-                                    )
-                        else:
-                            raise ValueError(_("File 'metadata.json' not found in the archive."))
-            except tarfile.ReadError as e:
+        with ModelArchive.receive(request._request, 'model.tar.gz') as archive:
+            try:
+                metadata = archive.metadata()
+            except (tarfile.TarError, zlib.error, EOFError) as e:
                 print(f"Error opening tar file: {e}")
                 raise ValueError(_("Invalid tar file format."))
-            except json.JSONDecodeError:
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 raise ValueError(_("Error: Could not decode JSON from 'metadata.json'. The file might not contain valid JSON."))
-            except Exception as e:
-                print(f"An unexpected error occurred: {e}")
-        raise ValueError(_("Invalid content."))
\ No newline at end of file
+            if metadata is None:
+                raise ValueError(_("File 'metadata.json' not found in the archive."))
+
+            assistant_id = metadata.get('assistant_id')
+            trained_at = metadata.get('trained_at')
+            model_id = metadata.get('model_id')
+            try:
+                bot = Bot.objects.get(pk=assistant_id)
+            except (Bot.DoesNotExist, ValidationError):
+                raise ValueError(_("Invalid content."))
+
+            file_name = f'{assistant_id}.{model_id}.tar.gz'
+            model = NLUModel(
+                name=f'{bot.name} - {trained_at}',
+                hash=archive.hash,
+                bot=bot
+            )
+            model.file.save(file_name, archive.file)
+        return Response(
+            {"message": _('OK')},
+            status=HTTP_200_OK
+        )
@@ -6,6 +6,10 @@ from ..filters import BotFilterBackend
 
 class RegexViewSet(BaseViewSet):
     queryset = Regex.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= RegexSerializer
     filter_backends = [BotFilterBackend]
     required_alternate_scopes = {
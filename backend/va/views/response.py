@@ -5,6 +5,10 @@ from ..filters import BotFilterBackend
 
 class ResponseViewSet(BaseViewSet):
     queryset = Response.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= ResponseSerializer
     filter_backends = [BotFilterBackend]
 
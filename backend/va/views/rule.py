@@ -5,6 +5,10 @@ from ..filters import BotFilterBackend
 
 class RuleViewSet(BaseViewSet):
     queryset = Rule.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= RuleSerializer
     filter_backends = [BotFilterBackend]
 
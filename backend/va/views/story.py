@@ -6,6 +6,10 @@ from ..filters import BotFilterBackend
 
 class StoryViewSet(BaseViewSet):
     queryset = Story.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= StorySerializer
     filter_backends = [BotFilterBackend]
 
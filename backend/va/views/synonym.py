@@ -6,6 +6,10 @@ from ..filters import BotFilterBackend
 
 class SynonymViewSet(BaseViewSet):
     queryset = Synonym.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= SynonymSerializer
     filter_backends = [BotFilterBackend]
     required_alternate_scopes = {
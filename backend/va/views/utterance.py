@@ -5,6 +5,10 @@ from ..filters import BotFilterBackend
 
 class UtteranceViewSet(BaseViewSet):
     queryset = Utterance.objects.all() 
+    filter_map = {
+        "bot": "bot",
+        "bot__id": "bot__id",
+    }
     serializer_class= UtteranceSerializer
     filter_backends = [BotFilterBackend]
     required_alternate_scopes = {
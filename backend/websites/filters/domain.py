@@ -1,25 +1,16 @@
-from urllib.parse import urlparse
 from ..models import Site
+from ..services import PublicContentCache
 
 
 class DomainFilterBackend():
     def filter_queryset(self, request, queryset, view):
-        origin = request.META.get("HTTP_ORIGIN")
-        origin = (
-            request.META.get("REMOTE_ADDR")
-            if origin is None
-            else origin
-        )
-        url = urlparse(origin)
-        host = url.hostname
-        host = (
-            f"{host}:{url.port}"
-            if url.port is not None and url.port != 80 and url.port != 443
-            else host
-        )
+        # The domain -> site lookup is cached with the public content.
+        site_id = PublicContentCache.site_id(PublicContentCache.host(request))
         if queryset is not None and queryset.model is not None:
+            if site_id is None and (queryset.model == Site or hasattr(queryset.model, 'site')):
+                return queryset.none()
             if queryset.model == Site:
-                return queryset.filter(domain_name=host)
+                return queryset.filter(pk=site_id)
             if hasattr(queryset.model, 'site'):
-                return queryset.filter(site__domain_name=host)
+                return queryset.filter(site_id=site_id)
         return queryset
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-18 16:53
+
+from django.db import migrations, models
+
+from base.models.tree import rebuild_tree_paths
+
+
+def build_tree_paths(apps, schema_editor):
+    rebuild_tree_paths(apps.get_model("websites", "Menu"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websites', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu',
+            name='tree_depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='menu',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=760),
+        ),
+        migrations.RunPython(build_tree_paths, migrations.RunPython.noop),
+    ]
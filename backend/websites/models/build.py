@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from base.models.timestamped import TimeStampedModel
 from websites.models import Site
 from ..constants import WebsiteBuildStatus
@@ -74,6 +74,10 @@ class Build(TimeStampedModel):
             self.config = vite_config
             self.status = WebsiteBuildStatus.DEPLOYED
             self.save()
+            ## Pre-render the site's HTML shell once the deploy is committed
+            from ..services import ClientSiteCache
+            domain_name = self.site.domain_name
+            transaction.on_commit(lambda: ClientSiteCache.prerender(domain_name))
         except Exception as e:
             print_exception(e)
             raise e
\ No newline at end of file
@@ -1,11 +1,11 @@
 # models/menu.py
 from django.db import models
-from base.models import TimeStampedModel
+from base.models import TimeStampedModel, TreeModel
 from contents.models.short_content import ShortContent
 from ..models import Site
 
 
-class Menu(TimeStampedModel):
+class Menu(TimeStampedModel, TreeModel):
     title = models.ForeignKey(
         ShortContent, on_delete=models.CASCADE, related_name="site_menu_titles", null=True, blank=True
     )
@@ -2,11 +2,11 @@
 from rest_framework import serializers
 from websites.models.menu import Menu
 from base.serializers import WritableNestedSerializer
-from base.serializers.recursive import RecursiveSerializer
+from base.serializers.tree import TreeParentMixin, TreeSerializer
 from contents.serializers import ShortContentSerializer
 
 
-class MenuSerializer(WritableNestedSerializer):
+class MenuSerializer(TreeParentMixin, WritableNestedSerializer):
     title = ShortContentSerializer(required=False)
     parent_id = serializers.UUIDField(required=False, allow_null=True)
     site_id = serializers.UUIDField(required=False, allow_null=True)
@@ -33,10 +33,10 @@ class MenuSerializer(WritableNestedSerializer):
         nested_update_fields = ["title"]
 
 
-class MenuTreeSerializer(serializers.ModelSerializer):
+class MenuTreeSerializer(TreeSerializer):
+    title = ShortContentSerializer(read_only=True)
     parent_id = serializers.UUIDField(required=False, allow_null=True)
     site_id = serializers.UUIDField(required=False, allow_null=True)
-    children = RecursiveSerializer(many=True, required=False)
 
     class Meta:
         model = Menu
@@ -46,7 +46,6 @@ class MenuTreeSerializer(serializers.ModelSerializer):
             "parent_id",
             "url",
             "order",
-            "children",
             "site_id",
             "created_at",
             "updated_at"
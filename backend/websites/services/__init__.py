@@ -0,0 +1,2 @@
+from .public_cache import PublicContentCache
+from .client_sites import ClientSiteCache
@@ -0,0 +1,232 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.middleware.csrf import get_token
+from django.template import engines
+from django.template.loader import get_template, render_to_string
+from django.template.loaders.cached import Loader
+from django.utils import translation
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+
+from base.caches import GenerationToken, invalidation_timeout
+from common.constants import PublishingStatus
+from ..constants import WebsiteBuildStatus
+from ..models import Build, Site
+
+logger = logging.getLogger("project")
+
+GENERATION = GenerationToken("websites:client-sites:generation")
+# Rendered into the shells in place of the CSRF token, replaced on every request.
+CSRF_PLACEHOLDER = "__client_site_csrf_token__"
+# Variables of the request context processors (TEMPLATES): a page that uses one of them
+# is rendered for every request instead of served from the shell.
+REQUEST_CONTEXT_PATTERN = re.compile(r"\{[{%][^}]*\b(request|user|perms|messages|DEFAULT_MESSAGE_LEVELS)\b")
+# Marker for hosts without a published site, so unknown hosts are not looked up on every hit.
+NO_SITE = None
+
+
+def reset_template_loader_cache():
+    for backend in engines.all():
+        if hasattr(backend, 'engine') and hasattr(backend.engine, 'template_loaders'):
+            for loader in backend.engine.template_loaders:
+                if isinstance(loader, Loader):
+                    loader.reset()
+
+
+def page_context(public=False):
+    """apiBase/defaultHost of the single page apps, from DEFAULT_HOST."""
+    default_host = settings.DEFAULT_HOST
+    default_scheme = (
+        "http"
+        if default_host.startswith("localhost") or default_host.startswith("127.0.0.1")
+        else "https"
+    )
+    api = "api/public/v1" if public else "api/v1"
+    return {"apiBase": f"{default_scheme}://{default_host}/{api}", "defaultHost": f"{default_scheme}://{default_host}"}
+
+
+class ClientSite:
+    """
+    A published client website with its deployed build and pre-rendered HTML shells.
+    Templates that read the request, user or messages get no shell: they are rendered
+    with a RequestContext on every hit.
+    """
+
+    def __init__(self, site_id, build_id, context):
+        self.site_id = site_id
+        self.build_id = build_id
+        self.context = context
+        self.loaded_at = time.monotonic()
+        self._shells = {}
+
+    @property
+    def template_name(self):
+        return f"{self.site_id}.html"
+
+    @cached_property
+    def uses_request(self):
+        """Whether the uploaded template reads variables of the request context processors."""
+        source = getattr(getattr(get_template(self.template_name), "template", None), "source", "")
+        return bool(REQUEST_CONTEXT_PATTERN.search(source))
+
+    def page_context(self):
+        return {**page_context(public=True), "siteId": self.site_id, **self.context}
+
+    def shell(self):
+        """The page rendered once per language, with a placeholder for the CSRF token."""
+        language = translation.get_language()
+        shell = self._shells.get(language)
+        if shell is None:
+            shell = render_to_string(self.template_name, {**self.page_context(), "csrf_token": CSRF_PLACEHOLDER})
+            self._shells[language] = shell
+        return shell
+
+    def render(self, request):
+        if self.uses_request:
+            return render_to_string(self.template_name, self.page_context(), request=request)
+        return self.shell().replace(CSRF_PLACEHOLDER, get_token(request))
+
+
+class ClientSiteCache:
+    """
+    In-process map host -> ClientSite for single_page_view, so a custom-domain page is
+    served from memory: no Site/Build queries and no template rendering per hit.
+
+    Saving or deleting a Site or Build replaces the generation token in the shared cache
+    (see websites.signals) and every process drops its map on the next hit. Entries also
+    expire after CLIENT_SITE_CACHE_SECONDS, which picks up edits of the site's title and
+    description translates, or after UNSHARED_CACHE_TIMEOUT seconds when the cache is
+    not shared between processes. The map is warmed when the first request starts and when a
+    build is deployed.
+    """
+
+    _entries = OrderedDict()
+    _generation = None
+    _registered_builds = {}
+    _lock = threading.RLock()
+
+    @staticmethod
+    def timeout():
+        return invalidation_timeout(getattr(settings, "CLIENT_SITE_CACHE_SECONDS", 300))
+
+    @staticmethod
+    def max_size():
+        return getattr(settings, "CLIENT_SITE_CACHE_SIZE", 1000)
+
+    @staticmethod
+    def generation():
+        return GENERATION.get()
+
+    @staticmethod
+    def invalidate():
+        GENERATION.replace()
+
+    @classmethod
+    def get(cls, host):
+        """The ClientSite served on `host`, or None."""
+        generation = cls.generation()
+        with cls._lock:
+            if generation != cls._generation:
+                cls._entries.clear()
+                cls._generation = generation
+            if host in cls._entries:
+                entry = cls._entries[host]
+                if entry is NO_SITE or time.monotonic() - entry.loaded_at < cls.timeout():
+                    cls._entries.move_to_end(host)
+                    return entry
+        entry = cls.load(host)
+        cls.store(host, entry, generation)
+        return entry
+
+    @classmethod
+    def store(cls, host, entry, generation):
+        with cls._lock:
+            if generation != cls._generation:
+                return
+            cls._entries[host] = entry
+            cls._entries.move_to_end(host)
+            while len(cls._entries) > cls.max_size():
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def load(cls, host):
+        site = (
+            Site.objects.select_related("title", "description")
+            .prefetch_related("description__translates")
+            .filter(domain_name=host)
+            .first()
+        )
+        if site is None or site.status != PublishingStatus.PUBLISHED:
+            return NO_SITE
+        build = (
+            Build.objects.filter(site_id=site.id, status=WebsiteBuildStatus.DEPLOYED)
+            .order_by("-created_at")
+            .first()
+        )
+        if build is None:
+            return NO_SITE
+        build.site = site
+        cls.register_build(build)
+        return ClientSite(str(site.id), build.id, cls.site_context(site))
+
+    @classmethod
+    def register_build(cls, build):
+        """Load the build's manifest into DjangoVite, once per process and build."""
+        site_id = str(build.site_id)
+        with cls._lock:
+            if cls._registered_builds.get(site_id) == build.id and build.is_vite_registered():
+                return
+            build.register_site()
+            reset_template_loader_cache()
+            cls._registered_builds[site_id] = build.id
+
+    @staticmethod
+    def site_context(site):
+        context = {
+            "title": site.title.origin if site.title != None else _("No title")
+        }
+        if site.icon is not None:
+            context.update({"icon": site.icon})
+        metadata = []
+        if site.keywords != None:
+            metadata += [{"name": "keywords", "content": site.keywords}]
+        if site.description is not None:
+            for translate in site.description.translates.all():
+                metadata += [{"name": "description", "lang": translate.language, "content": translate.value}]
+        if len(metadata) > 0:
+            context.update({"metadata": metadata})
+        return context
+
+    @classmethod
+    def prerender(cls, host):
+        """
+        Load `host` and render its shell now (e.g. right after a deploy) instead of on the first hit.
+        Also checks the template: pages that read the request are left to render per hit.
+        """
+        entry = cls.get(host)
+        if entry is not NO_SITE and not entry.uses_request:
+            entry.shell()
+        return entry
+
+    @classmethod
+    def warm(cls):
+        """Load and pre-render every published site."""
+        try:
+            hosts = Site.objects.filter(status=PublishingStatus.PUBLISHED).values_list("domain_name", flat=True)
+            for host in hosts:
+                try:
+                    cls.prerender(host)
+                except Exception:
+                    logger.warning("Could not pre-render %s", host, exc_info=True)
+        finally:
+            close_old_connections()
+
+    @classmethod
+    def warm_in_background(cls):
+        threading.Thread(target=cls.warm, name="client-sites-warmup", daemon=True).start()
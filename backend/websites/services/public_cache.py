@@ -0,0 +1,139 @@
+import hashlib
+from urllib.parse import urlencode, urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from base.caches import GenerationToken, invalidation_timeout
+
+from ..models import Site
+
+GENERATION = GenerationToken("websites:public:generation")
+# Marker for domains without a site, so unknown hosts are not looked up on every request.
+NO_SITE = "-"
+# Query params the public viewsets read besides model fields: search, pagination
+# (base.views.BaseViewSet.processParams, base.pagination) and the menu tree root.
+READ_PARAMS = {
+    "keyword", "search", "page", "page_size", "limit", "ordering",
+    "cursor", "pagination", "count", "category", "category_id", "root",
+}
+
+
+class PublicContentCache:
+    """
+    Rendered responses of the public website endpoints, keyed by
+    (domain, resource, language) and cached until website content changes.
+    The resource is the path plus the query params the view reads; other params
+    (cache busters, tracking params) neither split the cache nor reach the view.
+
+    Every key contains a generation token; saving or deleting a Site, Route, Menu,
+    Section, Article or one of their short/long contents replaces the token (see
+    websites.signals), which drops all entries at once without having to know
+    which pages showed the changed row.
+    Without a shared cache entries only live for UNSHARED_CACHE_TIMEOUT seconds.
+    """
+
+    @staticmethod
+    def timeout():
+        return invalidation_timeout(getattr(settings, "WEBSITES_PUBLIC_CACHE_TIMEOUT", 3600))
+
+    @staticmethod
+    def generation():
+        return GENERATION.get()
+
+    @staticmethod
+    def invalidate():
+        GENERATION.replace()
+
+    @staticmethod
+    def host(request):
+        """`host[:port]` of the calling website, from Origin or the client address."""
+        origin = request.META.get("HTTP_ORIGIN")
+        origin = request.META.get("REMOTE_ADDR") if origin is None else origin
+        url = urlparse(origin)
+        host = url.hostname
+        return (
+            f"{host}:{url.port}"
+            if url.port is not None and url.port != 80 and url.port != 443
+            else host
+        )
+
+    @classmethod
+    def site_id(cls, host):
+        """Id of the site served on `host`, or None."""
+        key = f"websites:public:{cls.generation()}:domain:{host}"
+        site_id = cache.get(key)
+        if site_id is None:
+            site_id = Site.objects.filter(domain_name=host).values_list("id", flat=True).first()
+            site_id = str(site_id) if site_id else NO_SITE
+            cache.set(key, site_id, cls.timeout())
+        return None if site_id == NO_SITE else site_id
+
+    @staticmethod
+    def read_params(request, model):
+        """The query params of `request` that are READ_PARAMS or filters on a field of `model`."""
+        params = request.query_params.copy()
+        for param in list(params.keys()):
+            name = param[:-2] if param.endswith("[]") else param
+            if name in READ_PARAMS:
+                continue
+            try:
+                model._meta.get_field(name.split(LOOKUP_SEP)[0])
+            except FieldDoesNotExist:
+                del params[param]
+        return params
+
+    @classmethod
+    def response_key(cls, request, params):
+        query = urlencode(sorted(params.lists()), doseq=True)
+        resource = hashlib.sha256(f"{request.path}?{query}".encode()).hexdigest()
+        return (
+            f"websites:public:{cls.generation()}:{cls.host(request)}"
+            f":{translation.get_language()}:{resource}"
+        )
+
+    @staticmethod
+    def finalize(response, etag):
+        response["ETag"] = etag
+        patch_cache_control(
+            response, public=True, max_age=getattr(settings, "WEBSITES_PUBLIC_MAX_AGE", 60)
+        )
+        patch_vary_headers(response, ("Origin", "Accept-Language"))
+        return response
+
+    @classmethod
+    def respond(cls, request, handler, *args, **kwargs):
+        """
+        Serve `handler(request, ...)` from the cache, rendering and storing it on a miss.
+        Only anonymous JSON GETs with a 200 answer are cached; If-None-Match gets a 304.
+        `handler` is a bound method of the viewset, whose queryset model names the filters.
+        """
+        renderer = getattr(request, "accepted_renderer", None)
+        if request.method != "GET" or not isinstance(renderer, JSONRenderer):
+            return handler(request, *args, **kwargs)
+
+        params = cls.read_params(request, handler.__self__.get_queryset().model)
+        key = cls.response_key(request, params)
+        entry = cache.get(key)
+        if entry is None:
+            # Render from the same params the key was built from, page links included
+            request._request.GET = params
+            request._request.META["QUERY_STRING"] = params.urlencode()
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            content = renderer.render(response.data, renderer.media_type, {"request": request})
+            entry = (f'"{hashlib.sha256(content).hexdigest()[:32]}"', content)
+            cache.set(key, entry, cls.timeout())
+
+        etag, content = entry
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=renderer.media_type)
+        return cls.finalize(response, etag)
@@ -0,0 +1,66 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from contents.models import ShortContent, ShortTranslate, LongContent, LongTranslate, Attachment
+from .models import Build, Site, Route, Section, Article, ArticleCategory, SectionArticle
+from .models.menu import Menu
+from .services import ClientSiteCache, PublicContentCache
+
+
+# Public website responses are cached until any published content changes (see PublicContentCache)
+@receiver(post_save, sender=Site)
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Menu)
+@receiver(post_save, sender=Section)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=SectionArticle)
+@receiver(post_save, sender=ArticleCategory)
+@receiver(post_delete, sender=Site)
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Menu)
+@receiver(post_delete, sender=Section)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=SectionArticle)
+@receiver(post_delete, sender=ArticleCategory)
+def invalidate_public_content(sender, **kwargs):
+    if not kwargs.get('raw'):
+        PublicContentCache.invalidate()
+
+
+# Titles, descriptions and bodies of the public rows live in contents
+@receiver(post_save, sender=ShortContent)
+@receiver(post_save, sender=ShortTranslate)
+@receiver(post_save, sender=LongContent)
+@receiver(post_save, sender=LongTranslate)
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=ShortContent)
+@receiver(post_delete, sender=ShortTranslate)
+@receiver(post_delete, sender=LongContent)
+@receiver(post_delete, sender=LongTranslate)
+@receiver(post_delete, sender=Attachment)
+def invalidate_public_contents(sender, **kwargs):
+    if not kwargs.get('raw'):
+        PublicContentCache.invalidate()
+
+
+@receiver(m2m_changed, sender=Article.sites.through)
+@receiver(m2m_changed, sender=Article.categories.through)
+def invalidate_public_articles(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        PublicContentCache.invalidate()
+
+
+# Host -> site map and HTML shells of single_page_view (see ClientSiteCache)
+@receiver(post_save, sender=Site)
+@receiver(post_save, sender=Build)
+@receiver(post_delete, sender=Site)
+@receiver(post_delete, sender=Build)
+def invalidate_client_sites(sender, **kwargs):
+    if not kwargs.get('raw'):
+        ClientSiteCache.invalidate()
+
+
+@receiver(request_started, dispatch_uid="websites.warm_client_sites")
+def warm_client_sites(sender, **kwargs):
+    request_started.disconnect(dispatch_uid="websites.warm_client_sites")
+    ClientSiteCache.warm_in_background()
@@ -1,3 +1,157 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from contents.models import ShortContent
+from .models import Route, Site
+from .models.menu import Menu
+from .serializers.menu import MenuSerializer
+from .services.client_sites import CSRF_PLACEHOLDER, ClientSite
+from .views.menu import MenuViewSet
+from .views.route_public import RoutePublicViewSet
+
+
+class MenuTreeTest(TestCase):
+    def setUp(self):
+        self.root = self.create_menu("Home")
+        self.child = self.create_menu("Products", parent=self.root)
+        self.leaf = self.create_menu("Shirts", parent=self.child)
+
+    @staticmethod
+    def create_menu(title, parent=None, order=0):
+        return Menu.objects.create(title=ShortContent.objects.create(origin=title), parent=parent, order=order)
+
+    def tree(self, **params):
+        view = MenuViewSet.as_view({"get": "tree"})
+        response = view(APIRequestFactory().get("/", params))
+        response.render()
+        return response
+
+    def test_tree_is_nested(self):
+        response = self.tree()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([node["id"] for node in response.data], [str(self.root.pk)])
+        child = response.data[0]["children"][0]
+        self.assertEqual(child["id"], str(self.child.pk))
+        self.assertEqual(child["children"][0]["id"], str(self.leaf.pk))
+
+    def test_subtree_of_root(self):
+        response = self.tree(root=self.child.pk)
+        self.assertEqual([node["id"] for node in response.data], [str(self.child.pk)])
+        self.assertEqual(self.tree(root="not-a-uuid").status_code, 404)
+        self.assertEqual(self.tree(root=uuid.uuid4()).status_code, 404)
+
+    def test_parent_is_validated(self):
+        serializer = MenuSerializer(data={"parent_id": str(uuid.uuid4())})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("parent_id", serializer.errors)
+
+        # A node can not be moved under its own descendant
+        serializer = MenuSerializer(self.root, data={"parent_id": str(self.leaf.pk)}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("parent_id", serializer.errors)
+
+        serializer = MenuSerializer(self.leaf, data={"parent_id": str(self.root.pk)}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class PublicContentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        site = Site.objects.create(domain_name="shop.example.com")
+        self.title = ShortContent.objects.create(origin="Home")
+        Route.objects.create(site=site, path="/", title=self.title)
+        Route.objects.create(site=site, path="/about")
+
+    def get(self, params=None, **headers):
+        view = RoutePublicViewSet.as_view({"get": "list"})
+        request = APIRequestFactory().get("/", params, HTTP_ORIGIN="https://shop.example.com", **headers)
+        with CaptureQueriesContext(connection) as queries:
+            response = view(request)
+        return response, len(queries)
+
+    def test_repeat_reads_are_served_from_the_cache(self):
+        first, queries = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertGreater(queries, 0)
+        self.assertEqual(len(json.loads(first.content)), 2)
+
+        repeat, queries = self.get()
+        self.assertEqual(queries, 0)
+        self.assertEqual(repeat.content, first.content)
+        self.assertEqual(repeat["ETag"], first["ETag"])
+
+        # Cache busters and tracking params neither split the cache nor reach the view
+        tracked, queries = self.get({"_": "1718000000", "utm_source": "mail"})
+        self.assertEqual(queries, 0)
+        self.assertEqual(tracked.content, first.content)
+
+        filtered, queries = self.get({"path": "/about", "utm_source": "mail"})
+        self.assertGreater(queries, 0)
+        self.assertEqual([route["path"] for route in json.loads(filtered.content)], ["/about"])
+
+    def test_if_none_match_gets_a_304(self):
+        first, _ = self.get()
+        response, queries = self.get(HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, 0)
+        self.assertEqual(response["ETag"], first["ETag"])
+
+    def test_content_edits_invalidate(self):
+        first, _ = self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.title.origin = "Welcome"
+            self.title.save()
+        response, queries = self.get(HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(queries, 0)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertIn(b"Welcome", response.content)
+
+
+class ClientSiteTest(SimpleTestCase):
+    def setUp(self):
+        self.templates = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.templates)
+        engine = {**settings.TEMPLATES[0], "DIRS": [self.templates], "APP_DIRS": True}
+        engine["OPTIONS"] = {key: value for key, value in engine["OPTIONS"].items() if key != "loaders"}
+        override = override_settings(TEMPLATES=[engine])
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def site(self, source):
+        site_id = str(uuid.uuid4())
+        Path(self.templates, f"{site_id}.html").write_text(source)
+        return ClientSite(site_id, None, {"title": "Shop"})
+
+    def request(self):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        return request
+
+    def test_static_page_is_served_from_the_shell(self):
+        site = self.site("{{ title }} {{ csrf_token }}")
+        self.assertFalse(site.uses_request)
+        self.assertIn(CSRF_PLACEHOLDER, site.shell())
+        page = site.render(self.request())
+        self.assertTrue(page.startswith("Shop "))
+        self.assertNotIn(CSRF_PLACEHOLDER, page)
+
+    def test_page_reading_the_user_is_rendered_per_request(self):
+        site = self.site("{{ title }} {% if user.is_authenticated %}member{% else %}guest{% endif %} {{ csrf_token }}")
+        self.assertTrue(site.uses_request)
+        page = site.render(self.request())
+        self.assertTrue(page.startswith("Shop guest "))
+        self.assertNotIn(CSRF_PLACEHOLDER, page)
+        self.assertEqual(site._shells, {})
 
-# Create your tests here.
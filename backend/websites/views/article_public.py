@@ -1,5 +1,6 @@
 from rest_framework.permissions import AllowAny
 from base.views import ViewOnlyViewSet
+from .public_cache import PublicCacheMixin
 
 from ..models import Article
 from ..serializers import ArticleSerializer
@@ -7,7 +8,7 @@ from ..filters import SiteFilterBackend
 
 
 
-class ArticlePublicViewSet(ViewOnlyViewSet):
+class ArticlePublicViewSet(PublicCacheMixin, ViewOnlyViewSet):
     authentication_classes=[]
     permission_classes=[AllowAny]
     queryset = Article.objects.all()
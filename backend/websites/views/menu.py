@@ -1,21 +1,23 @@
-from rest_framework.response import Response
-from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
-from common.constants import Http
 
 from websites.models.menu import Menu
-from websites.serializers.menu import MenuSerializer
-from base.views.base import BaseViewSet
+from websites.serializers.menu import MenuSerializer, MenuTreeSerializer
+from base.views import BaseViewSet, TreeViewMixin
 from ..filters import SiteFilterBackend
 
 
-class MenuViewSet(BaseViewSet):
+class MenuViewSet(TreeViewMixin, BaseViewSet):
     queryset = Menu.objects.all()
     queryset_map = {
-        "list": Menu.objects.all().order_by("order")
+        "list": Menu.objects.all().order_by("order"),
+        "tree": Menu.objects.prefetch_related("title__translates"),
     }
     filter_backends = [SiteFilterBackend]
+    tree_ordering = ("order",)
     serializer_class = MenuSerializer
+    serializer_map = {
+        "tree": MenuTreeSerializer,
+    }
     required_alternate_scopes = {
         "create": [["websites:sites:edit"]],
         "update": [["websites:sites:edit"]],
@@ -26,7 +28,6 @@ class MenuViewSet(BaseViewSet):
     def get_permissions(self):
         """Every one can see the list and detail of memu"""
 
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "tree"]:
             return [AllowAny()]
         return super().get_permissions()
-
@@ -1,22 +1,32 @@
 from rest_framework.permissions import AllowAny
 from websites.models.menu import Menu
-from websites.serializers.menu import MenuSerializer
-from base.views import ViewOnlyViewSet
+from websites.serializers.menu import MenuSerializer, MenuTreeSerializer
+from base.views import TreeViewMixin, ViewOnlyViewSet
+from .public_cache import PublicCacheMixin
 from ..filters import SiteFilterBackend, DomainFilterBackend
+from ..services import PublicContentCache
 
 
-class MenuPublicViewSet(ViewOnlyViewSet):
+class MenuPublicViewSet(PublicCacheMixin, TreeViewMixin, ViewOnlyViewSet):
     authentication_classes=[]
     permission_classes=[AllowAny]
     queryset = Menu.objects.all()
     queryset_map = {
-        "list": Menu.objects.all().order_by("order")
+        "list": Menu.objects.all().order_by("order"),
+        "tree": Menu.objects.prefetch_related("title__translates"),
     }
     filter_backends = [SiteFilterBackend, DomainFilterBackend]
+    tree_ordering = ("order",)
     serializer_class = MenuSerializer
+    serializer_map = {
+        "tree": MenuTreeSerializer,
+    }
     required_alternate_scopes = {
         "create": [["websites:sites:edit"]],
         "update": [["websites:sites:edit"]],
         "destroy": [["websites:sites:edit"]],
 
     }
+
+    def tree_response(self, request):
+        return PublicContentCache.respond(request, super().tree_response)
@@ -0,0 +1,14 @@
+from ..services import PublicContentCache
+
+
+class PublicCacheMixin:
+    """
+    Serve `list` and `retrieve` of a public viewset through PublicContentCache:
+    strong ETag, Cache-Control and 304 revalidation, no database work on a hit.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return PublicContentCache.respond(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return PublicContentCache.respond(request, super().retrieve, *args, **kwargs)
@@ -1,12 +1,13 @@
 from rest_framework.permissions import AllowAny
 from base.views import ViewOnlyViewSet
+from .public_cache import PublicCacheMixin
 from ..models import Route
 from ..serializers import RouteSerializer
 from ..filters import SiteFilterBackend, DomainFilterBackend
 
 
 
-class RoutePublicViewSet(ViewOnlyViewSet):
+class RoutePublicViewSet(PublicCacheMixin, ViewOnlyViewSet):
     authentication_classes=[]
     permission_classes=[AllowAny]
     queryset = Route.objects.all()
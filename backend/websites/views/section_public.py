@@ -1,12 +1,13 @@
 from rest_framework.permissions import AllowAny
 from base.views import ViewOnlyViewSet
+from .public_cache import PublicCacheMixin
 from ..models import Section
 from ..serializers import SectionSerializer
 from..filters import SiteFilterBackend, DomainFilterBackend
 
 
 
-class SectionPublicViewSet(ViewOnlyViewSet):
+class SectionPublicViewSet(PublicCacheMixin, ViewOnlyViewSet):
     authentication_classes=[]
     permission_classes=[AllowAny]
     queryset = Section.objects.all()
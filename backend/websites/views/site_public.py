@@ -1,11 +1,12 @@
 from rest_framework.permissions import AllowAny
 from base.views import ViewOnlyViewSet
+from .public_cache import PublicCacheMixin
 from ..models import Site
 from ..serializers import SiteSerializer
 from ..filters import DomainFilterBackend
 
 
-class SitePublicViewSet(ViewOnlyViewSet):
+class SitePublicViewSet(PublicCacheMixin, ViewOnlyViewSet):
     authentication_classes=[]
     permission_classes=[AllowAny]
     queryset = Site.objects.all()